@@ -9,17 +9,20 @@
     'author': "Waleed Hossam",
     'website': "www.linkedin.com/in/waleedhossam",
 
-    'version': '18.0.1.0',
+    'version': '18.0.1.1',
     'license': 'LGPL-3',
 
-    'depends': ['product', 'account', 'purchase', 'mail'],
+    'depends': ['product', 'account', 'purchase', 'mail', 'bus'],
 
     'data': [
         'security/ir.model.access.csv',
+        'security/gaming_security.xml',
 
         'data/ir_sequence_data.xml',
         'data/product_product.xml',
+        'data/res_partner_data.xml',
         'data/ir_cron.xml',
+        'data/gaming_resource_data.xml',
 
         'wizard/payment_workflow_wizard.xml',
 
@@ -32,19 +35,39 @@
         'views/table_type.xml',
         'views/cafe_order.xml',
         'views/cafe_table.xml',
+        'views/bar_queue_item.xml',
+        'views/payment_job.xml',
+        'views/console_power_event.xml',
+        'views/cashier_shift.xml',
+        'views/waitlist_entry.xml',
+        'views/gaming_resource.xml',
         'views/menu_items.xml',
 
         'reports/session_report.xml',
         'reports/cafe_report.xml',
+        'reports/revenue_rollup.xml',
+        'reports/resource_occupancy.xml',
+        'reports/customer_debt_report.xml',
+        'reports/product_sales_report.xml',
+        'reports/partner_activity.xml',
+        'reports/cafe_turnover_report.xml',
+
+        'wizard/pricing_simulation_wizard.xml',
     ],
 
     'assets': {
         'web.assets_backend': [
-            'playstation_app/static/src/xml/dashboard.xml',
-            'playstation_app/static/src/css/dashboard.css',
-            'playstation_app/static/src/js/dashboard.js',
-            'https://cdnjs.cloudflare.com/ajax/libs/Chart.js/3.9.1/chart.min.js',
-            'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css'
+            'gaming_app/static/src/css/resource_board.css',
+            'gaming_app/static/src/js/dashboard_loader.js',
+            'gaming_app/static/src/xml/bar_queue.xml',
+            'gaming_app/static/src/js/bar_queue.js',
+        ],
+        # Loaded lazily by the playstation_dashboard client action
+        'gaming_app.dashboard_assets': [
+            ('include', 'web.chartjs_lib'),
+            'gaming_app/static/src/xml/dashboard.xml',
+            'gaming_app/static/src/css/dashboard.css',
+            'gaming_app/static/src/js/dashboard.js',
         ],
     },
 
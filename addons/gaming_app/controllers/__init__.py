@@ -1 +1,5 @@
-from . import dashboard_controller
\ No newline at end of file
+from . import dashboard_controller
+from . import frontdesk_controller
+from . import report_export_controller
+from . import console_agent_controller
+from . import public_api_controller
@@ -0,0 +1,12 @@
+# coding: utf-8
+
+from odoo import http
+from odoo.http import request
+
+
+class ConsoleAgentController(http.Controller):
+
+    @http.route('/playstation/console/heartbeat', type='json', auth='bearer')
+    def heartbeat(self, heartbeats=None):
+        """Ingest a batch of console heartbeats sent by a local agent, authenticated with an API key"""
+        return request.env['console.power.event'].ingest(heartbeats or [])
@@ -3,6 +3,7 @@
 
 from odoo import http, fields, api
 from odoo.http import request
+from odoo.addons.gaming_app.models.report_replica import report_env
 from datetime import datetime, timedelta
 import pytz
 
@@ -12,7 +13,8 @@ class DashboardController(http.Controller):
     @http.route('/playstation/dashboard/data', type='json', auth='user')
     def get_dashboard_data(self, period='today'):
         """API endpoint to get dashboard data"""
-        data = self._get_dashboard_data(period)
+        with report_env(request.env, 'dashboard') as env:
+            data = self._get_dashboard_data(period, env)
         return data
 
     @http.route('/playstation/dashboard/action/<string:action_type>', type='json', auth='user')
@@ -53,8 +55,10 @@ class DashboardController(http.Controller):
         return {'error': 'Unknown action'}
 
     @api.model
-    def _get_dashboard_data(self, period='today'):
-        """Get dashboard statistics for the specified period"""
+    def _get_dashboard_data(self, period='today', env=None):
+        """Get dashboard statistics for the specified period, read through ``env`` (the request's by default)"""
+        env = env or request.env
+        company_domain = [('company_id', '=', env.company.id)]
 
         # Calculate date ranges
         today = fields.Date.today()
@@ -82,42 +86,48 @@ class DashboardController(http.Controller):
             end_datetime = fields.Datetime.to_string(datetime.combine(today, datetime.max.time()))
 
         # Get session statistics
-        sessions = request.env['session.session'].search([
+        sessions = env['session.session'].search(company_domain + [
             ('starting_time', '>=', start_datetime),
             ('starting_time', '<=', end_datetime)
         ])
 
-        active_sessions = request.env['session.session'].search([
+        active_sessions = env['session.session'].search(company_domain + [
             ('state', '=', 'running')
         ])
 
         # Get cafe order statistics
-        cafe_orders = request.env['cafe.order'].search([
+        cafe_orders = env['cafe.order'].search(company_domain + [
             ('create_date', '>=', start_datetime),
             ('create_date', '<=', end_datetime)
         ])
 
-        # Calculate revenue from both sessions and cafe orders
+        # Past days are read from the daily rollup, only today is computed from raw records
         total_revenue = 0
+        if start_date < today:
+            daily_revenue = env['revenue.rollup'].get_daily_revenue(start_date, today - timedelta(days=1))
+            total_revenue += sum(day['sessions'] + day['cafe'] for day in daily_revenue.values())
+
+        today_start = fields.Datetime.to_string(datetime.combine(today, datetime.min.time()))
         for session in sessions:
-            if session.state == 'finished':
+            if session.state == 'finished' and fields.Datetime.to_string(session.starting_time) >= today_start:
                 total_revenue += session.total
 
         for order in cafe_orders:
-            if order.state == 'finished':
+            if order.state == 'finished' and fields.Datetime.to_string(order.create_date) >= today_start:
                 total_revenue += order.total
 
         # Get resource availability
-        rooms_data = self._get_rooms_availability()
-        consoles_data = self._get_consoles_availability()
-        tables_data = self._get_tables_availability()
-        cafe_tables_data = self._get_cafe_tables_availability()
+        resources_data = self._get_resources_availability(env)
+        rooms_data = resources_data['room']
+        consoles_data = resources_data['console']
+        tables_data = resources_data['table']
+        cafe_tables_data = self._get_cafe_tables_availability(env)
 
         # Get recent activities
-        recent_activities = self._get_recent_activities()
+        recent_activities = self._get_recent_activities(env)
 
         # Revenue chart data
-        chart_data = self._get_chart_data(period, start_date, end_date)
+        chart_data = self._get_chart_data(period, start_date, end_date, env)
 
         return {
             'stats': {
@@ -136,69 +146,20 @@ class DashboardController(http.Controller):
             'chart_data': chart_data,
         }
 
-    def _get_rooms_availability(self):
-        """Get private rooms availability"""
-        rooms = request.env['room.name'].search([])
-        occupied_rooms = request.env['session.session'].search([
-            ('state', 'in', ['available', 'running']),
-            ('session_type', '=', 'private')
-        ]).mapped('room_id')
-
-        rooms_data = []
-        for room in rooms:
-            status = 'occupied' if room in occupied_rooms else 'available'
-            rooms_data.append({
-                'id': room.id,
-                'name': room.name,
-                'status': status,
-                'type': room.type_id.name if room.type_id else 'N/A'
-            })
-        return rooms_data
-
-    def _get_consoles_availability(self):
-        """Get gaming consoles availability"""
-        consoles = request.env['console.number'].search([])
-        occupied_consoles = request.env['session.session'].search([
-            ('state', 'in', ['available', 'running']),
-            ('session_type', '=', 'public'),
-            ('individual_type', '=', 'console')
-        ]).mapped('console_id')
-
-        consoles_data = []
-        for console in consoles:
-            status = 'occupied' if console in occupied_consoles else 'available'
-            consoles_data.append({
-                'id': console.id,
-                'name': console.device_num,
-                'status': status,
-                'type': console.type_id.name if console.type_id else 'N/A'
-            })
-        return consoles_data
-
-    def _get_tables_availability(self):
-        """Get gaming tables availability"""
-        tables = request.env['table.tables'].search([])
-        occupied_tables = request.env['session.session'].search([
-            ('state', 'in', ['available', 'running']),
-            ('session_type', '=', 'public'),
-            ('individual_type', '=', 'table')
-        ]).mapped('table_id')
-
-        tables_data = []
-        for table in tables:
-            status = 'occupied' if table in occupied_tables else 'available'
-            tables_data.append({
-                'id': table.id,
-                'name': table.table_num,
-                'status': status,
-                'type': table.type_id.name if table.type_id else 'N/A'
-            })
-        return tables_data
+    def _get_resources_availability(self, env=None):
+        """Get rooms, consoles and tables availability with a single query on the resource registry"""
+        env = env or request.env
+        availability = {'room': [], 'console': [], 'table': []}
+        for resource in env['gaming.resource'].get_availability():
+            availability[resource.pop('kind')].append(resource)
+        return availability
 
-    def _get_cafe_tables_availability(self):
+    def _get_cafe_tables_availability(self, env=None):
         """Get cafe tables availability"""
-        cafe_tables = request.env['cafe.table'].search([])
-        occupied_cafe_tables = request.env['cafe.order'].search([
+        env = env or request.env
+        cafe_tables = env['cafe.table'].search([('company_id', '=', env.company.id)])
+        occupied_cafe_tables = env['cafe.order'].search([
+            ('company_id', '=', env.company.id),
             ('state', 'in', ['available', 'running'])
         ]).mapped('table_id')
 
@@ -212,12 +173,14 @@ class DashboardController(http.Controller):
             })
         return cafe_tables_data
 
-    def _get_recent_activities(self):
+    def _get_recent_activities(self, env=None):
         """Get recent activities from sessions and orders"""
+        env = env or request.env
         activities = []
 
         # Recent sessions
-        recent_sessions = request.env['session.session'].search([
+        recent_sessions = env['session.session'].search([
+            ('company_id', '=', env.company.id),
             ('starting_time', '>=', fields.Datetime.to_string(datetime.now() - timedelta(hours=2)))
         ], order='starting_time desc', limit=10)
         for session in recent_sessions:
@@ -239,7 +202,8 @@ class DashboardController(http.Controller):
                 })
 
         # Recent cafe orders
-        recent_orders = request.env['cafe.order'].search([
+        recent_orders = env['cafe.order'].search([
+            ('company_id', '=', env.company.id),
             ('create_date', '>=', fields.Datetime.to_string(datetime.now() - timedelta(hours=2)))
         ], order='create_date desc', limit=5)
 
@@ -266,8 +230,9 @@ class DashboardController(http.Controller):
                 return f"Table {session.table_id.table_num}"
         return "Unknown"
 
-    def _get_chart_data(self, period, start_date, end_date):
+    def _get_chart_data(self, period, start_date, end_date, env=None):
         """Get chart data for revenue analytics"""
+        env = env or request.env
         chart_data = {'labels': [], 'datasets': []}
 
         if period == 'today':
@@ -277,7 +242,8 @@ class DashboardController(http.Controller):
 
             # Get hourly revenue
             hourly_revenue = [0] * 24
-            sessions = request.env['session.session'].search([
+            sessions = env['session.session'].search([
+                ('company_id', '=', env.company.id),
                 ('starting_time', '>=', fields.Datetime.to_string(datetime.combine(start_date, datetime.min.time()))),
                 ('starting_time', '<=', fields.Datetime.to_string(datetime.combine(start_date, datetime.max.time()))),
                 ('state', '=', 'finished')
@@ -297,29 +263,32 @@ class DashboardController(http.Controller):
                 'fill': True
             }]
 
-        elif period == 'week':
-            # Daily data for week
+        elif period in ('week', 'month'):
+            # Daily data for week/month: past days from the rollup, today from raw sessions
+            rollup = env['revenue.rollup'].get_daily_revenue(start_date, end_date - timedelta(days=1))
             current_date = start_date
             daily_revenue = []
 
             while current_date <= end_date:
-                chart_data['labels'].append(current_date.strftime('%a'))
-
-                day_revenue = 0
-                sessions = request.env['session.session'].search([
-                    ('starting_time', '>=',
-                     fields.Datetime.to_string(datetime.combine(current_date, datetime.min.time()))),
-                    ('starting_time', '<=',
-                     fields.Datetime.to_string(datetime.combine(current_date, datetime.max.time()))),
-                    ('state', '=', 'finished')
-                ])
-
-                for session in sessions:
-                    day_revenue += session.total
+                chart_data['labels'].append(current_date.strftime('%a' if period == 'week' else '%d'))
+
+                if current_date < fields.Date.today():
+                    day_revenue = rollup.get(current_date, {}).get('sessions', 0)
+                else:
+                    day_revenue = 0
+                    sessions = env['session.session'].search([
+                        ('company_id', '=', env.company.id),
+                        ('starting_time', '>=',
+                         fields.Datetime.to_string(datetime.combine(current_date, datetime.min.time()))),
+                        ('starting_time', '<=',
+                         fields.Datetime.to_string(datetime.combine(current_date, datetime.max.time()))),
+                        ('state', '=', 'finished')
+                    ])
+                    for session in sessions:
+                        day_revenue += session.total
 
                 daily_revenue.append(day_revenue)
                 current_date += timedelta(days=1)
-            print('daily_revenue', daily_revenue)
             chart_data['datasets'] = [{
                 'label': 'Daily Revenue',
                 'data': daily_revenue,
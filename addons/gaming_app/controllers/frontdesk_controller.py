@@ -0,0 +1,30 @@
+# coding: utf-8
+
+from odoo import http
+from odoo.http import request
+
+
+class FrontdeskController(http.Controller):
+
+    @http.route('/playstation/frontdesk/sync', type='json', auth='user')
+    def sync_events(self, events=None):
+        """Apply a batch of queued front desk events (start, stop, add_line) in one round trip"""
+        return {
+            'results': request.env['frontdesk.sync.event'].apply_batch(events or []),
+        }
+
+    @http.route('/playstation/frontdesk/customers', type='json', auth='user')
+    def lookup_customers(self, term='', limit=8):
+        """Customers matching a name or phone prefix, best matches first, for the front desk picker"""
+        partners = request.env['res.partner'].frontdesk_lookup(term, min(int(limit), 50))
+        return [{'id': partner.id, 'name': partner.display_name, 'phone': partner.phone or ''} for partner in partners]
+
+    @http.route('/playstation/frontdesk/sessions', type='json', auth='user')
+    def list_sessions(self, domain=None, after=None, limit=80):
+        """One page of sessions; pass the ``after`` cursor of the previous page to get the next one"""
+        sessions = request.env['session.session'].search_keyset(domain, after, min(int(limit), 500))
+        last = sessions[-1:]
+        return {
+            'records': sessions.read(['ref', 'partner_id', 'state', 'starting_time', 'ending_time', 'resource_id']),
+            'after': [last.state, last.id] if last else None,
+        }
@@ -0,0 +1,66 @@
+# coding: utf-8
+
+import threading
+import time
+
+from odoo import http
+from odoo.http import request
+
+DEFAULT_RATE_LIMIT = 60
+RATE_WINDOW = 60
+
+
+class RateLimiter:
+    """Fixed-window request counter per client address, kept in the worker's memory.
+
+    Refused requests are answered before the snapshot is read; they still go through the public authentication
+    and the (cached) lookup of the limit parameter. With several workers the effective limit is per worker.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def hit(self, key, limit):
+        """Count a request of ``key``; return the seconds to wait before retrying, or 0 if it is allowed."""
+        now = time.monotonic()
+        window_start = now - now % self.window
+        with self.lock:
+            if len(self.counters) > 10000:
+                self.counters = {k: v for k, v in self.counters.items() if v[0] == window_start}
+            start, count = self.counters.get(key, (window_start, 0))
+            if start != window_start:
+                start, count = window_start, 0
+            self.counters[key] = (start, count + 1)
+        if count >= limit:
+            return int(start + self.window - now) + 1
+        return 0
+
+
+limiter = RateLimiter(RATE_WINDOW)
+
+
+class PublicApiController(http.Controller):
+
+    @http.route('/playstation/public/availability', type='http', auth='public', methods=['GET'], cors='*',
+                csrf=False, save_session=False)
+    def availability(self, company=None, **kwargs):
+        """Free resources, wait estimates and hourly prices per resource type, for kiosks and the mobile app"""
+        env = request.env(su=True)
+        params = env['ir.config_parameter']
+        retry_after = limiter.hit(request.httprequest.remote_addr,
+                                  int(params.get_param('gaming_app.public_api_rate_limit', DEFAULT_RATE_LIMIT)))
+        if retry_after:
+            return request.make_json_response({'error': 'Too many requests'}, status=429, headers=[
+                ('Retry-After', str(retry_after)),
+            ])
+        company = env['res.company'].browse(int(company)).exists() if company and company.isdigit() \
+            else env.company
+        if not company:
+            return request.make_json_response({'error': 'Unknown company'}, status=404)
+        snapshots = env['availability.snapshot']
+        return request.make_response(snapshots.get_body(company), headers=[
+            ('Content-Type', 'application/json'),
+            ('Cache-Control', 'public, max-age=%d' % snapshots._get_ttl()),
+        ])
@@ -0,0 +1,125 @@
+# coding: utf-8
+
+import csv
+import io
+import tempfile
+
+from werkzeug.exceptions import NotFound
+
+from odoo import http, api, fields
+from odoo.http import request
+from odoo.tools.misc import xlsxwriter
+from odoo.addons.gaming_app.models.report_replica import get_statement_timeout, open_report_cursor, use_replica
+
+EXPORT_REPORTS = {
+    'session': 'session.report',
+    'cafe': 'cafe.report',
+}
+CHUNK_SIZE = 2000
+
+
+class ReportExportController(http.Controller):
+
+    @http.route('/playstation/report/export/<string:report>', type='http', auth='user')
+    def export_report(self, report, file_format='csv', date_from=None, date_to=None, **kwargs):
+        """Stream a session or cafe analysis report as CSV or XLSX with constant memory.
+
+        Rows are read from a server-side cursor in chunks; the date filter is applied in SQL.
+        """
+        model_name = EXPORT_REPORTS.get(report)
+        if not model_name or file_format not in ('csv', 'xlsx'):
+            raise NotFound()
+        request.env[model_name].check_access('read')
+
+        # Read the environment and routing settings now: the rows are generated once the request is over, when
+        # ``request`` is no longer bound
+        cursor_options = {
+            'registry': request.env.registry,
+            'uid': request.env.uid,
+            'context': dict(request.env.context),
+            'replica': use_replica(request.env),
+            'timeout': get_statement_timeout(request.env, model_name),
+        }
+        filename = '%s_report.%s' % (report, file_format)
+        if file_format == 'csv':
+            content_type = 'text/csv; charset=utf-8'
+            body = self._stream_csv(model_name, date_from, date_to, cursor_options)
+        else:
+            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            body = self._stream_xlsx(model_name, date_from, date_to, cursor_options)
+        return request.make_response(body, headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', http.content_disposition(filename)),
+        ])
+
+    def _iter_rows(self, model_name, date_from, date_to, cursor_options):
+        """Yield the header then every row of the report, formatted for export.
+
+        The generator runs after the request cursor is closed, so it opens its own cursor, on the report replica
+        when enabled, with the environment captured in ``cursor_options``.
+        """
+        with open_report_cursor(cursor_options['registry'], cursor_options['replica']) as cr:
+            if cursor_options['timeout']:
+                cr.execute("SET LOCAL statement_timeout = %s", [cursor_options['timeout']])
+            env = api.Environment(cr, cursor_options['uid'], cursor_options['context'])
+            model = env[model_name]
+            columns = [name for name, field in model._fields.items()
+                       if field.store and name != 'id' and field.type not in ('one2many', 'many2many')]
+            yield [model._fields[name].string for name in columns]
+
+            # Raw SQL bypasses the record rules, restrict to the allowed companies explicitly
+            where, params = ['company_id = ANY(%s)'], [env.companies.ids]
+            if date_from:
+                where.append('date >= %s')
+                params.append(fields.Date.to_date(date_from))
+            if date_to:
+                where.append('date <= %s')
+                params.append(fields.Date.to_date(date_to))
+            cr.execute("DECLARE gaming_report_export NO SCROLL CURSOR FOR SELECT %s FROM %s WHERE %s ORDER BY date, id"
+                       % (', '.join('"%s"' % name for name in columns), model._table, ' AND '.join(where)), params)
+            while True:
+                cr.execute("FETCH %s FROM gaming_report_export" % CHUNK_SIZE)
+                rows = cr.fetchall()
+                if not rows:
+                    break
+                yield from self._format_rows(env, model, columns, rows)
+                env.invalidate_all()
+            cr.execute("CLOSE gaming_report_export")
+
+    def _format_rows(self, env, model, columns, rows):
+        names = {}
+        for index, name in enumerate(columns):
+            field = model._fields[name]
+            if field.type == 'many2one':
+                ids = {row[index] for row in rows if row[index]}
+                names[index] = dict(env[field.comodel_name].browse(ids).sudo().mapped(
+                    lambda rec: (rec.id, rec.display_name)))
+            elif field.type == 'selection':
+                names[index] = dict(field._description_selection(env))
+        for row in rows:
+            yield [names[index].get(value, '') if index in names and value else value
+                   for index, value in enumerate(row)]
+
+    def _stream_csv(self, model_name, date_from, date_to, cursor_options):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for count, row in enumerate(self._iter_rows(model_name, date_from, date_to, cursor_options), 1):
+            writer.writerow(['' if value is None else value for value in row])
+            if count % CHUNK_SIZE == 0:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def _stream_xlsx(self, model_name, date_from, date_to, cursor_options):
+        # An xlsx file is a zip archive that can only be sent once complete; constant_memory mode flushes every
+        # row to a temporary file so memory stays flat, and the file is then streamed back in chunks.
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+            worksheet = workbook.add_worksheet()
+            for row_index, row in enumerate(self._iter_rows(model_name, date_from, date_to, cursor_options)):
+                worksheet.write_row(row_index, 0, ['' if value is None else value for value in row])
+            workbook.close()
+            output.seek(0)
+            while chunk := output.read(64 * 1024):
+                yield chunk
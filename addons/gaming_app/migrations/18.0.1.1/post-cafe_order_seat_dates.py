@@ -0,0 +1,27 @@
+# coding: utf-8
+
+
+def migrate(cr, version):
+    """Fill the seat dates of the orders from before they were recorded: from the state audit log when it has the
+    transitions, else from the creation and last write dates."""
+    if not version:
+        return
+    cr.execute("""
+        WITH first_transitions AS (
+            SELECT res_id AS order_id,
+                   MIN(date) FILTER (WHERE new_state = 'running') AS running_date,
+                   MIN(date) FILTER (WHERE new_state = 'finished') AS finished_date
+            FROM state_audit_log
+            WHERE res_model = 'cafe.order' AND new_state IN ('running', 'finished')
+            GROUP BY res_id
+        )
+        UPDATE cafe_order co
+        SET running_date = COALESCE(co.running_date, t.running_date, co.create_date),
+            finished_date = CASE WHEN co.state = 'finished'
+                                 THEN COALESCE(co.finished_date, t.finished_date, co.write_date) END
+        FROM cafe_order o
+        LEFT JOIN first_transitions t ON t.order_id = o.id
+        WHERE co.id = o.id
+          AND ((co.running_date IS NULL AND co.state IN ('running', 'finished'))
+               OR (co.finished_date IS NULL AND co.state = 'finished'))
+    """)
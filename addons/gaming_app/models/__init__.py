@@ -1,3 +1,6 @@
+from . import gaming_resource
+from . import state_audit_log
+from . import res_partner
 from . import session_session
 from . import room_type
 from . import room_name
@@ -8,5 +11,23 @@ from . import table_tables
 from . import table_type
 from . import cafe_order
 from . import cafe_table
+from . import report_replica
 from . import session_report
-from . import cafe_report
\ No newline at end of file
+from . import cafe_report
+from . import cafe_turnover_report
+from . import report_dirty_day
+from . import revenue_rollup
+from . import resource_occupancy
+from . import pricing_simulation
+from . import frontdesk_sync_event
+from . import bar_queue_item
+from . import payment_job
+from . import customer_debt_report
+from . import product_sales_report
+from . import cashier_shift
+from . import console_power_event
+from . import waitlist_entry
+from . import ir_websocket
+from . import partner_activity
+from . import availability_snapshot
+from . import stored_compute_repair
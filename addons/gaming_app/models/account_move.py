@@ -8,3 +8,22 @@ class AccountMove(models.Model):
 
     session_id = fields.Many2one(comodel_name='session.session')
     cafe_id = fields.Many2one(comodel_name='cafe.order')
+    shift_id = fields.Many2one(comodel_name='cashier.shift', readonly=True, copy=False, index='btree_not_null')
+
+    def init(self):
+        super().init()
+        # Balances, payment status and the rollups look up the invoices of a session or order by type
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_move_session_move_type_idx
+            ON account_move (session_id, move_type) WHERE session_id IS NOT NULL
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS account_move_cafe_move_type_idx
+            ON account_move (cafe_id, move_type) WHERE cafe_id IS NOT NULL
+        """)
+
+
+class AccountPayment(models.Model):
+    _inherit = 'account.payment'
+
+    shift_id = fields.Many2one(comodel_name='cashier.shift', readonly=True, copy=False, index='btree_not_null')
@@ -0,0 +1,126 @@
+# coding: utf-8
+
+import json
+import threading
+import time
+
+from odoo import models, fields, api
+
+from .waitlist_entry import SLOTS_SQL
+
+DEFAULT_TTL = 5
+# Advisory lock class of the snapshot rebuilds, the company id being the second key
+SNAPSHOT_LOCK = 4807
+
+# Snapshots already read by this worker, keyed by (database, company): (expiry, json body)
+_worker_snapshots = {}
+_worker_lock = threading.Lock()
+
+# Free resources and price per type, with the wait of a customer arriving now: the next slot after the waiting
+# entries, as the waitlist estimates it (see ``waitlist_entry.REFRESH_SQL``)
+SNAPSHOT_SQL = """
+    WITH """ + SLOTS_SQL + """,
+    types AS (
+        SELECT r.kind, r.type_res_id, r.type_name, MAX(r.price_per_hour) AS price, COUNT(*) AS total,
+               COUNT(*) FILTER (WHERE NOT EXISTS (
+                   SELECT 1 FROM session_session s
+                   WHERE s.resource_id = r.id AND s.state IN ('available', 'running')
+               )) AS free
+        FROM gaming_resource r
+        WHERE r.company_id = %(company_id)s
+        GROUP BY r.kind, r.type_res_id, r.type_name
+    ),
+    waiting AS (
+        SELECT e.kind, e.type_res_id, COUNT(*) AS waiting
+        FROM waitlist_entry e
+        WHERE e.state = 'waiting' AND e.company_id = %(company_id)s
+        GROUP BY e.kind, e.type_res_id
+    )
+    SELECT t.kind, t.type_res_id, t.type_name, t.price, t.total, t.free, COALESCE(w.waiting, 0),
+           k.release_in + (COALESCE(w.waiting, 0) / k.slot_count) * k.typical
+    FROM types t
+    LEFT JOIN waiting w ON w.kind = t.kind AND w.type_res_id = t.type_res_id
+    LEFT JOIN ranked k
+        ON k.kind = t.kind AND k.type_res_id = t.type_res_id
+       AND k.slot = COALESCE(w.waiting, 0) %% k.slot_count + 1
+    ORDER BY t.kind, t.type_name
+"""
+
+
+class AvailabilitySnapshot(models.Model):
+    """Public availability of a company, rebuilt at most once per ``gaming_app.public_api_ttl`` seconds.
+
+    The row is shared by all workers; each worker also keeps the last body it read until it expires, so the
+    public API costs the database one query per worker and period whatever the traffic.
+    """
+    _name = 'availability.snapshot'
+    _description = 'Public Availability Snapshot'
+    _rec_name = 'company_id'
+
+    company_id = fields.Many2one(comodel_name='res.company', required=True, readonly=True, ondelete='cascade')
+    body = fields.Text(readonly=True)
+    generated_at = fields.Datetime(readonly=True)
+
+    _sql_constraints = [
+        ('company_uniq', 'unique(company_id)', 'Only one availability snapshot per company.'),
+    ]
+
+    @api.model
+    def _get_ttl(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param('gaming_app.public_api_ttl', DEFAULT_TTL))
+
+    @api.model
+    def _build(self, company):
+        self.env.cr.execute(SNAPSHOT_SQL, dict(self.env['waitlist.entry']._get_slots_params(), company_id=company.id))
+        types = [{
+            'kind': kind,
+            'type': type_name or 'N/A',
+            'price_per_hour': price or 0.0,
+            'total': total,
+            'free': free,
+            'waiting': waiting,
+            'wait_minutes': 0 if free else round(wait or 0),
+        } for kind, _type_id, type_name, price, total, free, waiting, wait in self.env.cr.fetchall()]
+        return json.dumps({
+            'company': company.name,
+            'currency': company.currency_id.name,
+            'generated_at': fields.Datetime.to_string(fields.Datetime.now()),
+            'types': types,
+        })
+
+    @api.model
+    def get_body(self, company):
+        """JSON body of the public availability of ``company``, from the worker cache or the shared snapshot."""
+        key = (self.env.cr.dbname, company.id)
+        now = time.monotonic()
+        cached = _worker_snapshots.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+        ttl = self._get_ttl()
+        self.env.cr.execute("""
+            SELECT body, EXTRACT(EPOCH FROM (NOW() AT TIME ZONE 'UTC' - generated_at))
+            FROM availability_snapshot WHERE company_id = %s
+        """, [company.id])
+        row = self.env.cr.fetchone()
+        body, age = (row[0], float(row[1])) if row else (None, None)
+        # Only one worker rebuilds an expired snapshot, the others keep serving the previous one meanwhile
+        if body is None or age >= ttl:
+            self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", [SNAPSHOT_LOCK, company.id])
+            if self.env.cr.fetchone()[0] or body is None:
+                body = self._build(company)
+                self.env.cr.execute("""
+                    INSERT INTO availability_snapshot (company_id, body, generated_at,
+                                                       create_uid, create_date, write_uid, write_date)
+                    VALUES (%(company_id)s, %(body)s, NOW() AT TIME ZONE 'UTC',
+                            %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC')
+                    ON CONFLICT (company_id) DO UPDATE SET
+                        body = EXCLUDED.body,
+                        generated_at = EXCLUDED.generated_at,
+                        write_uid = EXCLUDED.write_uid,
+                        write_date = EXCLUDED.write_date
+                """, {'company_id': company.id, 'body': body, 'uid': self.env.uid})
+                age = 0
+        with _worker_lock:
+            _worker_snapshots[key] = (now + max(ttl - (age or 0), 1), body)
+        return body
@@ -0,0 +1,97 @@
+# coding: utf-8
+
+from collections import defaultdict
+
+from odoo import models, fields, api
+
+BAR_QUEUE_CHANNEL = 'gaming_app_bar_queue'
+
+
+class BarQueueItem(models.Model):
+    _name = 'bar.queue.item'
+    _description = 'Bar Preparation Queue Item'
+    _rec_name = 'product_id'
+    _order = 'id'
+
+    cafe_line_id = fields.Many2one(comodel_name='cafe.order.line', readonly=True, ondelete='cascade', index=True)
+    session_line_id = fields.Many2one(comodel_name='session.session.line', readonly=True, ondelete='cascade',
+                                      index=True)
+    company_id = fields.Many2one(comodel_name='res.company', compute='_compute_company_id', store=True, index=True)
+    origin = fields.Char(readonly=True)
+    location = fields.Char(readonly=True)
+    product_id = fields.Many2one(comodel_name='product.product', readonly=True, required=True)
+    quantity = fields.Float(digits='Product Unit of Measure', readonly=True)
+    status = fields.Selection([
+        ('queued', 'Queued'),
+        ('preparing', 'Preparing'),
+        ('served', 'Served'),
+    ], default='queued', required=True, index=True)
+    served_time = fields.Datetime(readonly=True)
+
+    @api.depends('cafe_line_id.order_id.company_id', 'session_line_id.session_id.company_id')
+    def _compute_company_id(self):
+        for item in self:
+            item.company_id = item.cafe_line_id.order_id.company_id or item.session_line_id.session_id.company_id
+
+    @api.model
+    def _create_from_lines(self, cafe_lines=None, session_lines=None):
+        vals_list = []
+        for line in cafe_lines or []:
+            vals_list.append({
+                'cafe_line_id': line.id,
+                'origin': line.order_id.ref,
+                'location': "Cafe %s" % line.order_id.table_id.table_num if line.order_id.table_id else '',
+                'product_id': line.product_id.id,
+                'quantity': line.product_uom_qty,
+            })
+        for line in session_lines or []:
+            session = line.session_id
+            vals_list.append({
+                'session_line_id': line.id,
+                'origin': session.ref,
+                'location': (session.room_id.name or session.console_id.device_num or session.table_id.table_num
+                             or ''),
+                'product_id': line.product_id.id,
+                'quantity': line.product_uom_qty,
+            })
+        items = self.create(vals_list)
+        items._notify_bar()
+        return items
+
+    def _to_dict(self):
+        return [{
+            'id': item.id,
+            'origin': item.origin or '',
+            'location': item.location or '',
+            'product': item.product_id.display_name,
+            'quantity': item.quantity,
+            'status': item.status,
+            'create_date': fields.Datetime.to_string(item.create_date),
+        } for item in self]
+
+    def _notify_bar(self):
+        """Push the items on the channel of their company, which only its users listen to (see ``ir.websocket``)."""
+        by_company = defaultdict(lambda: self.browse())
+        for item in self:
+            by_company[item.company_id] |= item
+        for company, items in by_company.items():
+            self.env['bus.bus']._sendone((company, BAR_QUEUE_CHANNEL), 'bar_queue/updated', {
+                'company_id': company.id,
+                'items': items._to_dict(),
+            })
+
+    @api.model
+    def get_queue(self):
+        """Items of the current company still to be prepared, for the initial load of a bar screen."""
+        return self.search([('company_id', '=', self.env.company.id), ('status', '!=', 'served')])._to_dict()
+
+    def action_preparing(self):
+        self.filtered(lambda item: item.status == 'queued').write({'status': 'preparing'})
+        self._notify_bar()
+
+    def action_served(self):
+        self.filtered(lambda item: item.status != 'served').write({
+            'status': 'served',
+            'served_time': fields.Datetime.now(),
+        })
+        self._notify_bar()
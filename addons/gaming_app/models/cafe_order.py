@@ -5,22 +5,34 @@ from odoo import models, fields, api
 
 class CafeOrder(models.Model):
     _name = 'cafe.order'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['state.audit.mixin', 'frontdesk.customer.mixin', 'mail.thread', 'mail.activity.mixin']
     _description = 'CafeOrder'
     _rec_name = 'ref'
+    _check_company_auto = True
 
     ref = fields.Char(default='New', readonly=True, copy=False)
+    company_id = fields.Many2one(comodel_name='res.company', required=True, default=lambda self: self.env.company)
     partner_id = fields.Many2one(comodel_name='res.partner', required=True)
-    table_id = fields.Many2one(comodel_name='cafe.table', required=True, domain="[('id', 'not in', unavailable_table_ids)]")
+    table_id = fields.Many2one(comodel_name='cafe.table', required=True, domain="[('id', 'not in', unavailable_table_ids)]",
+                               check_company=True)
     cafe_line_ids = fields.One2many(comodel_name='cafe.order.line', inverse_name='order_id')
     currency_id = fields.Many2one(comodel_name='res.currency', compute='_compute_currency')
     total = fields.Monetary(compute='_compute_total', currency_field='currency_id')
     move_ids = fields.One2many(comodel_name='account.move', inverse_name='cafe_id')
+    payment_job_ids = fields.One2many(comodel_name='payment.job', inverse_name='cafe_id')
+    payment_pending = fields.Boolean(compute='_compute_payment_pending')
+    amount_invoiced = fields.Monetary(compute='_compute_balance', currency_field='currency_id', store=True)
+    amount_paid = fields.Monetary(compute='_compute_balance', currency_field='currency_id', store=True)
+    amount_due = fields.Monetary(string='Outstanding', compute='_compute_balance', currency_field='currency_id',
+                                 store=True)
     state = fields.Selection([
         ('available', 'Available'),
         ('running', 'Running'),
         ('finished', 'Finished'),
     ], default="available", tracking=True)
+    running_date = fields.Datetime('Seated At', readonly=True, copy=False)
+    finished_date = fields.Datetime('Left At', readonly=True, copy=False)
+    finished_uid = fields.Many2one(comodel_name='res.users', string='Finished By', readonly=True, copy=False)
     payment_status = fields.Selection([
         ('not_paid', 'Not Paid'),
         ('in_payment', 'In Payment'),
@@ -34,6 +46,43 @@ class CafeOrder(models.Model):
     ], compute='_compute_payment_status')
     unavailable_table_ids = fields.Many2many(comodel_name='cafe.table', compute='_compute_table_domain', store=True)
 
+    def init(self):
+        # Every dashboard and report path filters on the company first
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_company_state_idx
+            ON cafe_order (company_id, state)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_company_create_date_idx
+            ON cafe_order (company_id, create_date)
+        """)
+        # The incremental refreshes of the reports look up the recent writes
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_write_date_idx
+            ON cafe_order (write_date)
+        """)
+        # Open orders hold their table: used by the table availability domain and the dashboard
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_open_table_idx
+            ON cafe_order (company_id, table_id) WHERE state IN ('available', 'running')
+        """)
+        # Cashier shift totals: the orders a cashier finished during the shift
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_finished_uid_finished_date_idx
+            ON cafe_order (finished_uid, finished_date) WHERE state = 'finished'
+        """)
+        # Unpaid balances of the customer profiles: the few finished orders that are not fully paid
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_partner_due_idx
+            ON cafe_order (partner_id, company_id) WHERE state = 'finished' AND amount_due != 0
+        """)
+        # Seat ranges of the finished orders, for the overlap queries of the turnover report
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_seat_range_idx
+            ON cafe_order USING gist (tsrange(running_date, finished_date))
+            WHERE state = 'finished' AND finished_date > running_date
+        """)
+
     @api.model_create_multi
     def create(self, vals_list):
         for vals in vals_list:
@@ -41,9 +90,23 @@ class CafeOrder(models.Model):
 
         return super().create(vals_list)
 
+    def write(self, vals):
+        # The turnover report finds the new days of the orders from their write_date, not the days they leave
+        if {'state', 'company_id', 'table_id', 'running_date', 'finished_date'}.intersection(vals):
+            self.env['cafe.turnover.report']._mark_orders(self)
+        return super().write(vals)
+
+    def unlink(self):
+        finished = self.filtered(lambda o: o.state == 'finished')
+        self.env['report.dirty.day']._mark('revenue', [order.create_date.date() for order in finished])
+        self.env['cafe.turnover.report']._mark_orders(finished)
+        self.env['product.sales.report']._forget('cafe', parent_ids=self.ids)
+        return super().unlink()
+
+    @api.depends('company_id')
     def _compute_currency(self):
         for session in self:
-            session.currency_id = self.env.company.currency_id
+            session.currency_id = session.company_id.currency_id or self.env.company.currency_id
 
     @api.depends('cafe_line_ids', 'cafe_line_ids.discount_included', 'cafe_line_ids.discount',
                  'cafe_line_ids.product_uom_qty')
@@ -53,10 +116,24 @@ class CafeOrder(models.Model):
 
     @api.depends('table_id')
     def _compute_table_domain(self):
+        tables = self.env['cafe.order'].search([('state', 'in', ('available', 'running'))]).mapped('table_id')
         for order in self:
-            tables = self.env['cafe.order'].search([('state', 'in', ('available', 'running'))])
-            order.unavailable_table_ids = tables.mapped('table_id')
+            order.unavailable_table_ids = tables
+
+
+    @api.depends('cafe_line_ids.discount_included', 'move_ids.move_type', 'move_ids.state',
+                 'move_ids.amount_total', 'move_ids.amount_residual')
+    def _compute_balance(self):
+        for rec in self:
+            invoices = rec.move_ids.filtered(lambda m: m.move_type == 'out_invoice' and m.state == 'posted')
+            rec.amount_invoiced = sum(invoices.mapped('amount_total'))
+            rec.amount_paid = rec.amount_invoiced - sum(invoices.mapped('amount_residual'))
+            rec.amount_due = rec.total - rec.amount_paid
 
+    @api.depends('payment_job_ids.state')
+    def _compute_payment_pending(self):
+        for rec in self:
+            rec.payment_pending = any(job.state == 'pending' for job in rec.payment_job_ids)
 
     @api.depends('move_ids.status_in_payment')
     def _compute_payment_status(self):
@@ -68,10 +145,17 @@ class CafeOrder(models.Model):
                 order.payment_status = None
 
     def action_running(self):
-        self.state = 'running'
+        self.filtered(lambda o: o.state == 'available').write({
+            'state': 'running',
+            'running_date': fields.Datetime.now(),
+        })
 
     def action_finished(self):
-        self.state = 'finished'
+        orders = self.filtered(lambda o: o.state != 'finished')
+        now = fields.Datetime.now()
+        orders.filtered(lambda o: not o.running_date).running_date = now
+        orders.write({'state': 'finished', 'finished_date': now, 'finished_uid': self.env.uid})
+        self.env['partner.activity']._record_cafe_orders(orders)
 
     def action_create_invoice(self):
         return {
@@ -97,7 +181,7 @@ class CafeOrder(models.Model):
 class CafeOrderLine(models.Model):
     _name = 'cafe.order.line'
 
-    order_id = fields.Many2one(comodel_name='cafe.order')
+    order_id = fields.Many2one(comodel_name='cafe.order', index=True)
     product_template_id = fields.Many2one(
         string="Product Template",
         comodel_name='product.template',
@@ -146,6 +230,25 @@ class CafeOrderLine(models.Model):
         digits='Discount',
         store=True, readonly=False, precompute=True)
 
+    def init(self):
+        # The incremental refreshes of the product sales report and of the revenue rollup look up the recent writes
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_order_line_write_date_idx
+            ON cafe_order_line (write_date)
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['bar.queue.item']._create_from_lines(cafe_lines=lines)
+        return lines
+
+    def unlink(self):
+        orders = self.order_id.filtered(lambda o: o.state == 'finished')
+        self.env['report.dirty.day']._mark('revenue', [order.create_date.date() for order in orders])
+        self.env['product.sales.report']._forget('cafe', line_ids=self.ids)
+        return super().unlink()
+
     @api.depends('product_uom_qty', 'discount', 'price_unit')
     def _compute_disc_excl(self):
         for line in self:
@@ -3,6 +3,7 @@ from odoo import models, fields, tools
 
 class CafeReport(models.Model):
     _name = "cafe.report"
+    _inherit = ['report.replica.mixin']
     _description = "Cafe Analysis Report"
     _auto = False
     _rec_name = 'date'
@@ -49,6 +50,7 @@ class CafeReport(models.Model):
     # Financial Analysis
     total = fields.Monetary('Total Amount', readonly=True, currency_field='currency_id')
     currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
 
     # Order Line Analysis
     product_count = fields.Integer('Products Count', readonly=True)
@@ -66,13 +68,14 @@ class CafeReport(models.Model):
     # Performance Indicators
     items_per_order = fields.Float('Items per Order', readonly=True)
     revenue_per_table = fields.Monetary('Revenue per Table', readonly=True, currency_field='currency_id')
+    seat_time = fields.Float('Seat Time (Minutes)', readonly=True)
 
     def init(self):
         tools.drop_view_if_exists(self.env.cr, self._table)
         self.env.cr.execute("""CREATE or REPLACE VIEW %s as (
             SELECT 
                 -- Primary Key
-                row_number() OVER () AS id,
+                co.id AS id,
 
                 -- Date Analysis (using create_date as cafe.order doesn't have explicit date field)
                 DATE(co.create_date) AS date,
@@ -119,6 +122,7 @@ class CafeReport(models.Model):
                      WHERE col.order_id = co.id), 0.0
                 ) AS total,
                 comp.currency_id AS currency_id,
+                co.company_id AS company_id,
 
                 -- Order Line Analysis
                 COALESCE(
@@ -187,10 +191,13 @@ class CafeReport(models.Model):
                     (SELECT SUM(col.discount_included)
                      FROM cafe_order_line col
                      WHERE col.order_id = co.id), 0.0
-                ) AS revenue_per_table
+                ) AS revenue_per_table,
+
+                -- Time the table was held, from seating to leaving
+                COALESCE(EXTRACT(EPOCH FROM (co.finished_date - co.running_date)) / 60.0, 0.0) AS seat_time
 
             FROM cafe_order co
-            LEFT JOIN res_company comp ON comp.id = 1
+            LEFT JOIN res_company comp ON comp.id = co.company_id
             LEFT JOIN cafe_table ct ON ct.id = co.table_id
 
             WHERE co.create_date IS NOT NULL
@@ -10,3 +10,5 @@ class CafeTable(models.Model):
 
     sequence = fields.Integer('Sequence', default=1)
     table_num = fields.Char(required=True)
+    company_id = fields.Many2one(comodel_name='res.company', required=True, index=True,
+                                 default=lambda self: self.env.company)
@@ -0,0 +1,150 @@
+# coding: utf-8
+
+from datetime import timedelta
+
+import pytz
+
+from odoo import models, fields, api
+
+from .revenue_rollup import DIRTY_MARGIN
+
+# Seat range of an order in the local time of its company, and the local days it overlaps: days start at the
+# company's midnight, not UTC's
+LOCAL_SEAT_SQL = """
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(rp.tz, 'UTC') AS tz
+        FROM res_company rc
+        JOIN res_partner rp ON rp.id = rc.partner_id
+        WHERE rc.id = co.company_id
+    ) company
+    CROSS JOIN LATERAL (
+        SELECT tsrange(t.running, GREATEST(t.running, t.finished)) AS seat
+        FROM (SELECT co.running_date AT TIME ZONE 'UTC' AT TIME ZONE company.tz AS running,
+                     co.finished_date AT TIME ZONE 'UTC' AT TIME ZONE company.tz AS finished) t
+    ) r
+    CROSS JOIN LATERAL generate_series(date_trunc('day', lower(r.seat)), upper(r.seat), interval '1 day') day
+"""
+
+# Seat time of every finished order split on the days it overlaps (range intersection with each day), turns and
+# revenue counted on the day the table was seated. Only the orders overlapping the given days are read, through
+# the GiST index on their seat range, widened by a day on both sides to cover any UTC offset.
+DAYS_SQL = """
+    SELECT
+        co.company_id,
+        co.table_id,
+        day::date AS date,
+        COUNT(*) FILTER (WHERE lower(r.seat) >= day) AS turns,
+        SUM(EXTRACT(EPOCH FROM upper(r.seat * tsrange(day, day + interval '1 day'))
+                             - lower(r.seat * tsrange(day, day + interval '1 day')))) / 60.0 AS seat_minutes,
+        COALESCE(SUM(lines.amount) FILTER (WHERE lower(r.seat) >= day), 0.0) AS revenue
+    FROM cafe_order co
+""" + LOCAL_SEAT_SQL + """
+    LEFT JOIN LATERAL (
+        SELECT SUM(l.discount_included) AS amount FROM cafe_order_line l WHERE l.order_id = co.id
+    ) lines ON TRUE
+    WHERE co.state = 'finished'
+      AND co.finished_date > co.running_date
+      AND tsrange(co.running_date, co.finished_date)
+          && tsrange(%(date_from)s::timestamp - interval '1 day', %(date_to)s::timestamp + interval '1 day')
+      AND day >= %(date_from)s::timestamp AND day < %(date_to)s::timestamp
+      AND {day_filter}
+      AND NOT isempty(r.seat * tsrange(day, day + interval '1 day'))
+    GROUP BY co.company_id, co.table_id, day
+"""
+
+
+class CafeTurnoverReport(models.Model):
+    _name = 'cafe.turnover.report'
+    _description = 'Cafe Table Turnover'
+    _rec_name = 'table_id'
+    _order = 'date desc, table_id'
+
+    date = fields.Date(readonly=True, required=True)
+    company_id = fields.Many2one(comodel_name='res.company', readonly=True, required=True)
+    table_id = fields.Many2one(comodel_name='cafe.table', string='Table', readonly=True, required=True)
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    turns = fields.Integer(readonly=True, help="Orders seated at the table on this day.")
+    seat_minutes = fields.Float('Seat Time (Minutes)', readonly=True)
+    seat_hours = fields.Float(readonly=True)
+    revenue = fields.Monetary(readonly=True, currency_field='currency_id')
+    revenue_per_seat_hour = fields.Monetary(readonly=True, currency_field='currency_id', aggregator='avg',
+                                            help="Daily value; divide the revenue by the seat hours for a "
+                                                 "weighted figure over several days.")
+
+    _sql_constraints = [
+        ('day_table_uniq', 'unique(date, table_id)', 'A table has one turnover row per day.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS cafe_turnover_report_company_date_idx
+            ON cafe_turnover_report (company_id, date)
+        """)
+
+    @api.model
+    def _refresh_days(self, date_from, date_to, days=None):
+        """Recompute the rows of the days in ``[date_from, date_to)``, or only of ``days`` in that span."""
+        self.env.flush_all()
+        params = {'date_from': date_from, 'date_to': date_to, 'days': days, 'uid': self.env.uid}
+        self.env.cr.execute("""
+            DELETE FROM cafe_turnover_report
+            WHERE date >= %(date_from)s AND date < %(date_to)s
+              AND (%(days)s::date[] IS NULL OR date = ANY(%(days)s::date[]))
+        """, params)
+        day_filter = 'day::date = ANY(%(days)s::date[])' if days is not None else 'TRUE'
+        self.env.cr.execute("""
+            INSERT INTO cafe_turnover_report (
+                company_id, table_id, date, turns, seat_minutes, seat_hours, revenue, revenue_per_seat_hour,
+                create_uid, create_date, write_uid, write_date)
+            SELECT d.company_id, d.table_id, d.date, d.turns, d.seat_minutes, d.seat_minutes / 60.0, d.revenue,
+                   CASE WHEN d.seat_minutes > 0 THEN d.revenue / (d.seat_minutes / 60.0) ELSE 0.0 END,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (""" + DAYS_SQL.format(day_filter=day_filter) + """) d
+        """, params)
+        self.invalidate_model()
+
+    @api.model
+    def _mark_orders(self, orders):
+        """Mark the local days the finished ``orders`` are counted on, before they are changed or deleted."""
+        days = []
+        for order in orders.filtered(lambda o: o.state == 'finished' and o.running_date and o.finished_date):
+            tz = pytz.timezone(order.company_id.partner_id.tz or 'UTC')
+            first, last = (pytz.utc.localize(date).astimezone(tz).date()
+                           for date in (order.running_date, order.finished_date))
+            days += [first + timedelta(days=n) for n in range((last - first).days + 1)]
+        self.env['report.dirty.day']._mark('turnover', days)
+
+    @api.model
+    def rebuild(self):
+        """Rebuild the whole table from the finished orders."""
+        self.env.flush_all()
+        self.env.cr.execute("SELECT MIN(running_date), MAX(finished_date) FROM cafe_order WHERE state = 'finished'")
+        first, last = self.env.cr.fetchone()
+        self.env.cr.execute("TRUNCATE cafe_turnover_report")
+        self.env['report.dirty.day']._pop('turnover')
+        if first:
+            # One more day on both sides for the local days of the companies' timezones
+            self._refresh_days(fields.Date.subtract(first.date(), days=1), fields.Date.add(last.date(), days=2))
+
+    @api.model
+    def _cron_refresh_turnover(self):
+        params = self.env['ir.config_parameter'].sudo()
+        now = fields.Datetime.now()
+        last_run = params.get_param('gaming_app.cafe_turnover_last_run')
+        self.env.flush_all()
+        if not last_run:
+            self.rebuild()
+        else:
+            # Local days overlapped by the orders finished or edited since the last run, with a margin for the
+            # transactions that were still running then, and those of the orders deleted or reopened since
+            self.env.cr.execute("""
+                SELECT DISTINCT day::date
+                FROM cafe_order co
+            """ + LOCAL_SEAT_SQL + """
+                WHERE co.write_date >= %s AND co.state = 'finished' AND co.finished_date > co.running_date
+            """, [fields.Datetime.to_datetime(last_run) - DIRTY_MARGIN])
+            days = sorted({row[0] for row in self.env.cr.fetchall()}.union(
+                self.env['report.dirty.day']._pop('turnover')))
+            if days:
+                self._refresh_days(days[0], fields.Date.add(days[-1], days=1), days)
+        params.set_param('gaming_app.cafe_turnover_last_run', fields.Datetime.to_string(now))
@@ -0,0 +1,133 @@
+# coding: utf-8
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+
+
+class CashierShift(models.Model):
+    _name = 'cashier.shift'
+    _description = 'Cashier Shift'
+    _order = 'open_time desc'
+    _check_company_auto = True
+
+    name = fields.Char(compute='_compute_name', store=True)
+    user_id = fields.Many2one(comodel_name='res.users', string='Cashier', required=True, readonly=True,
+                              default=lambda self: self.env.user, index=True)
+    company_id = fields.Many2one(comodel_name='res.company', required=True, readonly=True,
+                                 default=lambda self: self.env.company)
+    journal_id = fields.Many2one(comodel_name='account.journal', required=True, check_company=True,
+                                 domain="[('type', '=', 'cash')]",
+                                 default=lambda self: self.env['account.journal'].search(
+                                     [('type', '=', 'cash'), ('company_id', '=', self.env.company.id)], limit=1))
+    open_time = fields.Datetime(required=True, readonly=True, default=fields.Datetime.now)
+    close_time = fields.Datetime(readonly=True)
+    state = fields.Selection([
+        ('open', 'Open'),
+        ('closed', 'Closed'),
+    ], default='open', required=True, readonly=True)
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    move_ids = fields.One2many(comodel_name='account.move', inverse_name='shift_id')
+    payment_ids = fields.One2many(comodel_name='account.payment', inverse_name='shift_id')
+
+    # Totals, refreshed on demand while open and frozen on close
+    session_count = fields.Integer(readonly=True)
+    session_total = fields.Monetary(currency_field='currency_id', readonly=True)
+    cafe_count = fields.Integer('Cafe Orders Count', readonly=True)
+    cafe_total = fields.Monetary(currency_field='currency_id', readonly=True)
+    invoice_count = fields.Integer(readonly=True)
+    invoiced_total = fields.Monetary(currency_field='currency_id', readonly=True)
+    payment_count = fields.Integer(readonly=True)
+    payments_total = fields.Monetary(currency_field='currency_id', readonly=True)
+    expected_cash = fields.Monetary(currency_field='currency_id', readonly=True)
+    outstanding_total = fields.Monetary(currency_field='currency_id', readonly=True)
+    counted_cash = fields.Monetary(currency_field='currency_id')
+    cash_difference = fields.Monetary(compute='_compute_cash_difference', currency_field='currency_id', store=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS cashier_shift_one_open_per_company_user
+            ON cashier_shift (company_id, user_id) WHERE state = 'open'
+        """)
+
+    @api.depends('user_id', 'open_time')
+    def _compute_name(self):
+        for shift in self:
+            shift.name = "%s - %s" % (shift.user_id.name or '', fields.Datetime.to_string(shift.open_time) or '')
+
+    @api.depends('counted_cash', 'expected_cash')
+    def _compute_cash_difference(self):
+        for shift in self:
+            shift.cash_difference = shift.counted_cash - shift.expected_cash
+
+    @api.model
+    def _get_open_shift(self):
+        return self.search([('user_id', '=', self.env.uid), ('company_id', '=', self.env.company.id),
+                            ('state', '=', 'open')], limit=1)
+
+    def _get_totals(self, close_time):
+        """Shift totals from grouped SQL aggregates over the shift's moves and payments, and over the sessions and
+        cafe orders its cashier finished during the shift.
+
+        Only the shift's own cashier is counted, so that overlapping shifts never share revenue and the frozen
+        totals can be reconciled against the cash drawer.
+        """
+        self.ensure_one()
+        self.env.flush_all()
+        cr = self.env.cr
+        window = {'open': self.open_time, 'close': close_time, 'shift_id': self.id, 'user_id': self.user_id.id,
+                  'journal_id': self.journal_id.id, 'company_id': self.company_id.id}
+        cr.execute("""
+            SELECT COUNT(*), COALESCE(SUM(amount_paid + amount_due), 0.0), COALESCE(SUM(amount_due), 0.0)
+            FROM session_session
+            WHERE finished_uid = %(user_id)s AND state = 'finished'
+              AND ending_time >= %(open)s AND ending_time < %(close)s AND company_id = %(company_id)s
+        """, window)
+        session_count, session_total, session_due = cr.fetchone()
+        cr.execute("""
+            SELECT COUNT(*), COALESCE(SUM(amount_paid + amount_due), 0.0), COALESCE(SUM(amount_due), 0.0)
+            FROM cafe_order
+            WHERE finished_uid = %(user_id)s AND state = 'finished'
+              AND finished_date >= %(open)s AND finished_date < %(close)s AND company_id = %(company_id)s
+        """, window)
+        cafe_count, cafe_total, cafe_due = cr.fetchone()
+        cr.execute("""
+            SELECT COUNT(*), COALESCE(SUM(amount_total), 0.0)
+            FROM account_move
+            WHERE shift_id = %(shift_id)s AND state = 'posted' AND move_type = 'out_invoice'
+        """, window)
+        invoice_count, invoiced_total = cr.fetchone()
+        cr.execute("""
+            SELECT COUNT(*), COALESCE(SUM(amount), 0.0),
+                   COALESCE(SUM(amount) FILTER (WHERE journal_id = %(journal_id)s), 0.0)
+            FROM account_payment
+            WHERE shift_id = %(shift_id)s AND state NOT IN ('draft', 'canceled', 'rejected')
+        """, window)
+        payment_count, payments_total, expected_cash = cr.fetchone()
+        return {
+            'session_count': session_count,
+            'session_total': session_total,
+            'cafe_count': cafe_count,
+            'cafe_total': cafe_total,
+            'invoice_count': invoice_count,
+            'invoiced_total': invoiced_total,
+            'payment_count': payment_count,
+            'payments_total': payments_total,
+            'expected_cash': expected_cash,
+            'outstanding_total': session_due + cafe_due,
+        }
+
+    def action_refresh(self):
+        for shift in self.filtered(lambda s: s.state == 'open'):
+            shift.write(shift._get_totals(fields.Datetime.now()))
+
+    def action_close(self):
+        for shift in self:
+            if shift.state != 'open':
+                raise ValidationError("This shift is already closed.")
+            close_time = fields.Datetime.now()
+            shift.write(dict(shift._get_totals(close_time), close_time=close_time, state='closed'))
+
+    def write(self, vals):
+        if set(vals) - {'counted_cash'} and any(shift.state == 'closed' for shift in self):
+            raise ValidationError("The totals of a closed shift are frozen and can't be modified.")
+        return super().write(vals)
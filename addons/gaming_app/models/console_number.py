@@ -2,12 +2,20 @@
 
 from odoo import models, fields
 
+from .console_power_event import POWER_STATES
+
 
 class ConsoleNumber(models.Model):
     _name = 'console.number'
+    _inherit = ['gaming.resource.mixin']
     _description = 'Console Number'
     _rec_name = 'device_num'
 
+    _resource_kind = 'console'
+    _resource_name_field = 'device_num'
+
     sequence = fields.Integer('Sequence', default=1)
     device_num = fields.Char(required=True)
     type_id = fields.Many2one(comodel_name='console.type', required=True)
+    power_state = fields.Selection(POWER_STATES, default='off', readonly=True, copy=False)
+    last_heartbeat = fields.Datetime(readonly=True, copy=False)
@@ -0,0 +1,156 @@
+# coding: utf-8
+
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+POWER_STATES = [
+    ('off', 'Off'),
+    ('idle', 'Idle'),
+    ('active', 'Active'),
+]
+# last_heartbeat is only rewritten once this much time has passed, so a steady stream of beats costs no writes
+HEARTBEAT_TOUCH_INTERVAL = timedelta(seconds=60)
+# A powered console that sends nothing for this long is considered switched off
+HEARTBEAT_TIMEOUT = timedelta(minutes=3)
+
+
+class ConsolePowerEvent(models.Model):
+    _name = 'console.power.event'
+    _description = 'Console Power Event'
+    _rec_name = 'console_id'
+    _order = 'date desc, id desc'
+
+    console_id = fields.Many2one(comodel_name='console.number', required=True, readonly=True, index=True,
+                                 ondelete='cascade')
+    state = fields.Selection(POWER_STATES, required=True, readonly=True)
+    date = fields.Datetime(required=True, readonly=True)
+    session_id = fields.Many2one(comodel_name='session.session', readonly=True, ondelete='set null')
+
+    @api.model
+    def _get_beat_state(self, beat):
+        if not beat.get('power'):
+            return 'off'
+        return 'active' if beat.get('active') else 'idle'
+
+    @api.model
+    def ingest(self, heartbeats):
+        """Ingest a batch of heartbeats from the console agents.
+
+        Each heartbeat is a dict with the ``console`` device number, ``power`` and ``active`` booleans and the
+        agent ``time`` (UTC, server format). Only state changes are stored; repeated beats of an unchanged
+        console just refresh its ``last_heartbeat`` once a minute, in a single statement for the whole batch.
+        """
+        now = fields.Datetime.now()
+        keys = {beat.get('console') for beat in heartbeats if beat.get('console')}
+        consoles = {console.device_num: console
+                    for console in self.env['console.number'].search([('device_num', 'in', list(keys))])}
+        current = {console.id: console.power_state for console in consoles.values()}
+        transitions = []
+        seen = set()
+        unknown = set()
+        accepted = 0
+        for beat in sorted(heartbeats, key=lambda b: b.get('time') or ''):
+            console = consoles.get(beat.get('console'))
+            if not console:
+                unknown.add(beat.get('console') or '')
+                continue
+            accepted += 1
+            seen.add(console.id)
+            state = self._get_beat_state(beat)
+            if current[console.id] != state:
+                date = fields.Datetime.to_datetime(beat['time']) if beat.get('time') else now
+                transitions.append((console, state, min(date, now)))
+                current[console.id] = state
+
+        if seen:
+            self.env['console.number'].flush_model(['last_heartbeat'])
+            self.env.cr.execute("""
+                UPDATE console_number SET last_heartbeat = %(now)s
+                WHERE id = ANY(%(ids)s) AND (last_heartbeat IS NULL OR last_heartbeat < %(touch)s)
+            """, {'now': now, 'ids': list(seen), 'touch': now - HEARTBEAT_TOUCH_INTERVAL})
+            self.env['console.number'].invalidate_model(['last_heartbeat'])
+        self._apply_transitions(transitions)
+        return {
+            'accepted': accepted,
+            'changes': len(transitions),
+            'unknown': sorted(unknown),
+        }
+
+    @api.model
+    def _apply_transitions(self, transitions):
+        """Store the power state changes and start, flag or finish the consoles' sessions in bulk."""
+        if not transitions:
+            return
+        Session = self.env['session.session']
+        final = {}
+        for console, state, date in transitions:
+            final[console] = (state, date)
+
+        by_state = defaultdict(lambda: self.env['console.number'])
+        for console, (state, _date) in final.items():
+            by_state[state] |= console
+        for state, consoles in by_state.items():
+            consoles.write({'power_state': state})
+
+        consoles = self.env['console.number'].concat(*final)
+        open_sessions = {session.console_id: session for session in Session.search([
+            ('individual_type', '=', 'console'),
+            ('console_id', 'in', consoles.ids),
+            ('state', 'in', ('available', 'running')),
+        ])}
+
+        to_create, to_run, to_finish = [], Session, defaultdict(lambda: Session)
+        flags = defaultdict(lambda: Session)
+        for console, (state, date) in final.items():
+            session = open_sessions.get(console)
+            if state == 'active':
+                if not session:
+                    to_create.append({
+                        'session_type': 'public',
+                        'individual_type': 'console',
+                        'console_id': console.id,
+                        'partner_id': self.env.ref('gaming_app.res_partner_walk_in').id,
+                        'starting_time': date,
+                        'company_id': console.company_id.id,
+                        'agent_flag': 'auto_started',
+                    })
+                elif session.state == 'available':
+                    to_run |= session
+                elif session.agent_flag == 'idle':
+                    flags[False] |= session
+            elif state == 'idle' and session and session.state == 'running':
+                flags['idle'] |= session
+            elif state == 'off' and session and session.state == 'running' and date > session.starting_time:
+                to_finish[date] |= session
+
+        sessions = Session.create(to_create) if to_create else Session
+        to_run.action_running()
+        for flag, flagged in flags.items():
+            flagged.write({'agent_flag': flag})
+        for date, finished in to_finish.items():
+            finished.write({'agent_flag': 'auto_finished'})
+            finished._set_finished(date)
+        session_by_console = {**open_sessions, **{session.console_id: session for session in sessions}}
+
+        self.create([{
+            'console_id': console.id,
+            'state': state,
+            'date': date,
+            'session_id': session_by_console.get(console, Session).id,
+        } for console, state, date in transitions])
+
+    @api.model
+    def _cron_detect_silent_consoles(self):
+        """Switch off the consoles whose agent stopped sending heartbeats, finishing their sessions."""
+        now = fields.Datetime.now()
+        consoles = self.env['console.number'].search([
+            ('power_state', '!=', 'off'),
+            ('last_heartbeat', '<', now - HEARTBEAT_TIMEOUT),
+        ])
+        self._apply_transitions([(console, 'off', console.last_heartbeat) for console in consoles])
+
+    @api.autovacuum
+    def _gc_power_events(self):
+        self.search([('date', '<', fields.Datetime.now() - timedelta(days=90))]).unlink()
@@ -5,8 +5,11 @@ from odoo import models, fields, api
 
 class ConsoleType(models.Model):
     _name = 'console.type'
+    _inherit = ['gaming.resource.type.mixin']
     _description = 'ConsoleType'
 
+    _resource_model = 'console.number'
+
     sequence = fields.Integer('Sequence', default=1)
     name = fields.Char(required=True)
     price_per_hour = fields.Integer(string='Price/H', required=True)
@@ -0,0 +1,64 @@
+from odoo import models, fields, tools
+
+
+class CustomerDebtReport(models.Model):
+    _name = "customer.debt.report"
+    _description = "Customer Debt Report"
+    _auto = False
+    _rec_name = 'ref'
+    _order = 'date desc'
+
+    date = fields.Date('Date', readonly=True)
+    ref = fields.Char('Reference', readonly=True)
+    origin = fields.Selection([
+        ('session', 'Session'),
+        ('cafe', 'Cafe'),
+    ], string='Origin', readonly=True)
+    session_id = fields.Many2one('session.session', string='Session', readonly=True)
+    cafe_id = fields.Many2one('cafe.order', string='Cafe Order', readonly=True)
+    partner_id = fields.Many2one('res.partner', string='Customer', readonly=True)
+    amount_invoiced = fields.Monetary('Invoiced', readonly=True, currency_field='currency_id')
+    amount_paid = fields.Monetary('Paid', readonly=True, currency_field='currency_id')
+    amount_due = fields.Monetary('Outstanding', readonly=True, currency_field='currency_id')
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""CREATE or REPLACE VIEW %s as (
+            SELECT
+                s.id * 2 AS id,
+                DATE(s.starting_time) AS date,
+                s.ref AS ref,
+                'session' AS origin,
+                s.id AS session_id,
+                NULL::integer AS cafe_id,
+                s.partner_id AS partner_id,
+                s.amount_invoiced AS amount_invoiced,
+                s.amount_paid AS amount_paid,
+                s.amount_due AS amount_due,
+                comp.currency_id AS currency_id,
+                s.company_id AS company_id
+            FROM session_session s
+            LEFT JOIN res_company comp ON comp.id = s.company_id
+            WHERE s.state = 'finished' AND s.amount_due > 0.005
+
+            UNION ALL
+
+            SELECT
+                co.id * 2 + 1 AS id,
+                DATE(co.create_date) AS date,
+                co.ref AS ref,
+                'cafe' AS origin,
+                NULL::integer AS session_id,
+                co.id AS cafe_id,
+                co.partner_id AS partner_id,
+                co.amount_invoiced AS amount_invoiced,
+                co.amount_paid AS amount_paid,
+                co.amount_due AS amount_due,
+                comp.currency_id AS currency_id,
+                co.company_id AS company_id
+            FROM cafe_order co
+            LEFT JOIN res_company comp ON comp.id = co.company_id
+            WHERE co.state = 'finished' AND co.amount_due > 0.005
+        )""" % (self._table,))
@@ -0,0 +1,174 @@
+# coding: utf-8
+
+import logging
+
+import psycopg2
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError, ValidationError
+
+RESOURCE_FIELDS = {
+    'room': 'room_id',
+    'console': 'console_id',
+    'table': 'table_id',
+}
+
+_logger = logging.getLogger(__name__)
+
+
+class FrontdeskSyncEvent(models.Model):
+    _name = 'frontdesk.sync.event'
+    _description = 'Front Desk Sync Event'
+    _rec_name = 'key'
+    _order = 'id desc'
+
+    key = fields.Char(required=True, readonly=True, index=True)
+    event_type = fields.Selection([
+        ('start', 'Start'),
+        ('stop', 'Stop'),
+        ('add_line', 'Add Line'),
+    ], required=True, readonly=True)
+    client_time = fields.Datetime(readonly=True)
+    session_id = fields.Many2one(comodel_name='session.session', readonly=True, ondelete='set null')
+    status = fields.Selection([
+        ('applied', 'Applied'),
+        ('conflict', 'Conflict'),
+        ('rejected', 'Rejected'),
+    ], readonly=True)
+    message = fields.Char(readonly=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'A front desk event with this idempotency key was already synced.'),
+    ]
+
+    @api.model
+    def apply_batch(self, events):
+        """Apply queued front desk events in client time order.
+
+        Each event is a dict with an idempotency ``key``, a ``type`` (start, stop or add_line) and the client
+        ``time`` (UTC, server format). Start events carry the session ``values``; stop and add_line events
+        reference a ``session_id`` or the ``session_key`` of the start event that created the session offline.
+        Events whose key was already synced are not applied again, their stored result is returned instead.
+        """
+        keys = [event.get('key') for event in events]
+        known = {event.key: event for event in self.search([('key', 'in', keys)])}
+        results = []
+        for event in sorted(events, key=lambda e: str(e.get('time') or '')):
+            key = event.get('key')
+            if not key or event.get('type') not in ('start', 'stop', 'add_line'):
+                results.append({'key': key, 'status': 'rejected', 'message': "Missing key or unknown event type"})
+                continue
+            if key in known:
+                results.append(known[key]._to_result(duplicate=True))
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    status, session, message = getattr(self, '_apply_%s' % event['type'])(event, known)
+            except (UserError, ValidationError) as e:
+                status, session, message = 'rejected', self.env['session.session'], str(e)
+            except (KeyError, ValueError, TypeError, psycopg2.DataError, psycopg2.IntegrityError) as e:
+                # A malformed event (missing value, bad id or date) is rejected alone, not with the whole batch.
+                # Serialization failures and lock errors are left to the request's retry loop: logged as rejected,
+                # the event would never be sent again.
+                _logger.warning("Front desk event %s rejected", key, exc_info=True)
+                status, session, message = 'rejected', self.env['session.session'], "Invalid event: %s" % (
+                    str(e) or type(e).__name__)
+            try:
+                client_time = self._get_client_time(event)
+            except ValueError:
+                client_time = False
+            # The log is written by the sync itself: front desk users only read it
+            record = self.sudo().create({
+                'key': key,
+                'event_type': event['type'],
+                'client_time': client_time,
+                'session_id': session.id,
+                'status': status,
+                'message': message,
+            }).with_env(self.env)
+            known[key] = record
+            results.append(record._to_result())
+        return results
+
+    def _to_result(self, duplicate=False):
+        self.ensure_one()
+        return {
+            'key': self.key,
+            'status': 'duplicate' if duplicate else self.status,
+            'session_id': self.session_id.id,
+            'session_ref': self.session_id.ref,
+            'message': self.message or '',
+        }
+
+    @api.model
+    def _get_client_time(self, event):
+        """Client time of the event, never later than the server clock."""
+        now = fields.Datetime.now()
+        client_time = fields.Datetime.to_datetime(event.get('time')) if event.get('time') else now
+        return min(client_time, now)
+
+    @api.model
+    def _get_session(self, event, known):
+        if event.get('session_id'):
+            return self.env['session.session'].browse(int(event['session_id'])).exists()
+        start_event = known.get(event.get('session_key'))
+        return start_event.session_id if start_event else self.env['session.session']
+
+    @api.model
+    def _apply_start(self, event, known):
+        values = dict(event.get('values') or {})
+        kind = 'room' if values.get('session_type') == 'private' else values.get('individual_type')
+        resource_field = RESOURCE_FIELDS.get(kind)
+        if not resource_field or not values.get(resource_field):
+            return 'rejected', self.env['session.session'], "The session has no room, console or table"
+        running = self.env['session.session'].search([
+            (resource_field, '=', values[resource_field]),
+            ('state', 'in', ('available', 'running')),
+        ], limit=1)
+        if running:
+            return 'conflict', running, "%s is already in use by %s" % (running[resource_field].display_name,
+                                                                         running.ref)
+        values['starting_time'] = self._get_client_time(event)
+        return 'applied', self.env['session.session'].create(values), ''
+
+    @api.model
+    def _apply_stop(self, event, known):
+        session = self._get_session(event, known)
+        if not session:
+            return 'rejected', session, "Unknown session"
+        ending_time = self._get_client_time(event)
+        if ending_time <= session.starting_time:
+            return 'rejected', session, "The stop time is before the session start"
+        if session.state == 'finished':
+            # Another desk already stopped it: the earliest stop wins
+            if ending_time < session.ending_time:
+                session.ending_time = ending_time
+                return 'applied', session, "Stop time moved earlier"
+            return 'conflict', session, "Session already finished"
+        session._set_finished(ending_time)
+        return 'applied', session, ''
+
+    @api.model
+    def _apply_add_line(self, event, known):
+        session = self._get_session(event, known)
+        if not session:
+            return 'rejected', session, "Unknown session"
+        if not event.get('product_id'):
+            return 'rejected', session, "Missing product"
+        line_values = {
+            'session_id': session.id,
+            'product_id': int(event['product_id']),
+            'product_uom_qty': event.get('quantity') or 1.0,
+        }
+        if event.get('discount'):
+            line_values['discount'] = event['discount']
+        self.env['session.session.line'].create(line_values)
+        if session.state == 'finished':
+            return 'applied', session, "Line added to a finished session"
+        return 'applied', session, ''
+
+    @api.autovacuum
+    def _gc_sync_events(self):
+        """Idempotency keys only need to outlive the longest offline period."""
+        limit_date = fields.Datetime.subtract(fields.Datetime.now(), days=30)
+        self.search([('create_date', '<', limit_date)]).unlink()
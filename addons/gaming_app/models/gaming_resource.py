@@ -0,0 +1,141 @@
+# coding: utf-8
+
+from odoo import models, fields, api
+
+
+class GamingResource(models.Model):
+    _name = 'gaming.resource'
+    _description = 'Bookable Resource'
+    _order = 'kind, sequence, id'
+
+    sequence = fields.Integer('Sequence', default=1)
+    name = fields.Char(required=True)
+    kind = fields.Selection([
+        ('room', 'Room'),
+        ('console', 'Console'),
+        ('table', 'Table'),
+    ], required=True, index=True)
+    res_id = fields.Integer(string='Facade Record', required=True)
+    type_name = fields.Char()
+    type_res_id = fields.Integer(string='Type Record')
+    price_per_hour = fields.Float(string='Price/H', readonly=True,
+                                  help="Copied from the type of the room, console or table.")
+    company_id = fields.Many2one(comodel_name='res.company', required=True, default=lambda self: self.env.company)
+
+    _sql_constraints = [
+        ('kind_res_uniq', 'unique(kind, res_id)', 'A room, console or table can only have one resource.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS gaming_resource_company_kind_idx
+            ON gaming_resource (company_id, kind, sequence, id)
+        """)
+
+    @api.model
+    def _sync_missing_resources(self):
+        """Create the resources of rooms, consoles and tables that do not have one yet, complete the others."""
+        for model in ('room.name', 'console.number', 'table.tables'):
+            self.env[model].with_context(active_test=False).search([
+                '|', ('resource_id', '=', False), ('resource_id.type_res_id', '=', False),
+            ])._sync_resource()
+
+    @api.model
+    def _get_busy_resource_ids(self):
+        """Ids of the resources held by an available or running session, in one indexed query."""
+        self.env['session.session'].flush_model(['resource_id', 'state'])
+        self.env.cr.execute("""
+            SELECT DISTINCT resource_id
+            FROM session_session
+            WHERE state IN ('available', 'running') AND resource_id IS NOT NULL
+        """)
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    @api.model
+    def get_availability(self, kind=None):
+        """Status of every resource of the current company (of one kind if given), keyed by the facade record id."""
+        self.flush_model()
+        self.env['session.session'].flush_model(['resource_id', 'state'])
+        self.env.cr.execute("""
+            SELECT r.kind, r.res_id, r.name, r.type_name,
+                   EXISTS (
+                       SELECT 1 FROM session_session s
+                       WHERE s.resource_id = r.id AND s.state IN ('available', 'running')
+                   ) AS busy
+            FROM gaming_resource r
+            WHERE r.company_id = %(company_id)s AND (%(kind)s IS NULL OR r.kind = %(kind)s)
+            ORDER BY r.kind, r.sequence, r.id
+        """, {'kind': kind, 'company_id': self.env.company.id})
+        return [{
+            'kind': row_kind,
+            'id': res_id,
+            'name': name,
+            'status': 'occupied' if busy else 'available',
+            'type': type_name or 'N/A',
+        } for row_kind, res_id, name, type_name, busy in self.env.cr.fetchall()]
+
+
+class GamingResourceMixin(models.AbstractModel):
+    _name = 'gaming.resource.mixin'
+    _description = 'Bookable Resource Facade'
+
+    _resource_kind = None
+    _resource_name_field = 'name'
+
+    resource_id = fields.Many2one(comodel_name='gaming.resource', readonly=True, copy=False, index=True,
+                                  ondelete='set null')
+    company_id = fields.Many2one(comodel_name='res.company', required=True, index=True,
+                                 default=lambda self: self.env.company)
+
+    def _get_resource_values(self):
+        self.ensure_one()
+        return {
+            'sequence': self.sequence,
+            'name': self[self._resource_name_field],
+            'kind': self._resource_kind,
+            'res_id': self.id,
+            'type_name': self.type_id.name,
+            'type_res_id': self.type_id.id,
+            'price_per_hour': self.type_id.price_per_hour,
+            'company_id': self.company_id.id,
+        }
+
+    def _sync_resource(self):
+        # Resources are read-only for users: they only change through their room, console or table and its type
+        Resource = self.env['gaming.resource'].sudo()
+        for rec in self:
+            if rec.resource_id:
+                rec.resource_id.sudo().write(rec._get_resource_values())
+            else:
+                rec.resource_id = Resource.create(rec._get_resource_values())
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._sync_resource()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'sequence', self._resource_name_field, 'type_id', 'company_id'} & set(vals):
+            self._sync_resource()
+        return res
+
+    def unlink(self):
+        resources = self.resource_id.sudo()
+        res = super().unlink()
+        resources.unlink()
+        return res
+
+
+class GamingResourceTypeMixin(models.AbstractModel):
+    _name = 'gaming.resource.type.mixin'
+    _description = 'Bookable Resource Type'
+
+    _resource_model = None
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {'name', 'price_per_hour'} & set(vals):
+            self.env[self._resource_model].search([('type_id', 'in', self.ids)])._sync_resource()
+        return res
@@ -0,0 +1,20 @@
+# coding: utf-8
+
+from odoo import models
+
+from .bar_queue_item import BAR_QUEUE_CHANNEL
+from .waitlist_entry import WAITLIST_CHANNEL
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        # The dashboards and bar screens ask for the waitlist and the bar queue by name; they get the channels of
+        # their user's companies only
+        for name in (WAITLIST_CHANNEL, BAR_QUEUE_CHANNEL):
+            if name in channels:
+                channels = [channel for channel in channels if channel != name]
+                if self.env.user._is_internal():
+                    channels += [(company, name) for company in self.env.user.company_ids]
+        return super()._build_bus_channel_list(channels)
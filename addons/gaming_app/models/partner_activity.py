@@ -0,0 +1,279 @@
+# coding: utf-8
+
+import operator
+from collections import defaultdict
+
+from odoo import models, fields, api
+
+SEARCH_OPERATORS = {
+    '=': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+}
+
+COUNTERS = ['visit_count', 'hours_played', 'session_spend', 'cafe_order_count', 'cafe_spend']
+
+# Adds the increments of a batch to the profiles in one atomic statement, so concurrent front desks never lose one
+UPSERT_SQL = """
+    INSERT INTO partner_activity (
+        partner_id, company_id, visit_count, hours_played, session_spend, cafe_order_count, cafe_spend,
+        last_visit, create_uid, create_date, write_uid, write_date)
+    SELECT d.*, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+    FROM unnest(
+        %(partner_id)s::integer[], %(company_id)s::integer[], %(visit_count)s::integer[],
+        %(hours_played)s::float8[], %(session_spend)s::numeric[], %(cafe_order_count)s::integer[],
+        %(cafe_spend)s::numeric[], %(last_visit)s::timestamp[]
+    ) AS d
+    ON CONFLICT (partner_id, company_id) DO UPDATE SET
+        visit_count = partner_activity.visit_count + EXCLUDED.visit_count,
+        hours_played = partner_activity.hours_played + EXCLUDED.hours_played,
+        session_spend = partner_activity.session_spend + EXCLUDED.session_spend,
+        cafe_order_count = partner_activity.cafe_order_count + EXCLUDED.cafe_order_count,
+        cafe_spend = partner_activity.cafe_spend + EXCLUDED.cafe_spend,
+        last_visit = GREATEST(partner_activity.last_visit, EXCLUDED.last_visit),
+        write_uid = EXCLUDED.write_uid,
+        write_date = EXCLUDED.write_date
+"""
+
+# Full recomputation from the finished sessions and orders, only used to initialise or repair the profiles
+REBUILD_SQL = """
+    INSERT INTO partner_activity (
+        partner_id, company_id, visit_count, hours_played, session_spend, cafe_order_count, cafe_spend,
+        last_visit, create_uid, create_date, write_uid, write_date)
+    SELECT
+        partner_id, company_id, SUM(visits), SUM(hours), SUM(session_spend), SUM(cafe_orders), SUM(cafe_spend),
+        MAX(last_visit),
+        %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+    FROM (
+        SELECT
+            s.partner_id, s.company_id, 1 AS visits,
+            COALESCE(EXTRACT(EPOCH FROM (s.ending_time - s.starting_time)) / 3600.0, 0.0) AS hours,
+            COALESCE(s.time_price, 0.0) + COALESCE(lines.amount, 0.0) AS session_spend,
+            0 AS cafe_orders, 0.0 AS cafe_spend,
+            s.ending_time AS last_visit
+        FROM session_session s
+        LEFT JOIN LATERAL (
+            SELECT SUM(l.discount_included) AS amount FROM session_session_line l WHERE l.session_id = s.id
+        ) lines ON TRUE
+        WHERE s.state = 'finished' AND s.partner_id IS NOT NULL
+
+        UNION ALL
+
+        SELECT
+            co.partner_id, co.company_id, 0, 0.0, 0.0, 1,
+            COALESCE(lines.amount, 0.0),
+            co.finished_date
+        FROM cafe_order co
+        LEFT JOIN LATERAL (
+            SELECT SUM(l.discount_included) AS amount FROM cafe_order_line l WHERE l.order_id = co.id
+        ) lines ON TRUE
+        WHERE co.state = 'finished' AND co.partner_id IS NOT NULL
+    ) visits
+    GROUP BY partner_id, company_id
+"""
+
+# Unpaid balance per customer, summed from the stored balances of the finished sessions and orders so that it
+# follows every payment, reversal or correction; only the rows with a balance are read (partial indexes)
+OUTSTANDING_SQL = """
+    SELECT partner_id, company_id, SUM(amount_due)
+    FROM (
+        SELECT partner_id, company_id, amount_due FROM session_session
+        WHERE state = 'finished' AND amount_due != 0 AND %(where)s
+        UNION ALL
+        SELECT partner_id, company_id, amount_due FROM cafe_order
+        WHERE state = 'finished' AND amount_due != 0 AND %(where)s
+    ) due
+    GROUP BY partner_id, company_id
+"""
+
+
+class PartnerActivity(models.Model):
+    _name = 'partner.activity'
+    _description = 'Customer Activity Profile'
+    _rec_name = 'partner_id'
+    _order = 'last_visit desc, id desc'
+
+    partner_id = fields.Many2one(comodel_name='res.partner', string='Customer', required=True, readonly=True,
+                                 ondelete='cascade')
+    company_id = fields.Many2one(comodel_name='res.company', required=True, readonly=True, ondelete='cascade')
+    currency_id = fields.Many2one(related='company_id.currency_id')
+    visit_count = fields.Integer('Visits', readonly=True)
+    hours_played = fields.Float(readonly=True)
+    session_spend = fields.Monetary('Sessions Spend', readonly=True, currency_field='currency_id')
+    cafe_order_count = fields.Integer('Cafe Orders', readonly=True)
+    cafe_spend = fields.Monetary(readonly=True, currency_field='currency_id')
+    total_spend = fields.Monetary(compute='_compute_total_spend', currency_field='currency_id')
+    outstanding_amount = fields.Monetary('Outstanding', compute='_compute_outstanding_amount',
+                                         search='_search_outstanding_amount', currency_field='currency_id')
+    last_visit = fields.Datetime(readonly=True)
+    favourite_console_type_id = fields.Many2one(comodel_name='console.type', string='Favourite Console',
+                                                readonly=True)
+
+    _sql_constraints = [
+        ('partner_company_uniq', 'unique(partner_id, company_id)', 'A customer has one profile per company.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("SELECT 1 FROM partner_activity LIMIT 1")
+        if not self.env.cr.fetchone():
+            self.rebuild()
+
+    @api.depends('session_spend', 'cafe_spend')
+    def _compute_total_spend(self):
+        for activity in self:
+            activity.total_spend = activity.session_spend + activity.cafe_spend
+
+    @api.model
+    def _read_outstanding(self, where, params):
+        """``{(partner_id, company_id): unpaid balance}`` of the customers matching the SQL ``where``."""
+        self.env['session.session'].flush_model(['partner_id', 'company_id', 'state', 'amount_due'])
+        self.env['cafe.order'].flush_model(['partner_id', 'company_id', 'state', 'amount_due'])
+        self.env.cr.execute(OUTSTANDING_SQL % {'where': where}, params)
+        return {(partner_id, company_id): amount for partner_id, company_id, amount in self.env.cr.fetchall()}
+
+    @api.depends('partner_id', 'company_id')
+    def _compute_outstanding_amount(self):
+        outstanding = self._read_outstanding(
+            'partner_id = ANY(%(partner_ids)s) AND company_id = ANY(%(company_ids)s)',
+            {'partner_ids': self.partner_id.ids, 'company_ids': self.company_id.ids},
+        )
+        for activity in self:
+            activity.outstanding_amount = outstanding.get((activity.partner_id.id, activity.company_id.id), 0.0)
+
+    def _search_outstanding_amount(self, operator, value):
+        compare = SEARCH_OPERATORS.get(operator)
+        if not compare or not isinstance(value, (int, float)):
+            return NotImplemented
+        outstanding = self._read_outstanding('TRUE', {})
+        # Customers without any unpaid session or order owe nothing and have no balance row
+        if compare(0.0, value):
+            operator, keys = 'not in', [key for key, amount in outstanding.items() if not compare(amount, value)]
+        else:
+            operator, keys = 'in', [key for key, amount in outstanding.items() if compare(amount, value)]
+        self.flush_model(['partner_id', 'company_id'])
+        self.env.cr.execute("""
+            SELECT a.id FROM partner_activity a
+            JOIN unnest(%s::integer[], %s::integer[]) AS k(partner_id, company_id) USING (partner_id, company_id)
+        """, [[key[0] for key in keys], [key[1] for key in keys]])
+        return [('id', operator, [row[0] for row in self.env.cr.fetchall()])]
+
+    @api.model
+    def _apply(self, increments):
+        """Add ``{(partner_id, company_id): {counter: increment, 'last_visit': datetime}}`` to the profiles."""
+        if not increments:
+            return
+        self.flush_model()
+        params = {column: [] for column in ['partner_id', 'company_id', 'last_visit'] + COUNTERS}
+        for (partner_id, company_id), values in increments.items():
+            params['partner_id'].append(partner_id)
+            params['company_id'].append(company_id)
+            params['last_visit'].append(values.get('last_visit'))
+            for counter in COUNTERS:
+                params[counter].append(values.get(counter, 0))
+        self.env.cr.execute(UPSERT_SQL, dict(params, uid=self.env.uid))
+        self.invalidate_model()
+
+    @api.model
+    def _record_sessions(self, sessions):
+        """Count finished sessions in the profiles of their customers."""
+        increments = defaultdict(lambda: defaultdict(float))
+        console_counts = defaultdict(int)
+        for session in sessions:
+            key = (session.partner_id.id, session.company_id.id)
+            values = increments[key]
+            values['visit_count'] += 1
+            values['hours_played'] += session.spent_time / 60.0
+            values['session_spend'] += session.total
+            values['last_visit'] = max(values.get('last_visit') or session.ending_time, session.ending_time)
+            if session.console_type_id:
+                console_counts[key + (session.console_type_id.id,)] += 1
+        self._apply(increments)
+        self.env['partner.activity.console']._apply(console_counts)
+
+    @api.model
+    def _record_cafe_orders(self, orders):
+        """Count finished cafe orders in the profiles of their customers."""
+        increments = defaultdict(lambda: defaultdict(float))
+        for order in orders:
+            values = increments[(order.partner_id.id, order.company_id.id)]
+            values['cafe_order_count'] += 1
+            values['cafe_spend'] += order.total
+            values['last_visit'] = max(values.get('last_visit') or order.finished_date, order.finished_date)
+        self._apply(increments)
+
+    @api.model
+    def rebuild(self):
+        """Recompute every profile from the whole history of finished sessions and orders."""
+        self.env.flush_all()
+        self.env.cr.execute("TRUNCATE partner_activity, partner_activity_console")
+        self.env.cr.execute(REBUILD_SQL, {'uid': self.env.uid})
+        self.env['partner.activity.console']._rebuild()
+        self.invalidate_model()
+
+
+class PartnerActivityConsole(models.Model):
+    _name = 'partner.activity.console'
+    _description = 'Customer Sessions per Console Type'
+    _log_access = False
+
+    partner_id = fields.Many2one(comodel_name='res.partner', required=True, readonly=True, ondelete='cascade')
+    company_id = fields.Many2one(comodel_name='res.company', required=True, readonly=True, ondelete='cascade')
+    console_type_id = fields.Many2one(comodel_name='console.type', required=True, readonly=True, ondelete='cascade')
+    session_count = fields.Integer(readonly=True)
+
+    _sql_constraints = [
+        ('partner_company_type_uniq', 'unique(partner_id, company_id, console_type_id)',
+         'A customer has one counter per console type.'),
+    ]
+
+    @api.model
+    def _apply(self, counts):
+        """Add ``{(partner_id, company_id, console_type_id): sessions}`` and refresh the favourite console types."""
+        if not counts:
+            return
+        keys = list(counts)
+        self.env.cr.execute("""
+            INSERT INTO partner_activity_console (partner_id, company_id, console_type_id, session_count)
+            SELECT * FROM unnest(%(partner_id)s::integer[], %(company_id)s::integer[],
+                                 %(console_type_id)s::integer[], %(count)s::integer[])
+            ON CONFLICT (partner_id, company_id, console_type_id) DO UPDATE SET
+                session_count = partner_activity_console.session_count + EXCLUDED.session_count
+        """, {
+            'partner_id': [key[0] for key in keys],
+            'company_id': [key[1] for key in keys],
+            'console_type_id': [key[2] for key in keys],
+            'count': [counts[key] for key in keys],
+        })
+        self._update_favourites("""
+            (a.partner_id, a.company_id) IN (
+                SELECT * FROM unnest(%(partner_id)s::integer[], %(company_id)s::integer[])
+            )
+        """, {
+            'partner_id': [key[0] for key in keys],
+            'company_id': [key[1] for key in keys],
+        })
+
+    @api.model
+    def _rebuild(self):
+        self.env.cr.execute("""
+            INSERT INTO partner_activity_console (partner_id, company_id, console_type_id, session_count)
+            SELECT s.partner_id, s.company_id, c.type_id, COUNT(*)
+            FROM session_session s
+            JOIN console_number c ON c.id = s.console_id
+            WHERE s.state = 'finished' AND s.individual_type = 'console' AND s.partner_id IS NOT NULL
+              AND c.type_id IS NOT NULL
+            GROUP BY s.partner_id, s.company_id, c.type_id
+        """)
+        self._update_favourites('TRUE', {})
+
+    @api.model
+    def _update_favourites(self, where, params):
+        self.env.cr.execute("""
+            UPDATE partner_activity a
+            SET favourite_console_type_id = (
+                SELECT c.console_type_id
+                FROM partner_activity_console c
+                WHERE c.partner_id = a.partner_id AND c.company_id = a.company_id
+                ORDER BY c.session_count DESC, c.console_type_id
+                LIMIT 1
+            )
+            WHERE """ + where, params)
+        self.env['partner.activity'].invalidate_model(['favourite_console_type_id'])
@@ -0,0 +1,119 @@
+# coding: utf-8
+
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Cron records draining the queue in parallel
+WORKER_CRONS = ['gaming_app.ir_cron_payment_job_worker_1', 'gaming_app.ir_cron_payment_job_worker_2']
+
+
+class PaymentJob(models.Model):
+    _name = 'payment.job'
+    _description = 'Invoice and Payment Job'
+    _order = 'id desc'
+
+    session_id = fields.Many2one(comodel_name='session.session', readonly=True, index=True, ondelete='cascade')
+    cafe_id = fields.Many2one(comodel_name='cafe.order', readonly=True, index=True, ondelete='cascade')
+    payment_way = fields.Selection([
+        ('fully_paid', 'Paid'),
+        ('partially_paid', 'Partially Paid'),
+        ('later_paid', 'Paid Later'),
+    ], string='Payment Method', readonly=True, required=True)
+    paid_amount = fields.Char(readonly=True)
+    user_id = fields.Many2one(comodel_name='res.users', readonly=True, default=lambda self: self.env.user)
+    shift_id = fields.Many2one(comodel_name='cashier.shift', readonly=True,
+                               help="Shift open when the payment was taken, the invoice and payments are booked in.")
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], default='pending', required=True, readonly=True, index=True)
+    attempts = fields.Integer(readonly=True)
+    max_attempts = fields.Integer(default=5, readonly=True)
+    next_attempt = fields.Datetime(readonly=True)
+    error = fields.Text(readonly=True)
+
+    @api.model
+    def enqueue(self, wizard):
+        job = self.create({
+            'session_id': wizard.session_id.id,
+            'cafe_id': wizard.cafe_id.id,
+            'payment_way': wizard.payment_way,
+            'paid_amount': wizard.paid_amount,
+            'shift_id': wizard._get_shift().id,
+        })
+        self._trigger_workers()
+        return job
+
+    @api.model
+    def _trigger_workers(self):
+        """Wake up every worker, so that pending jobs are drained in parallel."""
+        for xmlid in WORKER_CRONS:
+            self.env.ref(xmlid)._trigger()
+
+    @api.model
+    def _acquire_next(self):
+        """Lock the oldest runnable job; jobs locked by another worker are skipped.
+
+        A job waits while an older job of the same session or order is still pending, so an invoice is always
+        posted before the payments registered against it.
+        """
+        self.env.cr.execute("""
+            SELECT j.id
+            FROM payment_job j
+            WHERE j.state = 'pending'
+              AND (j.next_attempt IS NULL OR j.next_attempt <= %(now)s)
+              AND NOT EXISTS (
+                  SELECT 1 FROM payment_job prev
+                  WHERE prev.state = 'pending'
+                    AND prev.id < j.id
+                    AND (prev.session_id = j.session_id OR prev.cafe_id = j.cafe_id)
+              )
+            ORDER BY j.id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        """, {'now': fields.Datetime.now()})
+        row = self.env.cr.fetchone()
+        return self.browse(row[0]) if row else self.browse()
+
+    def _run(self):
+        self.ensure_one()
+        wizard = self.env['payment.workflow.wizard'].with_user(self.user_id).create({
+            'session_id': self.session_id.id,
+            'cafe_id': self.cafe_id.id,
+            'payment_way': self.payment_way,
+            'paid_amount': self.paid_amount,
+            'is_partially': self.payment_way == 'partially_paid',
+            'shift_id': self.shift_id.id,
+        })
+        wizard._process_payment()
+
+    @api.model
+    def _cron_run_jobs(self, limit=50):
+        """Drain the queue; several cron records may run this method in parallel."""
+        for _index in range(limit):
+            job = self._acquire_next()
+            if not job:
+                break
+            try:
+                with self.env.cr.savepoint():
+                    job._run()
+                job.write({'state': 'done', 'error': False, 'attempts': job.attempts + 1})
+            except Exception as e:
+                _logger.exception("Payment job %s failed", job.id)
+                attempts = job.attempts + 1
+                job.write({
+                    'attempts': attempts,
+                    'error': str(e),
+                    'state': 'failed' if attempts >= job.max_attempts else 'pending',
+                    'next_attempt': fields.Datetime.now() + timedelta(minutes=2 ** attempts),
+                })
+            self.env.cr.commit()
+
+    def action_retry(self):
+        self.write({'state': 'pending', 'attempts': 0, 'next_attempt': False})
+        self._trigger_workers()
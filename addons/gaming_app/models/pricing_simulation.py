@@ -0,0 +1,135 @@
+# coding: utf-8
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RESOURCE_KINDS = ['room', 'console', 'table']
+TYPE_MODELS = {'room': 'room.type', 'console': 'console.type', 'table': 'table.type'}
+
+
+class PricingSimulation(models.AbstractModel):
+    _name = 'pricing.simulation'
+    _description = 'What-if Pricing Simulation'
+
+    @api.model
+    def _load_history(self, date_from, date_to):
+        """Load the current company's finished sessions of the range into columnar arrays with a single query."""
+        self.env.flush_all()
+        self.env.cr.execute("""
+            SELECT
+                DATE(s.starting_time) - %(date_from)s::date,
+                CASE
+                    WHEN s.session_type = 'private' THEN 0
+                    WHEN s.individual_type = 'table' THEN 2
+                    ELSE 1
+                END,
+                COALESCE(CASE
+                    WHEN s.session_type = 'private' THEN r.type_id
+                    WHEN s.individual_type = 'table' THEN t.type_id
+                    ELSE c.type_id
+                END, 0),
+                EXTRACT(EPOCH FROM (s.ending_time - s.starting_time)) / 3600.0,
+                COALESCE(s.time_price, 0.0),
+                COALESCE((SELECT SUM(ssl.discount_included)
+                          FROM session_session_line ssl
+                          WHERE ssl.session_id = s.id), 0.0)
+            FROM session_session s
+            LEFT JOIN room_name r ON r.id = s.room_id
+            LEFT JOIN console_number c ON c.id = s.console_id
+            LEFT JOIN table_tables t ON t.id = s.table_id
+            WHERE s.company_id = %(company_id)s
+              AND s.state = 'finished'
+              AND s.starting_time IS NOT NULL AND s.ending_time IS NOT NULL
+              AND s.starting_time >= %(date_from)s::date
+              AND s.starting_time < %(date_to)s::date + 1
+        """, {'date_from': date_from, 'date_to': date_to, 'company_id': self.env.company.id})
+        rows = self.env.cr.fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 6
+        return {
+            'day': np.array(columns[0], dtype=np.int32),
+            'kind': np.array(columns[1], dtype=np.int8),
+            'type_id': np.array(columns[2], dtype=np.int64),
+            'hours': np.array(columns[3], dtype=np.float64),
+            'time_price': np.array(columns[4], dtype=np.float64),
+            'line_total': np.array(columns[5], dtype=np.float64),
+        }
+
+    @api.model
+    def simulate(self, date_from, date_to, scenarios):
+        """Replay the finished sessions of a date range under candidate hourly rates.
+
+        ``scenarios`` is a list of ``{'name': str, 'rates': {'room': {type_id: rate}, 'console': {...},
+        'table': {...}}}``. Types without a candidate rate keep their stored ``time_price``. Nothing is written.
+
+        Returns one dict per scenario with the total delta and the revenue per resource type and day.
+        """
+        if np is None:
+            raise UserError("The pricing simulation requires the numpy python library.")
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        history = self._load_history(date_from, date_to)
+
+        # Group keys (day, kind, type) are computed once and shared by every scenario
+        type_key = history['kind'].astype(np.int64) * (1 << 32) + history['type_id']
+        group_keys = np.stack([history['day'].astype(np.int64), type_key], axis=1)
+        if len(group_keys):
+            groups, inverse = np.unique(group_keys, axis=0, return_inverse=True)
+            inverse = inverse.ravel()
+        else:
+            groups, inverse = group_keys, np.zeros(0, dtype=np.int64)
+        group_count = len(groups)
+        baseline_time = np.bincount(inverse, weights=history['time_price'], minlength=group_count)
+        line_total = np.bincount(inverse, weights=history['line_total'], minlength=group_count)
+        hours = np.bincount(inverse, weights=history['hours'], minlength=group_count)
+
+        type_names = {}
+        for kind, model in TYPE_MODELS.items():
+            type_names[kind] = dict(self.env[model].search([]).mapped(lambda t: (t.id, t.name)))
+
+        results = []
+        for scenario in scenarios:
+            rate_keys, rate_values = [], []
+            for kind_index, kind in enumerate(RESOURCE_KINDS):
+                for type_id, rate in (scenario.get('rates', {}).get(kind) or {}).items():
+                    rate_keys.append(kind_index * (1 << 32) + int(type_id))
+                    rate_values.append(float(rate))
+            order = np.argsort(np.array(rate_keys, dtype=np.int64))
+            rate_keys = np.array(rate_keys, dtype=np.int64)[order]
+            rate_values = np.array(rate_values, dtype=np.float64)[order]
+
+            if len(rate_keys):
+                position = np.clip(np.searchsorted(rate_keys, type_key), 0, len(rate_keys) - 1)
+                has_rate = rate_keys[position] == type_key
+                simulated = np.where(has_rate, history['hours'] * rate_values[position], history['time_price'])
+            else:
+                simulated = history['time_price']
+            simulated_time = np.bincount(inverse, weights=simulated, minlength=group_count)
+            delta = simulated_time - baseline_time
+
+            lines = []
+            for index, (day, key) in enumerate(groups):
+                kind = RESOURCE_KINDS[int(key) >> 32]
+                type_id = int(key) & ((1 << 32) - 1)
+                lines.append({
+                    'date': fields.Date.to_string(fields.Date.add(date_from, days=int(day))),
+                    'resource_kind': kind,
+                    'type_id': type_id,
+                    'type_name': type_names[kind].get(type_id, ''),
+                    'hours': float(hours[index]),
+                    'current_revenue': float(baseline_time[index] + line_total[index]),
+                    'simulated_revenue': float(simulated_time[index] + line_total[index]),
+                    'delta': float(delta[index]),
+                })
+            results.append({
+                'name': scenario.get('name'),
+                'current_revenue': float(baseline_time.sum() + line_total.sum()),
+                'simulated_revenue': float(simulated_time.sum() + line_total.sum()),
+                'delta': float(delta.sum()),
+                'lines': lines,
+            })
+        return results
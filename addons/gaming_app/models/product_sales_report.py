@@ -0,0 +1,200 @@
+# coding: utf-8
+
+from odoo import models, fields, api
+
+from .revenue_rollup import DIRTY_MARGIN
+
+LINES_SQL = """
+    SELECT
+        'session' AS source,
+        l.id AS line_id,
+        s.id AS session_id,
+        NULL::integer AS order_id,
+        DATE(s.starting_time) AS date,
+        CASE
+            WHEN s.session_type = 'private' THEN 'room'
+            WHEN s.individual_type = 'table' THEN 'table'
+            ELSE 'console'
+        END AS resource_kind,
+        s.partner_id AS partner_id,
+        l.product_id AS product_id,
+        pp.product_tmpl_id AS product_tmpl_id,
+        pt.categ_id AS categ_id,
+        l.product_uom_qty AS quantity,
+        COALESCE(l.discount_excluded, 0.0) AS gross,
+        COALESCE(l.discount_excluded, 0.0) - COALESCE(l.discount_included, 0.0) AS discount_amount,
+        COALESCE(l.discount_included, 0.0) AS net,
+        l.product_uom_qty * COALESCE((pp.standard_price ->> s.company_id::text)::float, 0.0) AS cost,
+        s.company_id AS company_id,
+        comp.currency_id AS currency_id
+    FROM session_session_line l
+    JOIN session_session s ON s.id = l.session_id
+    JOIN res_company comp ON comp.id = s.company_id
+    JOIN product_product pp ON pp.id = l.product_id
+    JOIN product_template pt ON pt.id = pp.product_tmpl_id
+    WHERE s.state = 'finished' AND s.starting_time IS NOT NULL AND {session_filter}
+
+    UNION ALL
+
+    SELECT
+        'cafe',
+        l.id,
+        NULL::integer,
+        co.id,
+        DATE(co.create_date),
+        'cafe',
+        co.partner_id,
+        l.product_id,
+        pp.product_tmpl_id,
+        pt.categ_id,
+        l.product_uom_qty,
+        COALESCE(l.discount_excluded, 0.0),
+        COALESCE(l.discount_excluded, 0.0) - COALESCE(l.discount_included, 0.0),
+        COALESCE(l.discount_included, 0.0),
+        l.product_uom_qty * COALESCE((pp.standard_price ->> co.company_id::text)::float, 0.0),
+        co.company_id,
+        comp.currency_id
+    FROM cafe_order_line l
+    JOIN cafe_order co ON co.id = l.order_id
+    JOIN res_company comp ON comp.id = co.company_id
+    JOIN product_product pp ON pp.id = l.product_id
+    JOIN product_template pt ON pt.id = pp.product_tmpl_id
+    WHERE co.state = 'finished' AND {cafe_filter}
+"""
+
+
+class ProductSalesReport(models.Model):
+    _name = 'product.sales.report'
+    _description = 'Product Sales Analysis'
+    _rec_name = 'product_id'
+    _order = 'date desc'
+
+    source = fields.Selection([
+        ('session', 'Session'),
+        ('cafe', 'Cafe'),
+    ], readonly=True, required=True)
+    line_id = fields.Integer(readonly=True, required=True)
+    session_id = fields.Many2one(comodel_name='session.session', readonly=True, index='btree_not_null')
+    order_id = fields.Many2one(comodel_name='cafe.order', string='Cafe Order', readonly=True,
+                               index='btree_not_null')
+    date = fields.Date(readonly=True, index=True)
+    resource_kind = fields.Selection([
+        ('room', 'Room'),
+        ('console', 'Console'),
+        ('table', 'Table'),
+        ('cafe', 'Cafe'),
+    ], readonly=True)
+    partner_id = fields.Many2one(comodel_name='res.partner', string='Customer', readonly=True)
+    product_id = fields.Many2one(comodel_name='product.product', readonly=True)
+    product_tmpl_id = fields.Many2one(comodel_name='product.template', string='Product Template', readonly=True)
+    categ_id = fields.Many2one(comodel_name='product.category', string='Product Category', readonly=True)
+    company_id = fields.Many2one(comodel_name='res.company', readonly=True)
+    currency_id = fields.Many2one(comodel_name='res.currency', readonly=True,
+                                  default=lambda self: self.env.company.currency_id)
+    quantity = fields.Float(readonly=True)
+    gross = fields.Monetary(readonly=True, currency_field='currency_id')
+    discount_amount = fields.Monetary('Discount', readonly=True, currency_field='currency_id')
+    net = fields.Monetary(readonly=True, currency_field='currency_id')
+    cost = fields.Monetary(readonly=True, currency_field='currency_id')
+    margin = fields.Monetary(readonly=True, currency_field='currency_id')
+
+    _sql_constraints = [
+        ('source_line_uniq', 'unique(source, line_id)', 'A sale line can only be reported once.'),
+    ]
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS product_sales_report_company_date_product_idx
+            ON product_sales_report (company_id, date, product_id)
+        """)
+
+    @api.model
+    def _upsert(self, session_filter, cafe_filter, params):
+        params = dict(params, uid=self.env.uid)
+        self.env.cr.execute("""
+            INSERT INTO product_sales_report (
+                source, line_id, session_id, order_id, date, resource_kind, partner_id, product_id, product_tmpl_id,
+                categ_id, quantity, gross, discount_amount, net, cost, company_id, currency_id, margin,
+                create_uid, create_date, write_uid, write_date)
+            SELECT q.*, q.net - q.cost,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (""" + LINES_SQL.format(session_filter=session_filter, cafe_filter=cafe_filter) + """) q
+            ON CONFLICT (source, line_id) DO UPDATE SET
+                session_id = EXCLUDED.session_id,
+                order_id = EXCLUDED.order_id,
+                date = EXCLUDED.date,
+                resource_kind = EXCLUDED.resource_kind,
+                partner_id = EXCLUDED.partner_id,
+                product_id = EXCLUDED.product_id,
+                product_tmpl_id = EXCLUDED.product_tmpl_id,
+                categ_id = EXCLUDED.categ_id,
+                quantity = EXCLUDED.quantity,
+                gross = EXCLUDED.gross,
+                discount_amount = EXCLUDED.discount_amount,
+                net = EXCLUDED.net,
+                cost = EXCLUDED.cost,
+                company_id = EXCLUDED.company_id,
+                currency_id = EXCLUDED.currency_id,
+                margin = EXCLUDED.margin,
+                write_uid = EXCLUDED.write_uid,
+                write_date = EXCLUDED.write_date
+        """, params)
+
+    @api.model
+    def rebuild(self):
+        """Rebuild the whole table from the lines of the finished sessions and cafe orders."""
+        self.env.flush_all()
+        self.env.cr.execute("TRUNCATE product_sales_report")
+        self._upsert('TRUE', 'TRUE', {})
+        self.invalidate_model()
+
+    @api.model
+    def _refresh_parents(self, session_ids, order_ids):
+        """Replace the rows of the given sessions and cafe orders by those of their current lines.
+
+        Sessions and orders that are not finished, or no longer exist, are left without rows.
+        """
+        self.env.cr.execute("""
+            DELETE FROM product_sales_report
+            WHERE session_id = ANY(%s) OR order_id = ANY(%s)
+        """, [session_ids, order_ids])
+        self._upsert('s.id = ANY(%(session_ids)s)', 'co.id = ANY(%(order_ids)s)',
+                     {'session_ids': session_ids, 'order_ids': order_ids})
+        self.invalidate_model()
+
+    @api.model
+    def _cron_refresh_product_sales(self):
+        params = self.env['ir.config_parameter'].sudo()
+        now = fields.Datetime.now()
+        last_run = params.get_param('gaming_app.product_sales_last_run')
+        self.env.flush_all()
+        if not last_run:
+            self.rebuild()
+        else:
+            # Sessions and orders finished, reopened or edited since the last run, or whose lines changed
+            since = fields.Datetime.to_datetime(last_run) - DIRTY_MARGIN
+            self.env.cr.execute("""
+                SELECT id FROM session_session WHERE write_date >= %(since)s
+                UNION
+                SELECT session_id FROM session_session_line WHERE write_date >= %(since)s AND session_id IS NOT NULL
+            """, {'since': since})
+            session_ids = [row[0] for row in self.env.cr.fetchall()]
+            self.env.cr.execute("""
+                SELECT id FROM cafe_order WHERE write_date >= %(since)s
+                UNION
+                SELECT order_id FROM cafe_order_line WHERE write_date >= %(since)s AND order_id IS NOT NULL
+            """, {'since': since})
+            order_ids = [row[0] for row in self.env.cr.fetchall()]
+            if session_ids or order_ids:
+                self._refresh_parents(session_ids, order_ids)
+        params.set_param('gaming_app.product_sales_last_run', fields.Datetime.to_string(now))
+
+    @api.model
+    def _forget(self, source, line_ids=(), parent_ids=()):
+        """Drop the rows of deleted lines, or of every line of deleted sessions or orders."""
+        parent_column = 'session_id' if source == 'session' else 'order_id'
+        self.env.cr.execute("""
+            DELETE FROM product_sales_report
+            WHERE source = %s AND (line_id = ANY(%s) OR {} = ANY(%s))
+        """.format(parent_column), [source, list(line_ids), list(parent_ids)])
+        self.invalidate_model()
@@ -0,0 +1,37 @@
+# coding: utf-8
+
+from odoo import models, fields, api
+
+
+class ReportDirtyDay(models.Model):
+    """Days a stored report must recompute on its next refresh, for the changes ``write_date`` cannot show.
+
+    Deleted records leave no row behind to be found by the refresh crons, so their ``unlink`` marks the days they
+    were counted on here.
+    """
+    _name = 'report.dirty.day'
+    _description = 'Report Day To Refresh'
+    _log_access = False
+
+    report = fields.Char(required=True, readonly=True)
+    date = fields.Date(required=True, readonly=True)
+
+    _sql_constraints = [
+        ('report_date_uniq', 'unique(report, date)', 'A day is marked once per report.'),
+    ]
+
+    @api.model
+    def _mark(self, report, days):
+        days = sorted({day for day in days if day})
+        if days:
+            self.env.cr.execute("""
+                INSERT INTO report_dirty_day (report, date)
+                SELECT %s, unnest(%s::date[])
+                ON CONFLICT (report, date) DO NOTHING
+            """, [report, days])
+
+    @api.model
+    def _pop(self, report):
+        """Return the days marked for ``report`` and clear them, within the caller's transaction."""
+        self.env.cr.execute("DELETE FROM report_dirty_day WHERE report = %s RETURNING date", [report])
+        return [row[0] for row in self.env.cr.fetchall()]
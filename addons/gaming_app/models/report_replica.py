@@ -0,0 +1,89 @@
+# coding: utf-8
+
+import logging
+from contextlib import contextmanager
+
+import psycopg2
+
+from odoo import models, api
+
+_logger = logging.getLogger(__name__)
+
+
+def use_replica(env):
+    """Whether read-only report paths should run on the replica (``gaming_app.report_replica``)."""
+    return bool(env['ir.config_parameter'].sudo().get_param('gaming_app.report_replica'))
+
+
+def get_statement_timeout(env, name):
+    """Statement timeout in milliseconds for the report ``name``, 0 for none.
+
+    ``gaming_app.statement_timeout.<name>`` overrides the default ``gaming_app.statement_timeout``.
+    """
+    params = env['ir.config_parameter'].sudo()
+    timeout = (params.get_param('gaming_app.statement_timeout.%s' % name)
+               or params.get_param('gaming_app.statement_timeout'))
+    return int(timeout or 0)
+
+
+def open_report_cursor(registry, replica):
+    """A cursor on the read-only replica when requested and reachable, on the primary otherwise."""
+    if replica:
+        try:
+            return registry.cursor(readonly=True)
+        except psycopg2.OperationalError:
+            _logger.warning("Report replica unavailable, falling back to the primary database", exc_info=True)
+    return registry.cursor()
+
+
+@contextmanager
+def report_env(env, name):
+    """Yield an environment to run the read-only report ``name`` in.
+
+    With the replica enabled the environment uses its own cursor on the replica, so analytics never hold a
+    transaction on the primary; otherwise ``env`` itself is yielded. Either way the report's statement
+    timeout applies to the queries run inside the block.
+    """
+    timeout = get_statement_timeout(env, name)
+    if use_replica(env):
+        with open_report_cursor(env.registry, True) as cr:
+            if timeout:
+                cr.execute("SET LOCAL statement_timeout = %s", [timeout])
+            yield env(cr=cr, context=dict(env.context, report_replica=True))
+        return
+    if timeout:
+        env.cr.execute("SET LOCAL statement_timeout = %s", [timeout])
+    try:
+        yield env
+    finally:
+        # After a timeout the transaction is aborted and rejects any statement until it is rolled back, which
+        # drops the setting anyway: resetting it there would only hide the original error
+        if timeout and env.cr._cnx.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            env.cr.execute("SET LOCAL statement_timeout TO DEFAULT")
+
+
+class ReportReplicaMixin(models.AbstractModel):
+    """Run the aggregations and list reads of a reporting model on the report replica, see :func:`report_env`."""
+    _name = 'report.replica.mixin'
+    _description = 'Report Replica Routing'
+
+    @api.model
+    def _read_group(self, domain, groupby=(), aggregates=(), having=(), offset=0, limit=None, order=None):
+        if self.env.context.get('report_replica'):
+            return super()._read_group(domain, groupby, aggregates, having, offset, limit, order)
+        with report_env(self.env, self._name) as env:
+            rows = super(ReportReplicaMixin, self.with_env(env))._read_group(
+                domain, groupby, aggregates, having, offset, limit, order)
+            # Bring the grouped records back to the request environment before the replica cursor closes
+            return [tuple(value.with_env(self.env) if isinstance(value, models.BaseModel) else value
+                          for value in row) for row in rows]
+
+    @api.model
+    def web_search_read(self, domain, specification, offset=0, limit=None, order=None, count_limit=None):
+        if self.env.context.get('report_replica'):
+            return super().web_search_read(domain, specification, offset=offset, limit=limit, order=order,
+                                           count_limit=count_limit)
+        # The result only holds plain values, it outlives the replica cursor as is
+        with report_env(self.env, self._name) as env:
+            return super(ReportReplicaMixin, self.with_env(env)).web_search_read(
+                domain, specification, offset=offset, limit=limit, order=order, count_limit=count_limit)
@@ -0,0 +1,113 @@
+# coding: utf-8
+
+import re
+
+from odoo import models, fields, api
+
+# Digits of a phone number; the phone index is built on this same expression so that lookups can use it
+PHONE_DIGITS = "regexp_replace(COALESCE(phone, ''), '[^0-9]', '', 'g')"
+
+# One LIMITed branch per match kind, each served by its own partial index, so that a short or common term
+# never makes PostgreSQL collect every match before ranking
+LOOKUP_SQL = """
+    SELECT id, MIN(rank) AS rank, MIN(length(name)) AS name_length
+    FROM (
+        (SELECT id, 0 AS rank, name FROM res_partner
+         WHERE active AND lower(name) LIKE %(prefix)s
+         LIMIT %(limit)s)
+        UNION ALL
+        (SELECT id, 0, name FROM res_partner
+         WHERE active AND phone IS NOT NULL AND %(digits)s != '' AND """ + PHONE_DIGITS + """ LIKE %(digits)s || '%%'
+         LIMIT %(limit)s)
+        UNION ALL
+        (SELECT id, CASE WHEN lower(name) LIKE %(word)s THEN 1 ELSE 2 END, name FROM res_partner
+         WHERE active AND %(contains)s AND lower(name) LIKE %(substring)s
+         LIMIT %(limit)s)
+    ) matches
+    GROUP BY id
+    ORDER BY rank, name_length, id
+"""
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    def init(self):
+        super().init()
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS res_partner_frontdesk_name_prefix_idx
+            ON res_partner (lower(name) text_pattern_ops) WHERE active
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS res_partner_frontdesk_phone_idx
+            ON res_partner ((""" + PHONE_DIGITS + """) text_pattern_ops) WHERE active AND phone IS NOT NULL
+        """)
+        if self.env.registry.has_trigram:
+            self.env.cr.execute("""
+                CREATE INDEX IF NOT EXISTS res_partner_frontdesk_name_trgm_idx
+                ON res_partner USING gin (lower(name) gin_trgm_ops) WHERE active
+            """)
+
+    @api.model
+    def frontdesk_lookup(self, term, limit=8):
+        """Customers matching ``term`` for the front desk picker, best matches first.
+
+        Name and phone prefixes rank first, then names with a word starting with the term, then any other name
+        containing it (from 3 characters, through the trigram index).
+        """
+        term = (term or '').strip().lower()
+        if not term:
+            return self.browse()
+        escaped = re.sub(r'([\\%_])', r'\\\1', term)
+        digits = re.sub(r'\D', '', term)
+        self.flush_model(['name', 'phone', 'active'])
+        self.env.cr.execute(LOOKUP_SQL, {
+            'prefix': escaped + '%',
+            'word': '% ' + escaped + '%',
+            'substring': '%' + escaped + '%',
+            'contains': len(term) >= 3,
+            'digits': digits if len(digits) >= 3 else '',
+            'limit': limit,
+        })
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        # The candidates are few: apply the record rules to them rather than to the whole table
+        allowed = set(self.search([('id', 'in', ids)]).ids)
+        return self.browse([partner_id for partner_id in ids if partner_id in allowed][:limit])
+
+    @api.model
+    def name_search(self, name='', domain=None, operator='ilike', limit=100):
+        if self.env.context.get('frontdesk_lookup') and name and operator == 'ilike' and not domain:
+            return [(partner.id, partner.display_name) for partner in self.frontdesk_lookup(name, limit)]
+        return super().name_search(name, domain, operator, limit)
+
+
+class FrontdeskCustomerMixin(models.AbstractModel):
+    """Walk-in mode for the ``partner_id`` of sessions and orders.
+
+    Walk-ins are recorded against the shared walk-in partner with a free ``customer_tag`` (a name, a nickname, a
+    seat), instead of creating a contact for every visitor.
+    """
+    _name = 'frontdesk.customer.mixin'
+    _description = 'Front Desk Customer'
+
+    walk_in = fields.Boolean(compute='_compute_walk_in', inverse='_inverse_walk_in')
+    customer_tag = fields.Char(index='btree_not_null', help="Name or nickname of a walk-in customer.")
+
+    @api.depends('partner_id')
+    def _compute_walk_in(self):
+        walk_in = self.env.ref('gaming_app.res_partner_walk_in', raise_if_not_found=False)
+        for rec in self:
+            rec.walk_in = bool(walk_in) and rec.partner_id == walk_in
+
+    def _inverse_walk_in(self):
+        walk_in = self.env.ref('gaming_app.res_partner_walk_in')
+        self.filtered(lambda rec: rec.walk_in and rec.partner_id != walk_in).partner_id = walk_in
+
+    @api.onchange('walk_in')
+    def _onchange_walk_in(self):
+        walk_in = self.env.ref('gaming_app.res_partner_walk_in')
+        if self.walk_in:
+            self.partner_id = walk_in
+        elif self.partner_id == walk_in:
+            self.partner_id = False
+            self.customer_tag = False
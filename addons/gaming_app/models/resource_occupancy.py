@@ -0,0 +1,256 @@
+# coding: utf-8
+
+from datetime import datetime, time, timedelta
+
+import pytz
+
+from odoo import models, fields, api
+
+from .revenue_rollup import DIRTY_MARGIN
+
+# Advisory lock class of the storage of today's rows, the company id being the second key
+OCCUPANCY_LOCK = 4808
+
+OCCUPANCY_SQL = """
+    WITH resources AS (
+        SELECT 'room' AS resource_kind, r.id AS room_id, NULL::integer AS console_id, NULL::integer AS table_id,
+               r.name AS resource_name, r.company_id
+        FROM room_name r
+        WHERE %(company_id)s IS NULL OR r.company_id = %(company_id)s
+        UNION ALL
+        SELECT 'console', NULL, c.id, NULL, c.device_num, c.company_id
+        FROM console_number c
+        WHERE %(company_id)s IS NULL OR c.company_id = %(company_id)s
+        UNION ALL
+        SELECT 'table', NULL, NULL, t.id, t.table_num, t.company_id
+        FROM table_tables t
+        WHERE %(company_id)s IS NULL OR t.company_id = %(company_id)s
+    ),
+    hours AS (
+        SELECT h AS bucket_start
+        FROM generate_series(%(start)s::timestamp, %(end)s::timestamp - interval '1 hour', interval '1 hour') h
+    ),
+    intervals AS (
+        SELECT
+            s.id,
+            s.room_id, s.console_id, s.table_id,
+            CASE
+                WHEN s.session_type = 'private' THEN 'room'
+                WHEN s.individual_type = 'table' THEN 'table'
+                ELSE 'console'
+            END AS resource_kind,
+            GREATEST(s.starting_time AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s, %(start)s::timestamp) AS i_start,
+            LEAST(COALESCE(s.ending_time, %(now)s::timestamp) AT TIME ZONE 'UTC' AT TIME ZONE %(tz)s,
+                  %(end)s::timestamp) AS i_end
+        FROM session_session s
+        WHERE s.state IN ('running', 'finished')
+          AND (%(company_id)s IS NULL OR s.company_id = %(company_id)s)
+          AND s.starting_time < %(end_utc)s
+          AND COALESCE(s.ending_time, %(now)s::timestamp) > %(start_utc)s
+    ),
+    buckets AS (
+        SELECT
+            i.resource_kind, i.room_id, i.console_id, i.table_id, h.bucket_start,
+            LEAST(60.0, SUM(EXTRACT(EPOCH FROM (
+                LEAST(i.i_end, h.bucket_start + interval '1 hour') - GREATEST(i.i_start, h.bucket_start)
+            )) / 60.0)) AS occupied_minutes,
+            COUNT(DISTINCT i.id) AS session_count
+        FROM intervals i
+        JOIN hours h ON h.bucket_start < i.i_end AND h.bucket_start + interval '1 hour' > i.i_start
+        GROUP BY i.resource_kind, i.room_id, i.console_id, i.table_id, h.bucket_start
+    )
+    SELECT
+        DATE(h.bucket_start) AS date,
+        EXTRACT(HOUR FROM h.bucket_start)::integer AS hour,
+        res.resource_kind,
+        res.room_id,
+        res.console_id,
+        res.table_id,
+        res.resource_name,
+        res.company_id,
+        COALESCE(b.session_count, 0) AS session_count,
+        COALESCE(b.occupied_minutes, 0.0) AS occupied_minutes,
+        60.0 - COALESCE(b.occupied_minutes, 0.0) AS idle_minutes,
+        COALESCE(b.occupied_minutes, 0.0) * 100.0 / 60.0 AS utilization
+    FROM resources res
+    CROSS JOIN hours h
+    LEFT JOIN buckets b
+        ON b.resource_kind = res.resource_kind
+       AND b.bucket_start = h.bucket_start
+       AND b.room_id IS NOT DISTINCT FROM res.room_id
+       AND b.console_id IS NOT DISTINCT FROM res.console_id
+       AND b.table_id IS NOT DISTINCT FROM res.table_id
+"""
+
+
+class ResourceOccupancy(models.Model):
+    _name = 'resource.occupancy'
+    _description = 'Resource Hourly Occupancy'
+    _rec_name = 'resource_name'
+    _order = 'date desc, hour'
+
+    date = fields.Date(readonly=True, required=True, index=True)
+    hour = fields.Integer(readonly=True, required=True)
+    resource_kind = fields.Selection([
+        ('room', 'Room'),
+        ('console', 'Console'),
+        ('table', 'Table'),
+    ], readonly=True, required=True)
+    room_id = fields.Many2one(comodel_name='room.name', readonly=True, ondelete='cascade')
+    console_id = fields.Many2one(comodel_name='console.number', readonly=True, ondelete='cascade')
+    table_id = fields.Many2one(comodel_name='table.tables', readonly=True, ondelete='cascade')
+    resource_name = fields.Char(readonly=True)
+    company_id = fields.Many2one(comodel_name='res.company', readonly=True)
+    session_count = fields.Integer('Sessions Count', readonly=True)
+    occupied_minutes = fields.Float(readonly=True)
+    idle_minutes = fields.Float(readonly=True)
+    utilization = fields.Float('Utilization %', readonly=True, aggregator='avg')
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS resource_occupancy_company_date_idx
+            ON resource_occupancy (company_id, date)
+        """)
+
+    @api.model
+    def _get_tz(self, company):
+        """Timezone the days and hours of ``company`` are bucketed in."""
+        return company.partner_id.tz or 'UTC'
+
+    @api.model
+    def _get_today(self, company):
+        return datetime.now(pytz.timezone(self._get_tz(company))).date()
+
+    @api.model
+    def _get_query_params(self, start, end, company):
+        tz = self._get_tz(company)
+        self.env.cr.execute("""
+            SELECT (%(start)s::timestamp AT TIME ZONE %(tz)s) AT TIME ZONE 'UTC',
+                   (%(end)s::timestamp AT TIME ZONE %(tz)s) AT TIME ZONE 'UTC'
+        """, {'start': start, 'end': end, 'tz': tz})
+        start_utc, end_utc = self.env.cr.fetchone()
+        return {
+            'start': start,
+            'end': end,
+            'start_utc': start_utc,
+            'end_utc': end_utc,
+            'now': fields.Datetime.now(),
+            'tz': tz,
+            'company_id': company.id,
+        }
+
+    @api.model
+    def _store(self, company, start, end):
+        """Replace the rows of ``company`` between two local naive datetimes, on whole hours, by fresh ones."""
+        params = dict(self._get_query_params(start, end, company), uid=self.env.uid)
+        self.env.cr.execute("""
+            DELETE FROM resource_occupancy WHERE company_id = %s AND date >= %s AND date <= %s
+        """, [company.id, start.date(), (end - timedelta(hours=1)).date()])
+        self.env.cr.execute("""
+            INSERT INTO resource_occupancy (
+                date, hour, resource_kind, room_id, console_id, table_id, resource_name, company_id, session_count,
+                occupied_minutes, idle_minutes, utilization, create_uid, create_date, write_uid, write_date)
+            SELECT q.*, %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (""" + OCCUPANCY_SQL + """) q
+        """, params)
+
+    @api.model
+    def rebuild(self, date_from, date_to, days=None):
+        """Store the hourly occupancy of every day between date_from and date_to (inclusive), or only of ``days``
+        in that span, in the local days of each company.
+
+        Today is only stored up to the current hour when the report is opened (see ``action_open_heatmap``),
+        and stored in full by the next refresh once it is over.
+        """
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        self.env.flush_all()
+        for company in self.env['res.company'].sudo().search([]):
+            last_day = min(date_to, self._get_today(company) - timedelta(days=1))
+            if days is None:
+                spans = [(date_from, last_day)] if date_from <= last_day else []
+            else:
+                spans = self._get_spans([day for day in days if date_from <= day <= last_day])
+            for first, last in spans:
+                self._store(company, datetime.combine(first, time.min),
+                            datetime.combine(last + timedelta(days=1), time.min))
+        self.invalidate_model()
+
+    @api.model
+    def _get_spans(self, days):
+        """``(first, last)`` of each run of consecutive days in ``days``."""
+        spans = []
+        for day in sorted(set(days)):
+            if spans and spans[-1][1] + timedelta(days=1) == day:
+                spans[-1][1] = day
+            else:
+                spans.append([day, day])
+        return [tuple(span) for span in spans]
+
+    @api.model
+    def _mark_sessions(self, sessions):
+        """Mark the local days the started ``sessions`` are counted on, before they are changed or deleted."""
+        now = fields.Datetime.now()
+        days = []
+        for session in sessions.filtered(lambda s: s.state in ('running', 'finished') and s.starting_time):
+            tz = pytz.timezone(self._get_tz(session.company_id))
+            first, last = (pytz.utc.localize(date).astimezone(tz).date()
+                           for date in (session.starting_time, max(session.ending_time or now, session.starting_time)))
+            days += [first + timedelta(days=n) for n in range((last - first).days + 1)]
+        self.env['report.dirty.day']._mark('occupancy', days)
+
+    @api.model
+    def _cron_store_occupancy(self):
+        params = self.env['ir.config_parameter'].sudo()
+        now = fields.Datetime.now()
+        last_run = params.get_param('gaming_app.resource_occupancy_last_run')
+        self.env.flush_all()
+        days = set(self.env['report.dirty.day']._pop('occupancy'))
+        if not last_run:
+            # First run: store the whole history
+            self.env.cr.execute("SELECT MIN(starting_time) FROM session_session WHERE state IN ('running', 'finished')")
+            first = self.env.cr.fetchone()[0]
+            self.rebuild((first or now).date() - timedelta(days=1), now.date())
+        else:
+            # Local days overlapped by the sessions started, finished or edited since the last run, with a margin
+            # for the transactions that were still running then, and those of the sessions deleted or moved since
+            self.env.cr.execute("""
+                SELECT DISTINCT day::date
+                FROM session_session s
+                CROSS JOIN LATERAL (
+                    SELECT COALESCE(rp.tz, 'UTC') AS tz
+                    FROM res_company rc
+                    JOIN res_partner rp ON rp.id = rc.partner_id
+                    WHERE rc.id = s.company_id
+                ) company
+                CROSS JOIN LATERAL generate_series(
+                    date_trunc('day', s.starting_time AT TIME ZONE 'UTC' AT TIME ZONE company.tz),
+                    GREATEST(s.starting_time, COALESCE(s.ending_time, %(now)s)) AT TIME ZONE 'UTC'
+                        AT TIME ZONE company.tz,
+                    interval '1 day') day
+                WHERE s.write_date >= %(since)s AND s.state IN ('running', 'finished')
+                  AND s.starting_time IS NOT NULL
+            """, {'since': fields.Datetime.to_datetime(last_run) - DIRTY_MARGIN, 'now': now})
+            days.update(row[0] for row in self.env.cr.fetchall())
+            # The day that just ended everywhere, whatever the offset of the companies: it may only be stored up to
+            # the hour the report was last opened
+            days.update(now.date() - timedelta(days=n) for n in range(3))
+            self.rebuild(min(days), max(days), days)
+        params.set_param('gaming_app.resource_occupancy_last_run', fields.Datetime.to_string(now))
+
+    @api.model
+    def action_open_heatmap(self):
+        """Store the hours of today so far for the current company, then open the report.
+
+        Past days are read from the stored rows; today's are computed on the fly, each time the report is opened.
+        """
+        company = self.env.company
+        # Concurrent openings would insert today's rows twice: the others show the rows being stored
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", [OCCUPANCY_LOCK, company.id])
+        if self.env.cr.fetchone()[0]:
+            self.env.flush_all()
+            now = datetime.now(pytz.timezone(self._get_tz(company))).replace(tzinfo=None)
+            next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            self._store(company, datetime.combine(now.date(), time.min), next_hour)
+            self.invalidate_model()
+        return self.env['ir.actions.act_window']._for_xml_id('gaming_app.action_resource_occupancy')
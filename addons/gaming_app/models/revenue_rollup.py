@@ -0,0 +1,239 @@
+# coding: utf-8
+
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+PAYMENT_STATUS_SQL = """
+    CASE
+        WHEN am.payment_state = 'paid' THEN 'paid'
+        WHEN am.payment_state = 'partial' THEN 'partial'
+        WHEN am.payment_state = 'in_payment' THEN 'in_payment'
+        WHEN am.payment_state = 'not_paid' AND am.state = 'posted' THEN 'not_paid'
+        WHEN am.state = 'draft' THEN 'draft'
+        WHEN am.state = 'cancel' THEN 'cancel'
+        ELSE 'not_paid'
+    END
+"""
+
+# write_date is the start of the writing transaction: one still running when the cron read ``now`` commits rows
+# dated before it, so every run reads back this far past the previous one
+DIRTY_MARGIN = timedelta(minutes=10)
+
+
+class RevenueRollup(models.Model):
+    _name = 'revenue.rollup'
+    _description = 'Daily Revenue Rollup'
+    _rec_name = 'date'
+    _order = 'date desc'
+
+    date = fields.Date(readonly=True, required=True, index=True)
+    company_id = fields.Many2one(comodel_name='res.company', readonly=True, required=True)
+    currency_id = fields.Many2one(comodel_name='res.currency', readonly=True)
+    resource_kind = fields.Selection([
+        ('room', 'Room'),
+        ('console', 'Console'),
+        ('table', 'Table'),
+        ('cafe', 'Cafe'),
+    ], readonly=True, required=True)
+    room_type_id = fields.Many2one(comodel_name='room.type', readonly=True)
+    console_type_id = fields.Many2one(comodel_name='console.type', readonly=True)
+    table_type_id = fields.Many2one(comodel_name='table.type', readonly=True)
+    payment_status = fields.Selection([
+        ('not_paid', 'Not Paid'),
+        ('in_payment', 'In Payment'),
+        ('paid', 'Paid'),
+        ('partial', 'Partially Paid'),
+        ('reversed', 'Reversed'),
+        ('blocked', 'Blocked'),
+        ('invoicing_legacy', 'Invoicing App Legacy'),
+        ('draft', "Draft"),
+        ('cancel', "Cancelled"),
+    ], readonly=True)
+    session_count = fields.Integer('Sessions Count', readonly=True)
+    order_count = fields.Integer('Orders Count', readonly=True)
+    minutes = fields.Float('Spent Time (Minutes)', readonly=True)
+    time_revenue = fields.Monetary(readonly=True, currency_field='currency_id')
+    product_revenue = fields.Monetary(readonly=True, currency_field='currency_id')
+    cafe_revenue = fields.Monetary(readonly=True, currency_field='currency_id')
+    total_revenue = fields.Monetary(readonly=True, currency_field='currency_id')
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS revenue_rollup_key_uniq
+            ON revenue_rollup (date, company_id, resource_kind,
+                               COALESCE(room_type_id, 0), COALESCE(console_type_id, 0),
+                               COALESCE(table_type_id, 0), COALESCE(payment_status, ''))
+        """)
+
+    @api.model
+    def rebuild(self, date_from=None, date_to=None):
+        """Recompute the rollup rows of every day between date_from and date_to (inclusive)."""
+        self.env.flush_all()
+        if not date_from or not date_to:
+            self.env.cr.execute("""
+                SELECT MIN(d), MAX(d) FROM (
+                    SELECT DATE(starting_time) AS d FROM session_session WHERE state = 'finished'
+                    UNION ALL
+                    SELECT DATE(create_date) AS d FROM cafe_order WHERE state = 'finished'
+                ) days
+            """)
+            first_day, last_day = self.env.cr.fetchone()
+            date_from = date_from or first_day
+            date_to = date_to or last_day
+        if not date_from or not date_to:
+            return
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        days = [date_from + timedelta(days=i) for i in range((date_to - date_from).days + 1)]
+        self._rebuild_days(days)
+
+    @api.model
+    def _rebuild_days(self, days):
+        if not days:
+            return
+        cr = self.env.cr
+        cr.execute("DELETE FROM revenue_rollup WHERE date = ANY(%s)", [list(days)])
+        cr.execute("""
+            INSERT INTO revenue_rollup (
+                date, company_id, currency_id, resource_kind, room_type_id, console_type_id, table_type_id,
+                payment_status, session_count, order_count, minutes, time_revenue, product_revenue,
+                cafe_revenue, total_revenue, create_uid, create_date, write_uid, write_date)
+            SELECT
+                DATE(s.starting_time),
+                s.company_id,
+                comp.currency_id,
+                CASE
+                    WHEN s.session_type = 'private' THEN 'room'
+                    WHEN s.individual_type = 'table' THEN 'table'
+                    ELSE 'console'
+                END,
+                CASE WHEN s.session_type = 'private' THEN r.type_id END,
+                CASE WHEN s.session_type = 'public' AND s.individual_type = 'console' THEN c.type_id END,
+                CASE WHEN s.session_type = 'public' AND s.individual_type = 'table' THEN t.type_id END,
+                COALESCE(""" + PAYMENT_STATUS_SQL + """, 'not_paid'),
+                COUNT(*),
+                0,
+                SUM(COALESCE(EXTRACT(EPOCH FROM (s.ending_time - s.starting_time)) / 60.0, 0.0)),
+                SUM(COALESCE(s.time_price, 0.0)),
+                SUM(COALESCE(lines.amount, 0.0)),
+                0.0,
+                SUM(COALESCE(s.time_price, 0.0) + COALESCE(lines.amount, 0.0)),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM session_session s
+            JOIN res_company comp ON comp.id = s.company_id
+            LEFT JOIN room_name r ON r.id = s.room_id
+            LEFT JOIN console_number c ON c.id = s.console_id
+            LEFT JOIN table_tables t ON t.id = s.table_id
+            LEFT JOIN LATERAL (
+                SELECT SUM(ssl.discount_included) AS amount
+                FROM session_session_line ssl
+                WHERE ssl.session_id = s.id
+            ) lines ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT m.payment_state, m.state
+                FROM account_move m
+                WHERE m.session_id = s.id AND m.move_type = 'out_invoice'
+                ORDER BY m.create_date DESC
+                LIMIT 1
+            ) am ON TRUE
+            WHERE s.state = 'finished'
+              AND DATE(s.starting_time) = ANY(%(days)s)
+            GROUP BY 1, 2, 3, 4, 5, 6, 7, 8
+        """, {'uid': self.env.uid, 'days': list(days)})
+        cr.execute("""
+            INSERT INTO revenue_rollup (
+                date, company_id, currency_id, resource_kind, payment_status, session_count, order_count,
+                minutes, time_revenue, product_revenue, cafe_revenue, total_revenue,
+                create_uid, create_date, write_uid, write_date)
+            SELECT
+                DATE(co.create_date),
+                co.company_id,
+                comp.currency_id,
+                'cafe',
+                COALESCE(""" + PAYMENT_STATUS_SQL + """, 'not_paid'),
+                0,
+                COUNT(*),
+                0.0,
+                0.0,
+                0.0,
+                SUM(COALESCE(lines.amount, 0.0)),
+                SUM(COALESCE(lines.amount, 0.0)),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM cafe_order co
+            JOIN res_company comp ON comp.id = co.company_id
+            LEFT JOIN LATERAL (
+                SELECT SUM(col.discount_included) AS amount
+                FROM cafe_order_line col
+                WHERE col.order_id = co.id
+            ) lines ON TRUE
+            LEFT JOIN LATERAL (
+                SELECT m.payment_state, m.state
+                FROM account_move m
+                WHERE m.cafe_id = co.id AND m.move_type = 'out_invoice'
+                ORDER BY m.create_date DESC
+                LIMIT 1
+            ) am ON TRUE
+            WHERE co.state = 'finished'
+              AND DATE(co.create_date) = ANY(%(days)s)
+            GROUP BY 1, 2, 3, 5
+        """, {'uid': self.env.uid, 'days': list(days)})
+        self.invalidate_model()
+
+    @api.model
+    def _get_dirty_days(self, since):
+        """Days whose sessions, orders, lines or invoices changed after ``since``, or that lost one of them."""
+        self.env.cr.execute("""
+            SELECT DATE(s.starting_time) FROM session_session s
+            WHERE s.write_date >= %(since)s AND s.starting_time IS NOT NULL
+            UNION
+            SELECT DATE(s.starting_time) FROM session_session_line l
+            JOIN session_session s ON s.id = l.session_id
+            WHERE l.write_date >= %(since)s AND s.starting_time IS NOT NULL
+            UNION
+            SELECT DATE(s.starting_time) FROM account_move m
+            JOIN session_session s ON s.id = m.session_id
+            WHERE m.write_date >= %(since)s AND s.starting_time IS NOT NULL
+            UNION
+            SELECT DATE(co.create_date) FROM cafe_order co
+            WHERE co.write_date >= %(since)s
+            UNION
+            SELECT DATE(co.create_date) FROM cafe_order_line l
+            JOIN cafe_order co ON co.id = l.order_id
+            WHERE l.write_date >= %(since)s
+            UNION
+            SELECT DATE(co.create_date) FROM account_move m
+            JOIN cafe_order co ON co.id = m.cafe_id
+            WHERE m.write_date >= %(since)s
+        """, {'since': since})
+        days = {row[0] for row in self.env.cr.fetchall()}
+        return sorted(days.union(self.env['report.dirty.day']._pop('revenue')))
+
+    @api.model
+    def _cron_refresh_rollup(self):
+        params = self.env['ir.config_parameter'].sudo()
+        now = fields.Datetime.now()
+        last_run = params.get_param('gaming_app.revenue_rollup_last_run')
+        self.env.flush_all()
+        if last_run:
+            self._rebuild_days(self._get_dirty_days(fields.Datetime.to_datetime(last_run) - DIRTY_MARGIN))
+        else:
+            self.env['report.dirty.day']._pop('revenue')
+            self.rebuild()
+        params.set_param('gaming_app.revenue_rollup_last_run', fields.Datetime.to_string(now))
+
+    @api.model
+    def get_daily_revenue(self, date_from, date_to):
+        """Return {date: {'sessions': amount, 'cafe': amount}} read from the rollup rows of the current company."""
+        result = {}
+        groups = self._read_group(
+            [('company_id', '=', self.env.company.id), ('date', '>=', date_from), ('date', '<=', date_to)],
+            groupby=['date:day'],
+            aggregates=['time_revenue:sum', 'product_revenue:sum', 'cafe_revenue:sum'],
+        )
+        for day, time_revenue, product_revenue, cafe_revenue in groups:
+            result[fields.Date.to_date(day)] = {
+                'sessions': time_revenue + product_revenue,
+                'cafe': cafe_revenue,
+            }
+        return result
@@ -5,8 +5,11 @@ from odoo import models, fields
 
 class RoomName(models.Model):
     _name = 'room.name'
+    _inherit = ['gaming.resource.mixin']
     _description = 'Room Name'
 
+    _resource_kind = 'room'
+
     sequence = fields.Integer('Sequence', default=1)
     name = fields.Char(required=True)
     type_id = fields.Many2one(comodel_name='room.type', required=True)
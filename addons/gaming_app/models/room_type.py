@@ -5,8 +5,11 @@ from odoo import models, fields, api
 
 class RoomType(models.Model):
     _name = 'room.type'
+    _inherit = ['gaming.resource.type.mixin']
     _description = 'Room Type'
 
+    _resource_model = 'room.name'
+
     sequence = fields.Integer('Sequence', default=1)
     name = fields.Char(required=True)
     price_per_hour = fields.Float(string='Price/H', required=True)
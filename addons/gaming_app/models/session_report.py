@@ -3,6 +3,7 @@ from odoo import models, fields, tools
 
 class SessionReport(models.Model):
     _name = "session.report"
+    _inherit = ['report.replica.mixin']
     _description = "Session Analysis Report"
     _auto = False
     _rec_name = 'date'
@@ -56,6 +57,7 @@ class SessionReport(models.Model):
     room_id = fields.Many2one('room.name', string='Room', readonly=True)
     console_id = fields.Many2one('console.number', string='Console', readonly=True)
     table_id = fields.Many2one('table.tables', string='Table', readonly=True)
+    resource_id = fields.Many2one('gaming.resource', string='Resource', readonly=True)
 
     # Resource Types
     room_type_id = fields.Many2one('room.type', string='Room Type', readonly=True)
@@ -73,6 +75,7 @@ class SessionReport(models.Model):
     products_total = fields.Monetary('Products Total', readonly=True, currency_field='currency_id')
     total = fields.Monetary('Total Amount', readonly=True, currency_field='currency_id')
     currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
 
     # Aggregated Fields for Pivot Analysis
     session_count = fields.Integer('Sessions Count', readonly=True)
@@ -88,7 +91,7 @@ class SessionReport(models.Model):
         self.env.cr.execute("""CREATE or REPLACE VIEW %s as (
             SELECT 
                 -- Primary Key
-                row_number() OVER () AS id,
+                s.id AS id,
 
                 -- Date Analysis
                 DATE(s.starting_time) AS date,
@@ -130,6 +133,7 @@ class SessionReport(models.Model):
                 s.room_id AS room_id,
                 s.console_id AS console_id,
                 s.table_id AS table_id,
+                s.resource_id AS resource_id,
 
                 -- Resource Types
                 CASE 
@@ -199,6 +203,7 @@ class SessionReport(models.Model):
 
                 -- Currency
                 comp.currency_id AS currency_id,
+                s.company_id AS company_id,
 
                 -- Aggregated Fields
                 1 AS session_count,
@@ -251,7 +256,7 @@ class SessionReport(models.Model):
                 END AS revenue_per_hour
 
             FROM session_session s
-            LEFT JOIN res_company comp ON comp.id = 1
+            LEFT JOIN res_company comp ON comp.id = s.company_id
             LEFT JOIN room_name r ON r.id = s.room_id
             LEFT JOIN room_type rt ON rt.id = r.type_id
             LEFT JOIN console_number c ON c.id = s.console_id
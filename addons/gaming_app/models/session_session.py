@@ -2,24 +2,42 @@
 
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+
+# Fields that move a started session in the stored occupancy report
+OCCUPANCY_FIELDS = {'state', 'company_id', 'session_type', 'individual_type', 'room_id', 'console_id', 'table_id',
+                    'starting_time', 'ending_time'}
 
 
 class SessionSession(models.Model):
     _name = 'session.session'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['state.audit.mixin', 'frontdesk.customer.mixin', 'mail.thread', 'mail.activity.mixin']
     _description = 'Sessions'
     _rec_name = 'ref'
-    _order = 'state DESC'
+    _order = 'state DESC, id DESC'
+    _check_company_auto = True
 
     ref = fields.Char(default='New', readonly=True, copy=False)
+    company_id = fields.Many2one(comodel_name='res.company', required=True, default=lambda self: self.env.company)
     partner_id = fields.Many2one(comodel_name='res.partner', required=True)
-    room_id = fields.Many2one(comodel_name='room.name', domain="[('id', 'not in', unavailable_rooms_ids)]")
-    console_id = fields.Many2one(comodel_name='console.number', domain="[('id', 'not in', unavailable_consoles_ids)]")
-    table_id = fields.Many2one(comodel_name='table.tables', domain="[('id', 'not in', unavailable_table_ids)]")
+    room_id = fields.Many2one(comodel_name='room.name', domain="[('id', 'not in', unavailable_rooms_ids)]",
+                              check_company=True)
+    console_id = fields.Many2one(comodel_name='console.number', domain="[('id', 'not in', unavailable_consoles_ids)]",
+                                 check_company=True)
+    table_id = fields.Many2one(comodel_name='table.tables', domain="[('id', 'not in', unavailable_table_ids)]",
+                               check_company=True)
     room_type_id = fields.Many2one(related='room_id.type_id')
     console_type_id = fields.Many2one(related='console_id.type_id')
     table_type_id = fields.Many2one(related='table_id.type_id')
+    resource_id = fields.Many2one(comodel_name='gaming.resource', compute='_compute_resource_id', store=True,
+                                  index=True)
     move_ids = fields.One2many(comodel_name='account.move', inverse_name='session_id')
+    payment_job_ids = fields.One2many(comodel_name='payment.job', inverse_name='session_id')
+    payment_pending = fields.Boolean(compute='_compute_payment_pending')
+    amount_invoiced = fields.Monetary(compute='_compute_balance', currency_field='currency_id', store=True)
+    amount_paid = fields.Monetary(compute='_compute_balance', currency_field='currency_id', store=True)
+    amount_due = fields.Monetary(string='Outstanding', compute='_compute_balance', currency_field='currency_id',
+                                 store=True)
     session_type = fields.Selection([
         ('public', 'Public'),
         ('private', 'Private'),
@@ -44,8 +62,23 @@ class SessionSession(models.Model):
         ('draft', "Draft"),
         ('cancel', "Cancelled"),
     ], compute='_compute_payment_status')
+    partner_activity_id = fields.Many2one(comodel_name='partner.activity', compute='_compute_partner_activity_id')
+    partner_visit_count = fields.Integer(related='partner_activity_id.visit_count', string='Visits')
+    partner_hours_played = fields.Float(related='partner_activity_id.hours_played', string='Hours Played')
+    partner_total_spend = fields.Monetary(related='partner_activity_id.total_spend', string='Total Spend')
+    partner_outstanding = fields.Monetary(related='partner_activity_id.outstanding_amount', string='Unpaid Balance')
+    partner_last_visit = fields.Datetime(related='partner_activity_id.last_visit', string='Last Visit')
+    partner_favourite_console_type_id = fields.Many2one(related='partner_activity_id.favourite_console_type_id',
+                                                        string='Favourite Console')
+    agent_flag = fields.Selection([
+        ('auto_started', 'Started by Console'),
+        ('idle', 'Console Idle'),
+        ('auto_finished', 'Finished by Console'),
+    ], readonly=True, copy=False, help="Set when the console agent's heartbeats started, flagged or finished "
+                                      "the session.")
     starting_time = fields.Datetime(readonly=True)
     ending_time = fields.Datetime(readonly=True)
+    finished_uid = fields.Many2one(comodel_name='res.users', string='Finished By', readonly=True, copy=False)
     spent_time = fields.Float(compute='_compute_spent_time')
     time_price = fields.Monetary(compute='_compute_time_price', currency_field='currency_id', store=True)
     currency_id = fields.Many2one(comodel_name='res.currency', compute='_compute_currency')
@@ -58,6 +91,42 @@ class SessionSession(models.Model):
     unavailable_table_ids = fields.Many2many(comodel_name='table.tables', compute='_compute_room_console_table_domain',
                                              store=True)
 
+    def init(self):
+        # Every dashboard and report path filters on the company first; (company_id, state, id) also serves the
+        # default order and the keyset pagination of the session list
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_company_state_idx
+            ON session_session (company_id, state, id)
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_company_starting_time_idx
+            ON session_session (company_id, starting_time)
+        """)
+        # The incremental refreshes of the reports look up the recent writes
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_write_date_idx
+            ON session_session (write_date)
+        """)
+        # Open sessions are a small, hot slice of the table: resource availability and the reservation cron
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_open_resource_idx
+            ON session_session (resource_id) WHERE state IN ('available', 'running')
+        """)
+        # Cashier shift totals: the sessions a cashier finished during the shift
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_finished_uid_ending_time_idx
+            ON session_session (finished_uid, ending_time) WHERE state = 'finished'
+        """)
+        # Unpaid balances of the customer profiles: the few finished sessions that are not fully paid
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_partner_due_idx
+            ON session_session (partner_id, company_id) WHERE state = 'finished' AND amount_due != 0
+        """)
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_reserved_starting_time_idx
+            ON session_session (starting_time) WHERE state = 'available'
+        """)
+
     @api.constrains('starting_time', 'ending_time')
     def _check_negative_time(self):
         for rec in self:
@@ -76,16 +145,37 @@ class SessionSession(models.Model):
         self.console_id = None
         self.table_id = None
 
+    @api.model
+    def search_keyset(self, domain=None, after=None, limit=80):
+        """Page through sessions in their default order without OFFSET.
+
+        ``after`` is the ``(state, id)`` of the last session of the previous page; the row comparison lets
+        PostgreSQL resume the scan of the ``(company_id, state, id)`` index where the previous page stopped.
+        """
+        return self.browse(self._keyset_query(domain, after, limit).get_result_ids())
+
+    @api.model
+    def _keyset_query(self, domain=None, after=None, limit=80):
+        query = self._search(domain or [])
+        if after:
+            state, last_id = after
+            query.add_where(SQL("(%s, %s) < (%s, %s)",
+                                SQL.identifier(self._table, 'state'), SQL.identifier(self._table, 'id'),
+                                state, last_id))
+        query.order = SQL("%s DESC, %s DESC", SQL.identifier(self._table, 'state'),
+                          SQL.identifier(self._table, 'id'))
+        query.limit = limit
+        return query
+
     def _check_reservation_time(self):
         sessions = self.env['session.session'].search([('state', '=', 'available'), ('starting_time', '<=', fields.Datetime.now())])
         if sessions:
-            for session in sessions:
-                session.state = 'running'
+            sessions.with_context(tracking_disable=True).write({'state': 'running'})
 
     @api.model_create_multi
     def create(self, vals_list):
         for vals in vals_list:
-            vals['starting_time'] = fields.Datetime.now()
+            vals['starting_time'] = vals.get('starting_time') or fields.Datetime.now()
             if vals['session_type'] == 'private':
                 vals['ref'] = self.env['ir.sequence'].next_by_code('seq_room_session', sequence_date=self.starting_time)
             if vals['session_type'] == 'public':
@@ -97,7 +187,29 @@ class SessionSession(models.Model):
                                                                        sequence_date=self.starting_time)
             vals['state'] = 'running'
 
-        return super().create(vals_list)
+        sessions = super().create(vals_list)
+        self.env['waitlist.entry']._refresh_estimates()
+        return sessions
+
+    def write(self, vals):
+        # The occupancy report finds the new days of the sessions from their write_date, not the days they leave
+        if OCCUPANCY_FIELDS.intersection(vals):
+            self.env['resource.occupancy']._mark_sessions(self)
+        return super().write(vals)
+
+    @api.depends('time_price', 'session_line_ids.discount_included', 'move_ids.move_type', 'move_ids.state',
+                 'move_ids.amount_total', 'move_ids.amount_residual')
+    def _compute_balance(self):
+        for rec in self:
+            invoices = rec.move_ids.filtered(lambda m: m.move_type == 'out_invoice' and m.state == 'posted')
+            rec.amount_invoiced = sum(invoices.mapped('amount_total'))
+            rec.amount_paid = rec.amount_invoiced - sum(invoices.mapped('amount_residual'))
+            rec.amount_due = rec.total - rec.amount_paid
+
+    @api.depends('payment_job_ids.state')
+    def _compute_payment_pending(self):
+        for rec in self:
+            rec.payment_pending = any(job.state == 'pending' for job in rec.payment_job_ids)
 
     @api.depends('move_ids.status_in_payment')
     def _compute_payment_status(self):
@@ -109,24 +221,33 @@ class SessionSession(models.Model):
             else:
                 session.payment_status = None
 
+    @api.depends('session_type', 'individual_type', 'room_id.resource_id', 'console_id.resource_id',
+                 'table_id.resource_id')
+    def _compute_resource_id(self):
+        for session in self:
+            if session.session_type == 'private':
+                session.resource_id = session.room_id.resource_id
+            elif session.individual_type == 'console':
+                session.resource_id = session.console_id.resource_id
+            elif session.individual_type == 'table':
+                session.resource_id = session.table_id.resource_id
+            else:
+                session.resource_id = False
+
     @api.depends('room_id', 'console_id', 'table_id')
     def _compute_room_console_table_domain(self):
+        busy = self.env['gaming.resource'].browse(self.env['gaming.resource']._get_busy_resource_ids())
+        rooms = self.env['room.name'].browse([r.res_id for r in busy if r.kind == 'room'])
+        consoles = self.env['console.number'].browse([r.res_id for r in busy if r.kind == 'console'])
+        tables = self.env['table.tables'].browse([r.res_id for r in busy if r.kind == 'table'])
         for session in self:
-            rooms = self.env['session.session'].search(
-                [('session_type', '=', 'private'), ('state', 'in', ('available', 'running'))])
-            consoles = self.env['session.session'].search(
-                [('session_type', '=', 'public'), ('individual_type', '=', 'console'),
-                 ('state', 'in', ('available', 'running'))])
-            tables = self.env['session.session'].search(
-                [('session_type', '=', 'public'), ('individual_type', '=', 'table'),
-                 ('state', 'in', ('available', 'running'))])
             if session.session_type == 'private':
-                session.unavailable_rooms_ids = rooms.mapped('room_id')
+                session.unavailable_rooms_ids = rooms
             elif session.session_type == 'public':
                 if session.individual_type == 'console':
-                    session.unavailable_consoles_ids = consoles.mapped('console_id')
+                    session.unavailable_consoles_ids = consoles
                 elif session.individual_type == 'table':
-                    session.unavailable_table_ids = tables.mapped('table_id')
+                    session.unavailable_table_ids = tables
 
     @api.depends('session_line_ids', 'session_line_ids.discount_included', 'session_line_ids.discount',
                  'session_line_ids.product_uom_qty', 'time_price', 'spent_time')
@@ -143,32 +264,60 @@ class SessionSession(models.Model):
             else:
                 rec.spent_time = 0.0
 
-    @api.depends('spent_time', 'room_type_id', 'console_type_id', 'table_type_id', 'room_type_id.price_per_hour',
-                 'console_type_id.price_per_hour', 'table_type_id.price_per_hour', 'starting_time', 'ending_time',
-                 'session_type')
+    @api.depends('spent_time', 'resource_id', 'resource_id.price_per_hour', 'starting_time', 'ending_time')
     def _compute_time_price(self):
         for rec in self:
             price = 0.0
-            if rec.session_type == 'private':
-                if rec.spent_time and rec.room_type_id:
-                    price = (rec.spent_time / 60) * rec.room_type_id.price_per_hour
-            elif rec.session_type == 'public':
-                if rec.spent_time and rec.console_type_id:
-                    price = (rec.spent_time / 60) * rec.console_type_id.price_per_hour
-                if rec.spent_time and rec.table_type_id:
-                    price = (rec.spent_time / 60) * rec.table_type_id.price_per_hour
+            if rec.spent_time and rec.resource_id:
+                price = (rec.spent_time / 60) * rec.resource_id.price_per_hour
             rec.time_price = price
 
+    @api.depends('partner_id', 'company_id')
+    def _compute_partner_activity_id(self):
+        activities = self.env['partner.activity'].search([
+            ('partner_id', 'in', self.partner_id.ids),
+            ('company_id', 'in', self.company_id.ids),
+        ])
+        by_key = {(activity.partner_id.id, activity.company_id.id): activity for activity in activities}
+        for session in self:
+            session.partner_activity_id = by_key.get((session.partner_id.id, session.company_id.id), False)
+
+    @api.depends('company_id')
     def _compute_currency(self):
         for session in self:
-            session.currency_id = self.env.company.currency_id
+            session.currency_id = session.company_id.currency_id or self.env.company.currency_id
 
     def action_running(self):
-        self.state = 'running'
+        sessions = self.filtered(lambda s: s.state == 'available')
+        if len(sessions) > 1:
+            sessions.with_context(tracking_disable=True).write({'state': 'running'})
+            sessions._log_bulk_transition("Started")
+        else:
+            sessions.write({'state': 'running'})
 
     def action_finished(self):
-        self.ending_time = fields.Datetime.now()
-        self.state = 'finished'
+        self.filtered(lambda s: s.state == 'running')._set_finished(fields.Datetime.now())
+
+    def _set_finished(self, ending_time):
+        """Finish all sessions with one write; time prices are then recomputed in a single batch.
+
+        Bulk finishes skip mail tracking: each transition goes to the state audit log, and the batch is summarized
+        in a single chatter note.
+        """
+        if len(self) > 1:
+            self.with_context(tracking_disable=True).write({
+                'ending_time': ending_time, 'state': 'finished', 'finished_uid': self.env.uid,
+            })
+            self._log_bulk_transition("Finished")
+        else:
+            self.write({'ending_time': ending_time, 'state': 'finished', 'finished_uid': self.env.uid})
+        self.env['partner.activity']._record_sessions(self)
+        self.env['waitlist.entry']._refresh_estimates()
+
+    def _log_bulk_transition(self, transition):
+        """Post a single note summarizing a bulk transition, on the first session of the batch."""
+        body = "%s %s sessions together: %s" % (transition, len(self), ', '.join(self.sorted('id').mapped('ref')))
+        self.sorted('id')[:1]._message_log(body=body)
 
     def action_create_invoice(self):
         return {
@@ -194,7 +343,7 @@ class SessionSession(models.Model):
 class SessionSessionLine(models.Model):
     _name = 'session.session.line'
 
-    session_id = fields.Many2one(comodel_name='session.session')
+    session_id = fields.Many2one(comodel_name='session.session', index=True)
     product_template_id = fields.Many2one(
         string="Product Template",
         comodel_name='product.template',
@@ -243,6 +392,25 @@ class SessionSessionLine(models.Model):
         digits='Discount',
         store=True, readonly=False, precompute=True)
 
+    def init(self):
+        # The incremental refreshes of the product sales report and of the revenue rollup look up the recent writes
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS session_session_line_write_date_idx
+            ON session_session_line (write_date)
+        """)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        self.env['bar.queue.item']._create_from_lines(session_lines=lines)
+        return lines
+
+    def unlink(self):
+        sessions = self.session_id.filtered(lambda s: s.state == 'finished' and s.starting_time)
+        self.env['report.dirty.day']._mark('revenue', [session.starting_time.date() for session in sessions])
+        self.env['product.sales.report']._forget('session', line_ids=self.ids)
+        return super().unlink()
+
     @api.depends('product_uom_qty', 'discount', 'price_unit')
     def _compute_disc_excl(self):
         for line in self:
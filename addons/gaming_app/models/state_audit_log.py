@@ -0,0 +1,83 @@
+# coding: utf-8
+
+from odoo import models, fields, api
+
+
+class StateAuditLog(models.Model):
+    _name = 'state.audit.log'
+    _description = 'State Change Audit Log'
+    _order = 'date desc, id desc'
+    _log_access = False
+
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    res_id = fields.Integer(string='Record', required=True, readonly=True)
+    old_state = fields.Char(readonly=True)
+    new_state = fields.Char(readonly=True)
+    user_id = fields.Many2one(comodel_name='res.users', readonly=True)
+    date = fields.Datetime(readonly=True, default=fields.Datetime.now)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS state_audit_log_res_idx
+            ON state_audit_log (res_model, res_id, date DESC)
+        """)
+
+
+class StateAuditMixin(models.AbstractModel):
+    """Record ``state`` transitions in ``state.audit.log`` instead of mail tracking.
+
+    Bulk paths (crons, imports, batch actions) always disable tracking and write to the audit log; when the
+    ``gaming_app.compact_audit`` system parameter is set every transition does. The log only replaces the
+    per-record tracking values: batch actions still post their own summary note. Must be listed before
+    ``mail.thread`` in ``_inherit`` so that it runs first.
+    """
+    _name = 'state.audit.mixin'
+    _description = 'State Audit Mixin'
+
+    state_audit_ids = fields.Many2many(comodel_name='state.audit.log', compute='_compute_state_audit_ids',
+                                       string='State History')
+
+    def _compute_state_audit_ids(self):
+        logs = self.env['state.audit.log'].search([('res_model', '=', self._name), ('res_id', 'in', self.ids)])
+        for rec in self:
+            rec.state_audit_ids = logs.filtered(lambda log: log.res_id == rec.id)
+
+    @api.model
+    def _use_compact_audit(self):
+        context = self.env.context
+        return bool(
+            context.get('tracking_disable')
+            or context.get('import_file')
+            or self.env['ir.config_parameter'].sudo().get_param('gaming_app.compact_audit')
+        )
+
+    def _log_state_changes(self, old_states):
+        self.env['state.audit.log'].sudo().create([{
+            'res_model': self._name,
+            'res_id': rec.id,
+            'old_state': old_states.get(rec.id),
+            'new_state': rec.state,
+            'user_id': self.env.uid,
+        } for rec in self if old_states.get(rec.id) != rec.state])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        if not self._use_compact_audit():
+            return super().create(vals_list)
+        records = super(StateAuditMixin, self.with_context(
+            tracking_disable=True, mail_create_nolog=True, mail_create_nosubscribe=True,
+        )).create(vals_list)
+        records._log_state_changes({})
+        return records.with_env(self.env)
+
+    def write(self, vals):
+        if 'state' not in vals or not self._use_compact_audit():
+            return super().write(vals)
+        old_states = {rec.id: rec.state for rec in self}
+        res = super(StateAuditMixin, self.with_context(tracking_disable=True)).write(vals)
+        self._log_state_changes(old_states)
+        return res
+
+    def unlink(self):
+        self.env['state.audit.log'].sudo().search([('res_model', '=', self._name), ('res_id', 'in', self.ids)]).unlink()
+        return super().unlink()
@@ -0,0 +1,124 @@
+# coding: utf-8
+
+import logging
+
+from odoo import models, api
+from odoo.models import NewId
+from odoo.tools import float_compare
+
+_logger = logging.getLogger(__name__)
+
+# Stored computed fields the repair tool checks by default, per model
+REPAIR_FIELDS = {
+    'session.session': ['time_price', 'unavailable_rooms_ids', 'unavailable_consoles_ids', 'unavailable_table_ids'],
+    'session.session.line': ['price_unit', 'discount_excluded', 'discount_included'],
+    'cafe.order': ['unavailable_table_ids'],
+    'cafe.order.line': ['price_unit', 'discount_excluded', 'discount_included'],
+}
+# A chunk waits at most this long for a row lock held by the front desk before it is reported as skipped
+LOCK_TIMEOUT = '2s'
+MAX_DIFFS = 20
+
+
+class StoredComputeRepair(models.AbstractModel):
+    """Find and fix stored computed values that no longer match their compute method.
+
+    The work is split in id ranges (see ``_get_chunks``) that are meant to run in their own transaction each,
+    possibly in parallel processes: see ``scripts/recompute_stored_fields.py``.
+    """
+    _name = 'stored.compute.repair'
+    _description = 'Stored Computed Fields Repair'
+
+    @api.model
+    def _get_chunks(self, model_name, chunk_size):
+        """``(id_from, id_to)`` ranges, upper bound excluded, covering every record of ``model_name``."""
+        self.env.cr.execute('SELECT MIN(id), MAX(id) FROM "%s"' % self.env[model_name]._table)
+        low, high = self.env.cr.fetchone()
+        if low is None:
+            return []
+        return [(start, min(start + chunk_size, high + 1)) for start in range(low, high + 1, chunk_size)]
+
+    def _snapshot(self, records, fnames):
+        return {
+            rec._origin.id: {
+                fname: frozenset(rec[fname]._origin.ids) if rec._fields[fname].type in ('many2many', 'one2many')
+                else rec[fname]
+                for fname in fnames
+            } for rec in records
+        }
+
+    def _compute_fresh(self, records, fnames):
+        """Snapshot of the values the compute methods give for ``fnames`` on ``records``, without touching them.
+
+        The values are computed on new records standing in for ``records``: they read their dependencies from the
+        originals but keep the results in cache entries of their own, which are never flushed. The stored fields of
+        ``records`` are protected meanwhile so that nothing in a compute method can mark them for recomputation.
+        """
+        shadows = records.browse([NewId(rec.id) for rec in records])
+        with self.env.protecting([records._fields[fname] for fname in fnames], records):
+            for fname in fnames:
+                records._fields[fname].compute_value(shadows)
+            return self._snapshot(shadows, fnames)
+
+    def _differs(self, record, fname, old, new):
+        field = record._fields[fname]
+        if field.type == 'monetary':
+            currency = record[field.get_currency_field(record)]
+            if currency:
+                return not currency.is_zero((new or 0.0) - (old or 0.0))
+        if field.type in ('float', 'monetary'):
+            digits = field.get_digits(self.env) if field.type == 'float' else None
+            return float_compare(old or 0.0, new or 0.0, precision_digits=digits[1] if digits else 6) != 0
+        return old != new
+
+    @api.model
+    def _repair_chunk(self, model_name, fnames, id_from, id_to, domain=None, dry_run=False):
+        """Recompute ``fnames`` on the records of ``model_name`` with ``id_from <= id < id_to``.
+
+        Fresh values are computed aside (see ``_compute_fresh``) and compared with the stored ones; a dry run stops
+        there. Otherwise only the stale records are locked (skipping those the front desk is editing) and
+        recomputed, along with the stored fields that depend on them. Returns the counts and a sample of the
+        differences found.
+        """
+        self.env.cr.execute("SET LOCAL lock_timeout = '%s'" % LOCK_TIMEOUT)
+        Model = self.env[model_name].with_context(active_test=False, tracking_disable=True)
+        records = Model.search([('id', '>=', id_from), ('id', '<', id_to)] + (domain or []), order='id')
+        result = {'model': model_name, 'range': [id_from, id_to], 'checked': len(records),
+                  'stale': 0, 'fixed': 0, 'skipped': [], 'diffs': []}
+        if not records:
+            return result
+
+        stored = self._snapshot(records, fnames)
+        fresh = self._compute_fresh(records, fnames)
+
+        stale = {}
+        for rec in records:
+            changed = [fname for fname in fnames
+                       if self._differs(rec, fname, stored[rec.id][fname], fresh[rec.id][fname])]
+            if changed:
+                stale[rec.id] = changed
+                for fname in changed[:max(MAX_DIFFS - len(result['diffs']), 0)]:
+                    result['diffs'].append([rec.id, fname, self._to_report(stored[rec.id][fname]),
+                                            self._to_report(fresh[rec.id][fname])])
+        result['stale'] = len(stale)
+        if not stale or dry_run:
+            return result
+
+        self.env.cr.execute('SELECT id FROM "%s" WHERE id = ANY(%%s) FOR UPDATE SKIP LOCKED' % Model._table,
+                            [list(stale)])
+        lockable = Model.browse(sorted(row[0] for row in self.env.cr.fetchall()))
+        result['skipped'] = sorted(set(stale) - set(lockable.ids))
+        for fname in fnames:
+            self.env.add_to_compute(Model._fields[fname], lockable.filtered(lambda rec: fname in stale[rec.id]))
+        lockable.modified(fnames)
+        self.env.flush_all()
+        result['fixed'] = len(lockable)
+        _logger.info("Repaired %s stale %s records in [%s, %s)", len(lockable), model_name, id_from, id_to)
+        return result
+
+    def _to_report(self, value):
+        if isinstance(value, frozenset):
+            return sorted(value)
+        if isinstance(value, models.BaseModel):
+            return value.ids
+        return value
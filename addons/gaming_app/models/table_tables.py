@@ -5,9 +5,13 @@ from odoo import models, fields
 
 class TableTables(models.Model):
     _name = 'table.tables'
+    _inherit = ['gaming.resource.mixin']
     _description = 'Tables'
     _rec_name = 'table_num'
 
+    _resource_kind = 'table'
+    _resource_name_field = 'table_num'
+
     sequence = fields.Integer('Sequence', default=1)
     table_num = fields.Char(required=True)
     type_id = fields.Many2one(comodel_name='table.type', required=True)
@@ -5,8 +5,11 @@ from odoo import models, fields, api
 
 class TableType(models.Model):
     _name = 'table.type'
+    _inherit = ['gaming.resource.type.mixin']
     _description = 'Table Type'
 
+    _resource_model = 'table.tables'
+
     sequence = fields.Integer('Sequence', default=1)
     name = fields.Char(required=True)
     price_per_hour = fields.Float(string='Price/H', required=True)
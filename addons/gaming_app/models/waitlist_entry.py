@@ -0,0 +1,257 @@
+# coding: utf-8
+
+from collections import defaultdict
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+WAITLIST_CHANNEL = 'gaming_app_waitlist'
+
+RESOURCE_KINDS = [
+    ('room', 'Room'),
+    ('console', 'Console'),
+    ('table', 'Table'),
+]
+TYPE_FIELDS = {
+    'room': 'room_type_id',
+    'console': 'console_type_id',
+    'table': 'table_type_id',
+}
+
+# Expected release of every resource (of one company, or all when ``company_id`` is NULL), ranked per type.
+# Each resource of a type is a slot that frees up after the expected remaining time of its session: the next
+# duration quantile above the elapsed time, for the type and the current hour of the week; a free one is 0.
+SLOTS_SQL = """
+    slots AS (
+        SELECT
+            r.company_id, r.kind, r.type_res_id,
+            CASE
+                WHEN s.id IS NULL THEN 0.0
+                ELSE GREATEST(CASE
+                    WHEN e.elapsed < COALESCE(d.p50, 60.0) THEN COALESCE(d.p50, 60.0)
+                    WHEN e.elapsed < COALESCE(d.p75, 90.0) THEN COALESCE(d.p75, 90.0)
+                    WHEN e.elapsed < COALESCE(d.p90, 120.0) THEN COALESCE(d.p90, 120.0)
+                    ELSE e.elapsed + 10.0
+                END - e.elapsed, 1.0)
+            END AS release_in,
+            COALESCE(d.p50, 60.0) AS typical
+        FROM gaming_resource r
+        LEFT JOIN session_session s ON s.resource_id = r.id AND s.state IN ('available', 'running')
+        LEFT JOIN LATERAL (
+            SELECT GREATEST(EXTRACT(EPOCH FROM (%(now)s - s.starting_time)) / 60.0, 0.0) AS elapsed
+        ) e ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT st.p50, st.p75, st.p90
+            FROM session_duration_stat st
+            WHERE st.company_id = r.company_id AND st.kind = r.kind AND st.type_res_id = r.type_res_id
+              AND st.hour_of_week IN (%(hour_of_week)s, -1)
+            ORDER BY st.hour_of_week DESC
+            LIMIT 1
+        ) d ON TRUE
+        WHERE %(company_id)s::integer IS NULL OR r.company_id = %(company_id)s
+    ),
+    ranked AS (
+        SELECT
+            company_id, kind, type_res_id, release_in, typical,
+            ROW_NUMBER() OVER (PARTITION BY company_id, kind, type_res_id ORDER BY release_in) AS slot,
+            COUNT(*) OVER (PARTITION BY company_id, kind, type_res_id) AS slot_count
+        FROM slots
+    )
+"""
+
+# Positions and wait estimates of every waiting entry, for all types at once.
+# Entry n of a queue waits for slot ((n - 1) mod slots) + 1, plus one typical session for every full round of
+# slots before it.
+REFRESH_SQL = """
+    WITH """ + SLOTS_SQL + """,
+    queue AS (
+        SELECT
+            w.id, w.company_id, w.kind, w.type_res_id,
+            ROW_NUMBER() OVER (PARTITION BY w.company_id, w.kind, w.type_res_id ORDER BY w.create_date, w.id)
+                AS position
+        FROM waitlist_entry w
+        WHERE w.state = 'waiting'
+    )
+    UPDATE waitlist_entry w
+    SET position = q.position,
+        estimated_wait = r.release_in + ((q.position - 1) / r.slot_count) * r.typical,
+        estimate_date = %(now)s
+    FROM queue q
+    LEFT JOIN ranked r
+        ON r.company_id = q.company_id AND r.kind = q.kind AND r.type_res_id = q.type_res_id
+       AND r.slot = (q.position - 1) %% r.slot_count + 1
+    WHERE w.id = q.id
+"""
+
+
+class SessionDurationStat(models.Model):
+    _name = 'session.duration.stat'
+    _description = 'Session Duration Distribution'
+    _order = 'kind, type_res_id, hour_of_week'
+
+    company_id = fields.Many2one(comodel_name='res.company', readonly=True, required=True)
+    kind = fields.Selection(RESOURCE_KINDS, readonly=True, required=True)
+    type_res_id = fields.Integer(string='Type Record', readonly=True, required=True)
+    hour_of_week = fields.Integer(readonly=True, required=True, help="0 is Monday 00:00 UTC, -1 all hours.")
+    sample_count = fields.Integer('Sessions Count', readonly=True)
+    p50 = fields.Float('Median (Minutes)', readonly=True)
+    p75 = fields.Float('75th Percentile (Minutes)', readonly=True)
+    p90 = fields.Float('90th Percentile (Minutes)', readonly=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(company_id, kind, type_res_id, hour_of_week)',
+         'Only one duration distribution per type and hour of the week.'),
+    ]
+
+    @api.model
+    def rebuild(self, days=90):
+        """Recompute the duration quantiles of the last ``days`` days per type and hour of the week."""
+        self.env.flush_all()
+        self.env.cr.execute("DELETE FROM session_duration_stat")
+        self.env.cr.execute("""
+            INSERT INTO session_duration_stat (
+                company_id, kind, type_res_id, hour_of_week, sample_count, p50, p75, p90,
+                create_uid, create_date, write_uid, write_date)
+            SELECT
+                company_id, kind, type_res_id, COALESCE(hour_of_week, -1), COUNT(*),
+                percentile_cont(0.5) WITHIN GROUP (ORDER BY minutes),
+                percentile_cont(0.75) WITHIN GROUP (ORDER BY minutes),
+                percentile_cont(0.9) WITHIN GROUP (ORDER BY minutes),
+                %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+            FROM (
+                SELECT
+                    s.company_id, r.kind, r.type_res_id,
+                    (EXTRACT(ISODOW FROM s.starting_time)::integer - 1) * 24
+                        + EXTRACT(HOUR FROM s.starting_time)::integer AS hour_of_week,
+                    EXTRACT(EPOCH FROM (s.ending_time - s.starting_time)) / 60.0 AS minutes
+                FROM session_session s
+                JOIN gaming_resource r ON r.id = s.resource_id
+                WHERE s.state = 'finished'
+                  AND s.ending_time > s.starting_time
+                  AND s.starting_time >= %(since)s
+                  AND r.type_res_id IS NOT NULL
+            ) durations
+            GROUP BY GROUPING SETS ((company_id, kind, type_res_id, hour_of_week), (company_id, kind, type_res_id))
+        """, {'uid': self.env.uid, 'since': fields.Datetime.now() - timedelta(days=days)})
+        self.invalidate_model()
+
+    @api.model
+    def _cron_rebuild_duration_stats(self):
+        self.rebuild()
+
+
+class WaitlistEntry(models.Model):
+    _name = 'waitlist.entry'
+    _description = 'Waitlist Entry'
+    _order = 'state, position, id'
+    _rec_name = 'partner_id'
+    _check_company_auto = True
+
+    partner_id = fields.Many2one(comodel_name='res.partner', string='Customer', required=True)
+    company_id = fields.Many2one(comodel_name='res.company', required=True, default=lambda self: self.env.company)
+    kind = fields.Selection(RESOURCE_KINDS, required=True, default='console')
+    room_type_id = fields.Many2one(comodel_name='room.type')
+    console_type_id = fields.Many2one(comodel_name='console.type')
+    table_type_id = fields.Many2one(comodel_name='table.type')
+    type_res_id = fields.Integer(compute='_compute_type_res_id', store=True)
+    state = fields.Selection([
+        ('waiting', 'Waiting'),
+        ('seated', 'Seated'),
+        ('cancelled', 'Cancelled'),
+    ], default='waiting', required=True, readonly=True, index=True)
+    position = fields.Integer(readonly=True)
+    estimated_wait = fields.Float('Estimated Wait (Minutes)', readonly=True)
+    estimate_date = fields.Datetime(readonly=True)
+
+    def init(self):
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS waitlist_entry_waiting_idx
+            ON waitlist_entry (company_id, kind, type_res_id, create_date, id) WHERE state = 'waiting'
+        """)
+
+    @api.depends('kind', 'room_type_id', 'console_type_id', 'table_type_id')
+    def _compute_type_res_id(self):
+        for entry in self:
+            entry.type_res_id = entry[TYPE_FIELDS[entry.kind]].id if entry.kind else 0
+
+    @api.model
+    def _get_slots_params(self):
+        now = fields.Datetime.now()
+        return {'now': now, 'hour_of_week': (now.isoweekday() - 1) * 24 + now.hour}
+
+    @api.model
+    def _refresh_estimates(self, notify=None):
+        """Recompute the positions and wait estimates of every queue in one statement and push them.
+
+        Nothing is done while the queues are empty, except pushing the queues of the ``notify`` companies (an
+        entry of theirs was just seated or cancelled).
+        """
+        # Every company's queues are refreshed, whatever the companies of the current user
+        waiting = bool(self.sudo().search_count([('state', '=', 'waiting')], limit=1))
+        if waiting:
+            self.env.flush_all()
+            self.env.cr.execute(REFRESH_SQL, dict(self._get_slots_params(), company_id=None))
+            self.invalidate_model(['position', 'estimated_wait', 'estimate_date'])
+        if waiting or notify:
+            self._notify_waitlist(notify)
+
+    def _to_dict(self):
+        return [{
+            'id': entry.id,
+            'partner': entry.partner_id.display_name,
+            'kind': entry.kind,
+            'type': entry[TYPE_FIELDS[entry.kind]].name or '',
+            'position': entry.position,
+            'estimated_wait': entry.estimated_wait,
+        } for entry in self]
+
+    @api.model
+    def get_waitlist(self):
+        """Waiting entries of the current company, for the initial load of the dashboard."""
+        return self.search([('company_id', '=', self.env.company.id), ('state', '=', 'waiting')])._to_dict()
+
+    @api.model
+    def _notify_waitlist(self, companies=None):
+        """Push the waiting entries of each company on the company's own channel, which only its users listen
+        to (see ``ir.websocket``). ``companies`` are notified even when their queues are now empty."""
+        entries = self.sudo().search([('state', '=', 'waiting')])
+        by_company = defaultdict(lambda: self.sudo())
+        for entry in entries:
+            by_company[entry.company_id] |= entry
+        companies = (companies or self.env['res.company']) | entries.company_id
+        for company in companies:
+            self.env['bus.bus']._sendone((company, WAITLIST_CHANNEL), 'waitlist/updated', {
+                'company_id': company.id,
+                'entries': by_company[company]._to_dict(),
+            })
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        entries = super().create(vals_list)
+        self._refresh_estimates()
+        return entries
+
+    def action_seat(self):
+        self.ensure_one()
+        self.state = 'seated'
+        self._refresh_estimates(notify=self.company_id)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Sessions',
+            'res_model': 'session.session',
+            'view_mode': 'form',
+            'target': 'new',
+            'context': {
+                'default_partner_id': self.partner_id.id,
+                'default_session_type': 'private' if self.kind == 'room' else 'public',
+                'default_individual_type': False if self.kind == 'room' else self.kind,
+            },
+        }
+
+    def action_cancel(self):
+        self.write({'state': 'cancelled'})
+        self._refresh_estimates(notify=self.company_id)
+
+    @api.model
+    def _cron_refresh_estimates(self):
+        self._refresh_estimates()
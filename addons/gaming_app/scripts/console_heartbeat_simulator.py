@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Stand-in for the console agent: send heartbeat batches for a set of simulated consoles.
+
+Every console randomly powers on, plays, idles and powers off; all consoles are sent in one batch per tick to
+``/playstation/console/heartbeat``, authenticated with an Odoo API key::
+
+    python3 console_heartbeat_simulator.py --url http://localhost:8069 --api-key KEY --consoles PS-1 PS-2
+"""
+
+import argparse
+import json
+import random
+import time
+import urllib.request
+from datetime import datetime, timezone
+
+# Probability of moving to each state at every tick, per current state
+TRANSITIONS = {
+    'off': {'off': 0.95, 'active': 0.05},
+    'active': {'active': 0.97, 'idle': 0.02, 'off': 0.01},
+    'idle': {'idle': 0.8, 'active': 0.15, 'off': 0.05},
+}
+
+
+def next_state(state):
+    states, weights = zip(*TRANSITIONS[state].items())
+    return random.choices(states, weights)[0]
+
+
+def send(url, api_key, heartbeats):
+    request = urllib.request.Request(
+        url.rstrip('/') + '/playstation/console/heartbeat',
+        data=json.dumps({'jsonrpc': '2.0', 'method': 'call', 'params': {'heartbeats': heartbeats}}).encode(),
+        headers={'Content-Type': 'application/json', 'Authorization': 'Bearer %s' % api_key},
+    )
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--api-key', required=True)
+    parser.add_argument('--consoles', nargs='+', required=True, help="Device numbers of the consoles")
+    parser.add_argument('--interval', type=float, default=5.0, help="Seconds between two batches")
+    args = parser.parse_args()
+
+    states = {console: 'off' for console in args.consoles}
+    while True:
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        heartbeats = []
+        for console, state in states.items():
+            states[console] = state = next_state(state)
+            heartbeats.append({
+                'console': console,
+                'power': state != 'off',
+                'active': state == 'active',
+                'time': now,
+            })
+        print(now, send(args.url, args.api_key, heartbeats).get('result'))
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Find and repair stale stored computed fields in id-ranged chunks, spread over a process pool.
+
+Every chunk runs in its own transaction and is committed on its own, so that a run can be interrupted at any time
+and never holds locks for long. Run it with the Odoo server's configuration file, from an environment where the
+``odoo`` package is importable::
+
+    python3 recompute_stored_fields.py -c /etc/odoo/odoo.conf -d gaming --workers 4 --dry-run
+    python3 recompute_stored_fields.py -c /etc/odoo/odoo.conf -d gaming --model session.session.line \\
+        --fields price_unit discount_excluded discount_included --domain "[('session_id.state', '!=', 'finished')]"
+"""
+
+import argparse
+import ast
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+_worker_db = None
+
+
+def init_worker(config_file, dbname):
+    global _worker_db
+    import odoo
+    odoo.tools.config.parse_config(['-c', config_file, '-d', dbname])
+    _worker_db = dbname
+
+
+def run_chunk(model_name, fnames, id_from, id_to, domain, dry_run):
+    import psycopg2
+    from odoo import api, SUPERUSER_ID
+    from odoo.modules.registry import Registry
+    try:
+        with Registry(_worker_db).cursor() as cr:
+            env = api.Environment(cr, SUPERUSER_ID, {})
+            return env['stored.compute.repair']._repair_chunk(model_name, fnames, id_from, id_to, domain, dry_run)
+    except psycopg2.OperationalError as e:
+        # Lock or statement timeout: the chunk was rolled back and can simply be run again
+        return {'model': model_name, 'range': [id_from, id_to], 'error': str(e).strip()}
+
+
+def plan(config_file, dbname, models, chunk_size):
+    import odoo
+    from odoo import api, SUPERUSER_ID
+    from odoo.modules.registry import Registry
+    odoo.tools.config.parse_config(['-c', config_file, '-d', dbname])
+    from odoo.addons.gaming_app.models.stored_compute_repair import REPAIR_FIELDS
+    models = models or [(model_name, None) for model_name in REPAIR_FIELDS]
+    with Registry(dbname).cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        return [
+            (model_name, fnames or REPAIR_FIELDS[model_name], id_from, id_to)
+            for model_name, fnames in models
+            for id_from, id_to in env['stored.compute.repair']._get_chunks(model_name, chunk_size)
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-c', '--config', required=True, help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True)
+    parser.add_argument('--model', help="Only check this model (default: every model of the repair list)")
+    parser.add_argument('--fields', nargs='+', help="Only check these fields of --model")
+    parser.add_argument('--domain', default='[]', help="Extra domain restricting the records to check")
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--pause', type=float, default=0.0, help="Seconds to wait between two submitted chunks")
+    parser.add_argument('--dry-run', action='store_true', help="Report the stale records without fixing them")
+    parser.add_argument('--json', action='store_true', help="Print one JSON result per chunk")
+    args = parser.parse_args()
+
+    if args.fields and not args.model:
+        parser.error("--fields requires --model")
+    domain = ast.literal_eval(args.domain)
+    models = [(args.model, args.fields)] if args.model else None
+
+    # The registry is loaded in fresh processes: connections must not be shared with a forked parent
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        chunks = executor.submit(plan, args.config, args.database, models, args.chunk_size).result()
+
+    totals = {'checked': 0, 'stale': 0, 'fixed': 0, 'skipped': 0, 'failed': 0}
+    with ProcessPoolExecutor(args.workers, mp_context=context, initializer=init_worker,
+                             initargs=(args.config, args.database)) as executor:
+        futures = []
+        for model_name, fnames, id_from, id_to in chunks:
+            futures.append(executor.submit(run_chunk, model_name, fnames, id_from, id_to, domain, args.dry_run))
+            if args.pause:
+                time.sleep(args.pause)
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            if args.json:
+                print(json.dumps(result, default=str))
+            elif 'error' in result:
+                print("[%d/%d] %s %s: failed, %s" % (done, len(futures), result['model'], result['range'],
+                                                    result['error']))
+            else:
+                print("[%d/%d] %s %s: %d checked, %d stale, %d fixed, %d skipped" % (
+                    done, len(futures), result['model'], result['range'], result['checked'], result['stale'],
+                    result['fixed'], len(result['skipped'])))
+                for record_id, fname, old, new in result['diffs']:
+                    print("    #%s %s: %r -> %r" % (record_id, fname, old, new))
+            if 'error' in result:
+                totals['failed'] += 1
+            else:
+                totals['checked'] += result['checked']
+                totals['stale'] += result['stale']
+                totals['fixed'] += result['fixed']
+                totals['skipped'] += len(result['skipped'])
+    print("Done: %(checked)d checked, %(stale)d stale, %(fixed)d fixed, %(skipped)d skipped, "
+          "%(failed)d failed chunks" % totals)
+    return 1 if totals['failed'] or totals['skipped'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+/** @odoo-module **/
+
+import { Component, useState, onWillStart } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { _t } from "@web/core/l10n/translation";
+
+export class BarQueue extends Component {
+    static template = "gaming_app.BarQueueTemplate";
+
+    setup() {
+        this.orm = useService("orm");
+        this.notification = useService("notification");
+        this.company = useService("company");
+        this.busService = this.env.services.bus_service;
+
+        this.state = useState({
+            items: {},
+        });
+
+        onWillStart(async () => {
+            const items = await this.orm.call("bar.queue.item", "get_queue", []);
+            this.mergeItems(items);
+        });
+
+        this.busService.addChannel("gaming_app_bar_queue");
+        this.busService.subscribe("bar_queue/updated", (payload) => {
+            // The bus pushes the queues of all the user's companies, only show the current one
+            if (payload.company_id === this.company.currentCompany.id) {
+                this.mergeItems(payload.items);
+            }
+        });
+    }
+
+    mergeItems(items) {
+        for (const item of items) {
+            if (item.status === 'served') {
+                delete this.state.items[item.id];
+            } else {
+                this.state.items[item.id] = item;
+            }
+        }
+    }
+
+    get queuedItems() {
+        return Object.values(this.state.items).filter((item) => item.status === 'queued');
+    }
+
+    get preparingItems() {
+        return Object.values(this.state.items).filter((item) => item.status === 'preparing');
+    }
+
+    async setPreparing(item) {
+        await this.orm.call("bar.queue.item", "action_preparing", [[item.id]]);
+    }
+
+    async setServed(item) {
+        try {
+            await this.orm.call("bar.queue.item", "action_served", [[item.id]]);
+        } catch (error) {
+            this.notification.add(_t("Failed to update the item"), {
+                type: "danger"
+            });
+        }
+    }
+}
+
+registry.category("actions").add("playstation_bar_queue", BarQueue);
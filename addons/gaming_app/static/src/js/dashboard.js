@@ -8,13 +8,78 @@ import { useService } from "@web/core/utils/hooks";
 import { _t } from "@web/core/l10n/translation";
 import { rpc } from "@web/core/network/rpc";
 
+/**
+ * Merge freshly fetched resources into the reactive list in place, keyed by id: unchanged resources keep their
+ * object (and their rendered item), only changed fields are written, so only those items re-render.
+ */
+function mergeResources(target, incoming) {
+    const current = new Map(target.map((resource) => [resource.id, resource]));
+    const merged = incoming.map((resource) => {
+        const existing = current.get(resource.id);
+        if (!existing) {
+            return resource;
+        }
+        for (const [key, value] of Object.entries(resource)) {
+            if (existing[key] !== value) {
+                existing[key] = value;
+            }
+        }
+        return existing;
+    });
+    const sameOrder = merged.length === target.length && merged.every((resource, i) => resource === target[i]);
+    if (!sameOrder) {
+        target.splice(0, target.length, ...merged);
+    }
+}
+
+export class ResourceItem extends Component {
+    static template = "gaming_app.DashboardResourceItem";
+    static props = ["resource", "getLabel", "onOpen"];
+
+    get statusClass() {
+        return this.props.resource.status === 'available' ? 'status-available' : 'status-occupied';
+    }
+
+    get statusText() {
+        return this.props.resource.status === 'available' ? _t('Available') : _t('Occupied');
+    }
+}
+
+/**
+ * A grid section renders its items only while it is on screen; offscreen it keeps a placeholder of its last
+ * height, so scrolling is unchanged and hidden sections cost nothing on refresh.
+ */
+export class ResourceSection extends Component {
+    static template = "gaming_app.DashboardResourceSection";
+    static components = { ResourceItem };
+    static props = ["title", "icon", "items", "getLabel", "onOpen"];
+
+    setup() {
+        this.sectionRef = useRef("section");
+        this.state = useState({ visible: true, height: 0 });
+        onMounted(() => {
+            this.observer = new IntersectionObserver(([entry]) => {
+                if (!entry.isIntersecting) {
+                    this.state.height = this.sectionRef.el.querySelector('.resource-list').offsetHeight;
+                }
+                this.state.visible = entry.isIntersecting;
+            }, { rootMargin: '200px' });
+            this.observer.observe(this.sectionRef.el);
+        });
+        onWillUnmount(() => this.observer.disconnect());
+    }
+}
+
 export class PlayStationDashboard extends Component {
     static template = "gaming_app.DashboardTemplate";
+    static components = { ResourceSection };
 
     setup() {
         this.notification = useService("notification");
         this.action = useService("action");
         this.orm = useService("orm");
+        this.company = useService("company");
+        this.busService = this.env.services.bus_service;
         
         this.chartRef = useRef("revenueChart");
         this.chart = null;
@@ -22,11 +87,36 @@ export class PlayStationDashboard extends Component {
 
         this.state = useState({
             dashboardData: {},
+            resources: { rooms: [], consoles: [], tables: [], cafe_tables: [] },
+            waitlist: [],
             currentPeriod: 'today',
             isLoading: false,
         });
+        // Stable callbacks, so that resource sections and items are not re-rendered for new closures
+        this.labels = {
+            room: (resource) => resource.name,
+            device: (resource) => resource.type + ' - ' + resource.name,
+            cafe: (resource) => 'Cafe ' + resource.name,
+        };
+        this.openers = {
+            room: (id) => this.openSession(id),
+            console: (id) => this.openConsole(id),
+            table: (id) => this.openTable(id),
+            cafe: (id) => this.openCafe(id),
+        };
+
+        // Wait estimates are pushed by the server whenever a session starts or finishes
+        this.busService.addChannel("gaming_app_waitlist");
+        this.busService.subscribe("waitlist/updated", (payload) => {
+            if (payload.company_id === this.company.currentCompany.id) {
+                this.state.waitlist = payload.entries;
+            }
+        });
 
         onMounted(() => {
+            this.orm.call("waitlist.entry", "get_waitlist", []).then((entries) => {
+                this.state.waitlist = entries;
+            });
             this.loadDashboardData('today').then(() => {
                 this.initChart();
                 this.startAutoRefresh();
@@ -48,7 +138,11 @@ export class PlayStationDashboard extends Component {
             const data = await rpc("/playstation/dashboard/data", {
                 period: period
             });
-            this.state.dashboardData = data;
+            const { resources, ...dashboardData } = data;
+            for (const [kind, list] of Object.entries(resources || {})) {
+                mergeResources(this.state.resources[kind] || (this.state.resources[kind] = []), list);
+            }
+            this.state.dashboardData = dashboardData;
             return data;
         } catch (error) {
             this.notification.add(_t("Failed to load dashboard data"), {
@@ -72,7 +166,8 @@ export class PlayStationDashboard extends Component {
 
         this.chart = new Chart(canvas, {
             type: 'line',
-            data: this.state.dashboardData.chart_data,
+            // Chart.js mutates its data: give it a plain copy rather than the reactive state
+            data: JSON.parse(JSON.stringify(this.state.dashboardData.chart_data)),
             options: {
                 responsive: true,
                 maintainAspectRatio: true, // Changed to true
@@ -246,9 +341,33 @@ export class PlayStationDashboard extends Component {
     }
 
     updateChart() {
-        if (this.chart && this.state.dashboardData.chart_data) {
-            this.chart.data = this.state.dashboardData.chart_data;
+        const chartData = this.state.dashboardData.chart_data;
+        if (!this.chart || !chartData) {
+            return;
+        }
+        const data = this.chart.data;
+        const extendsLabels = data.labels.length <= chartData.labels.length
+            && data.labels.every((label, i) => label === chartData.labels[i]);
+        if (!extendsLabels || data.datasets.length !== chartData.datasets.length) {
+            // New period: swap the series and animate once
+            this.chart.data = JSON.parse(JSON.stringify(chartData));
             this.chart.update();
+            return;
+        }
+        // Same period: append the new points and patch the changed ones in place, redraw without animation
+        let changed = data.labels.length !== chartData.labels.length;
+        data.labels.push(...chartData.labels.slice(data.labels.length));
+        chartData.datasets.forEach((dataset, i) => {
+            const points = data.datasets[i].data;
+            dataset.data.forEach((value, j) => {
+                if (points[j] !== value) {
+                    points[j] = value;
+                    changed = true;
+                }
+            });
+        });
+        if (changed) {
+            this.chart.update('none');
         }
     }
 
@@ -270,6 +389,16 @@ export class PlayStationDashboard extends Component {
         return _t('%s days ago', Math.floor(diff / 86400));
     }
 
+    formatWait(minutes) {
+        if (!minutes) return _t('Now');
+        if (minutes < 60) return _t('~%s min', Math.round(minutes));
+        return _t('~%sh %smin', Math.floor(minutes / 60), Math.round(minutes % 60));
+    }
+
+    openWaitlist() {
+        this.action.doAction("gaming_app.waitlist_entry_action");
+    }
+
     formatNumber(num) {
         return new Intl.NumberFormat().format(num);
     }
@@ -282,21 +411,10 @@ export class PlayStationDashboard extends Component {
         return this.state.dashboardData.activities || [];
     }
 
-    get resources() {
-        return this.state.dashboardData.resources || {};
-    }
-
     get chartData() {
         return this.state.dashboardData.chart_data;
     }
-
-    getResourceStatusClass(status) {
-        return status === 'available' ? 'status-available' : 'status-occupied';
-    }
-
-    getResourceStatusText(status) {
-        return status === 'available' ? _t('Available') : _t('Occupied');
-    }
 }
 
-registry.category("actions").add("playstation_dashboard", PlayStationDashboard);
+// Loaded on demand by the playstation_dashboard client action, see dashboard_loader.js
+registry.category("lazy_components").add("PlayStationDashboard", PlayStationDashboard);
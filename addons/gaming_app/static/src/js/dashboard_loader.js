@@ -0,0 +1,19 @@
+/** @odoo-module **/
+
+import { Component, xml } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { LazyComponent } from "@web/core/assets";
+
+/**
+ * Client action shipped in the backend bundle. The dashboard code, styles and chart library live in the
+ * gaming_app.dashboard_assets bundle, fetched the first time the action opens.
+ */
+export class PlayStationDashboardLoader extends Component {
+    static components = { LazyComponent };
+    static template = xml`
+        <LazyComponent bundle="'gaming_app.dashboard_assets'" Component="'PlayStationDashboard'" props="props"/>
+    `;
+    static props = ["*"];
+}
+
+registry.category("actions").add("playstation_dashboard", PlayStationDashboardLoader);
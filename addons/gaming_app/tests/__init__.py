@@ -0,0 +1,4 @@
+from . import test_console_power_event
+from . import test_pricing_simulation
+from . import test_query_plans
+from . import test_stored_compute_repair
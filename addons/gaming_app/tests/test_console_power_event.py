@@ -0,0 +1,68 @@
+# coding: utf-8
+
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestConsolePowerEvent(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        console_type = cls.env['console.type'].create({'name': 'PS5', 'price_per_hour': 60})
+        cls.console = cls.env['console.number'].create({'device_num': 'AGENT-1', 'type_id': console_type.id})
+        cls.Event = cls.env['console.power.event']
+
+    def _beat(self, power, active=False, minutes_ago=0):
+        return {
+            'console': self.console.device_num,
+            'power': power,
+            'active': active,
+            'time': fields.Datetime.to_string(fields.Datetime.now() - timedelta(minutes=minutes_ago)),
+        }
+
+    def _get_sessions(self):
+        return self.env['session.session'].search([('console_id', '=', self.console.id)])
+
+    def test_idle_without_session(self):
+        # The console is switched on but nobody plays: no session to flag
+        result = self.Event.ingest([self._beat(True)])
+        self.assertEqual(result['changes'], 1)
+        self.assertEqual(self.console.power_state, 'idle')
+        self.assertFalse(self._get_sessions())
+        event = self.Event.search([('console_id', '=', self.console.id)])
+        self.assertEqual(event.state, 'idle')
+        self.assertFalse(event.session_id)
+
+    def test_off_after_staff_finished(self):
+        self.Event.ingest([self._beat(True, active=True, minutes_ago=30)])
+        session = self._get_sessions()
+        self.assertEqual(session.agent_flag, 'auto_started')
+        session.action_finished()
+
+        # The console is then switched off: the finished session is left alone
+        self.Event.ingest([self._beat(True, minutes_ago=1), self._beat(False)])
+        self.assertEqual(self.console.power_state, 'off')
+        self.assertEqual(session.state, 'finished')
+        self.assertNotEqual(session.agent_flag, 'auto_finished')
+
+    def test_silent_console_without_session(self):
+        self.Event.ingest([self._beat(True, minutes_ago=10)])
+        self.console.flush_recordset()
+        self.env.cr.execute("UPDATE console_number SET last_heartbeat = %s WHERE id = %s",
+                            [fields.Datetime.now() - timedelta(minutes=10), self.console.id])
+        self.console.invalidate_recordset(['last_heartbeat'])
+
+        self.Event._cron_detect_silent_consoles()
+        self.assertEqual(self.console.power_state, 'off')
+        self.assertFalse(self._get_sessions())
+
+    def test_off_finishes_running_session(self):
+        self.Event.ingest([self._beat(True, active=True, minutes_ago=30)])
+        session = self._get_sessions()
+        self.Event.ingest([self._beat(False)])
+        self.assertEqual(session.state, 'finished')
+        self.assertEqual(session.agent_flag, 'auto_finished')
@@ -0,0 +1,46 @@
+# coding: utf-8
+
+import unittest
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import Form, TransactionCase, tagged
+
+from odoo.addons.gaming_app.models.pricing_simulation import np
+
+
+@tagged('post_install', '-at_install')
+@unittest.skipIf(np is None, "The pricing simulation requires numpy")
+class TestPricingSimulation(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.console_type = cls.env['console.type'].create({'name': 'Simulated PS5', 'price_per_hour': 60})
+        console = cls.env['console.number'].create({'device_num': 'SIM-1', 'type_id': cls.console_type.id})
+        start = fields.Datetime.now().replace(microsecond=0) - timedelta(days=1)
+        cls.session = cls.env['session.session'].create({
+            'partner_id': cls.env['res.partner'].create({'name': 'Simulated Customer'}).id,
+            'session_type': 'public',
+            'individual_type': 'console',
+            'console_id': console.id,
+            'starting_time': start,
+        })
+        # Sessions are always created running
+        cls.session.write({'ending_time': start + timedelta(hours=1), 'state': 'finished'})
+
+    def test_simulate_from_form(self):
+        # The rate lines are saved by the web client: their hidden and readonly keys must come back
+        with Form(self.env['pricing.simulation.wizard']) as form:
+            for index in range(len(form.rate_line_ids)):
+                with form.rate_line_ids.edit(index) as line:
+                    if line.resource_kind == 'console' and line.type_id == self.console_type.id:
+                        line.new_rate = 120
+        wizard = form.record
+        line = wizard.rate_line_ids.filtered(lambda l: l.type_id == self.console_type.id)
+        self.assertEqual((line.resource_kind, line.current_rate, line.new_rate), ('console', 60, 120))
+
+        wizard.action_simulate()
+        self.assertAlmostEqual(wizard.delta, 120 - self.session.time_price)
+        self.assertTrue(wizard.delta)
+        self.assertEqual(wizard.result_line_ids.type_name, 'Simulated PS5')
@@ -0,0 +1,137 @@
+# coding: utf-8
+
+import json
+
+from odoo.tests import TransactionCase, new_test_user, tagged
+from odoo.tools import SQL
+
+SESSION_COUNT = 30000
+ORDER_COUNT = 10000
+
+
+@tagged('post_install', '-at_install')
+class TestQueryPlans(TransactionCase):
+    """Run EXPLAIN on the hot queries of the module over seeded tables, and fail on any sequential scan."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = new_test_user(cls.env, login='plan_cashier', groups='base.group_user')
+        cls.partner = cls.env['res.partner'].create({'name': 'Plan Customer'})
+        cls.cafe_table = cls.env['cafe.table'].create({'table_num': 'Plan 1'})
+        session = cls.env['session.session'].create({
+            'partner_id': cls.partner.id,
+            'session_type': 'public',
+            'individual_type': 'console',
+        })
+        order = cls.env['cafe.order'].create({'partner_id': cls.partner.id, 'table_id': cls.cafe_table.id})
+        journal = cls.env['account.journal'].create({'name': 'Plan Journal', 'code': 'PLAN', 'type': 'general'})
+        move = cls.env['account.move'].create({'journal_id': journal.id, 'move_type': 'entry'})
+        cls.env.flush_all()
+
+        # One open session or order in a hundred, as at the front desk
+        cls._clone(session, "generate_series(1, %s) AS src(n)" % SESSION_COUNT, {
+            'ref': "'PLAN/' || src.n",
+            'state': "CASE WHEN src.n %% 100 = 0 THEN 'running' ELSE 'finished' END",
+            'starting_time': "tmpl.starting_time - src.n * interval '10 minutes'",
+            'ending_time': "tmpl.starting_time - src.n * interval '10 minutes' + interval '1 hour'",
+        })
+        cls._clone(order, "generate_series(1, %s) AS src(n)" % ORDER_COUNT, {
+            'ref': "'PLAN/' || src.n",
+            'state': "CASE WHEN src.n %% 100 = 0 THEN 'running' ELSE 'finished' END",
+        })
+        cls._clone(move, """(
+            SELECT id AS session_id, NULL::integer AS cafe_id FROM session_session WHERE ref LIKE 'PLAN/%%'
+            UNION ALL
+            SELECT NULL, id FROM cafe_order WHERE ref LIKE 'PLAN/%%'
+        ) AS src""", {
+            'move_type': "'out_invoice'",
+            'session_id': 'src.session_id',
+            'cafe_id': 'src.cafe_id',
+        })
+        cls.env.cr.execute("ANALYZE session_session, cafe_order, account_move")
+        cls.env.invalidate_all()
+        cls.session = session
+        cls.order = order
+
+    @classmethod
+    def _clone(cls, record, source, overrides):
+        """Insert a copy of ``record`` per row of the SQL ``source`` (aliased ``src``), with the SQL expressions
+        of ``overrides`` for some of its columns (the copied row is aliased ``tmpl``)."""
+        cls.env.cr.execute("""
+            SELECT column_name FROM information_schema.columns
+            WHERE table_name = %s AND column_name != 'id'
+        """, [record._table])
+        columns = [row[0] for row in cls.env.cr.fetchall()]
+        cls.env.cr.execute('INSERT INTO "%s" (%s) SELECT %s FROM "%s" tmpl, %s WHERE tmpl.id = %%s' % (
+            record._table,
+            ', '.join('"%s"' % column for column in columns),
+            ', '.join(overrides.get(column, 'tmpl."%s"' % column) for column in columns),
+            record._table,
+            source,
+        ), [record.id])
+
+    def _get_scans(self, query):
+        """``(node type, relation, index)`` of every scan node in the plan of ``query``."""
+        self.env.cr.execute(SQL("EXPLAIN (FORMAT JSON) %s", query))
+        plan = self.env.cr.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans, nodes = [], [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if 'Scan' in node['Node Type']:
+                scans.append((node['Node Type'], node.get('Relation Name'), node.get('Index Name')))
+            nodes.extend(node.get('Plans', []))
+        return scans
+
+    def assertIndexScan(self, query, table, index):
+        scans = self._get_scans(query)
+        self.assertFalse([scan for scan in scans if scan[0] == 'Seq Scan' and scan[1] == table],
+                         "Sequential scan on %s: %s" % (table, scans))
+        self.assertIn(index, [scan[2] for scan in scans], "%s is not used: %s" % (index, scans))
+
+    def test_session_keyset_page(self):
+        # As a front desk user, so that the multi-company rule takes part in the query
+        Session = self.env['session.session'].with_user(self.user)
+        first_page = Session._keyset_query(limit=80)
+        self.assertIndexScan(first_page.select(), 'session_session', 'session_session_company_state_idx')
+        next_page = Session._keyset_query(after=('finished', self.session.id + SESSION_COUNT // 2), limit=80)
+        self.assertIndexScan(next_page.select(), 'session_session', 'session_session_company_state_idx')
+
+    def test_open_cafe_tables(self):
+        # The dashboard's occupied tables lookup
+        query = self.env['cafe.order']._search([
+            ('company_id', '=', self.env.company.id),
+            ('state', 'in', ['available', 'running']),
+        ])
+        self.assertIndexScan(query.select(SQL.identifier('cafe_order', 'table_id')), 'cafe_order',
+                             'cafe_order_open_table_idx')
+
+    def test_session_invoice_lookup(self):
+        query = self.env['account.move']._search([
+            ('session_id', '=', self.session.id + 1),
+            ('move_type', '=', 'out_invoice'),
+        ])
+        self.assertIndexScan(query.select(), 'account_move', 'account_move_session_move_type_idx')
+
+    def test_cafe_invoice_lookup(self):
+        query = self.env['account.move']._search([
+            ('cafe_id', '=', self.order.id + 1),
+            ('move_type', '=', 'out_invoice'),
+        ])
+        self.assertIndexScan(query.select(), 'account_move', 'account_move_cafe_move_type_idx')
+
+    def test_rollup_invoice_lookup(self):
+        # The latest invoice of every session of a day, as the revenue rollup and the cafe report read it
+        query = SQL("""
+            SELECT s.id, am.payment_state
+            FROM session_session s
+            LEFT JOIN LATERAL (
+                SELECT m.payment_state FROM account_move m
+                WHERE m.session_id = s.id AND m.move_type = 'out_invoice'
+                ORDER BY m.create_date DESC LIMIT 1
+            ) am ON TRUE
+            WHERE s.company_id = %s AND s.starting_time >= NOW() - interval '1 day'
+        """, self.env.company.id)
+        self.assertIndexScan(query, 'account_move', 'account_move_session_move_type_idx')
@@ -0,0 +1,91 @@
+# coding: utf-8
+
+from odoo import Command
+from odoo.tests import TransactionCase, tagged
+
+LINE_FIELDS = ['price_unit', 'discount_excluded', 'discount_included']
+
+
+@tagged('post_install', '-at_install')
+class TestStoredComputeRepair(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partner = cls.env['res.partner'].create({'name': 'Repair Customer'})
+        product = cls.env['product.product'].create({'name': 'Repair Soda', 'lst_price': 10.0})
+        cls.session = cls.env['session.session'].create({
+            'partner_id': cls.partner.id,
+            'session_type': 'public',
+            'individual_type': 'console',
+            'session_line_ids': [
+                Command.create({'product_id': product.id, 'product_uom_qty': 2}),
+                Command.create({'product_id': product.id, 'product_uom_qty': 2}),
+            ],
+        })
+        cls.stale_line, cls.good_line = cls.session.session_line_ids.sorted('id')
+        cls.Repair = cls.env['stored.compute.repair']
+
+    def setUp(self):
+        super().setUp()
+        # A stale line, and a balance that was computed from it
+        self.env.flush_all()
+        self.env.cr.execute("""
+            UPDATE session_session_line SET price_unit = 1, discount_excluded = 2, discount_included = 2
+            WHERE id = %s
+        """, [self.stale_line.id])
+        self.env.cr.execute("UPDATE session_session SET amount_due = 22 WHERE id = %s", [self.session.id])
+        self.env.invalidate_all()
+
+    def _repair(self, dry_run):
+        return self.Repair._repair_chunk('session.session.line', LINE_FIELDS, self.stale_line.id,
+                                         self.good_line.id + 1, dry_run=dry_run)
+
+    def _read_line(self, line):
+        self.env.cr.execute("""
+            SELECT price_unit, discount_excluded, discount_included FROM session_session_line WHERE id = %s
+        """, [line.id])
+        return self.env.cr.fetchone()
+
+    def _read_amount_due(self):
+        self.env.cr.execute("SELECT amount_due FROM session_session WHERE id = %s", [self.session.id])
+        return self.env.cr.fetchone()[0]
+
+    def test_dry_run(self):
+        # Pending changes of the transaction must survive the dry run
+        self.partner.name = 'Renamed Customer'
+        result = self._repair(dry_run=True)
+        self.assertEqual(result['checked'], 2)
+        self.assertEqual(result['stale'], 1)
+        self.assertEqual(result['fixed'], 0)
+        self.assertEqual(result['diffs'], [
+            [self.stale_line.id, 'price_unit', 1.0, 10.0],
+            [self.stale_line.id, 'discount_excluded', 2.0, 20.0],
+            [self.stale_line.id, 'discount_included', 2.0, 20.0],
+        ])
+
+        # Neither the cache nor the database were changed, and nothing is left to recompute
+        self.assertEqual(self.stale_line.price_unit, 1.0)
+        self.assertEqual(self.good_line.price_unit, 10.0)
+        self.env.flush_all()
+        self.assertEqual(self._read_line(self.stale_line), (1.0, 2.0, 2.0))
+        self.assertEqual(self._read_line(self.good_line), (10.0, 20.0, 20.0))
+        self.assertEqual(self._read_amount_due(), 22)
+        self.env.cr.execute("SELECT name FROM res_partner WHERE id = %s", [self.partner.id])
+        self.assertEqual(self.env.cr.fetchone()[0], 'Renamed Customer')
+
+    def test_repair(self):
+        self.env.cr.execute("SELECT write_date FROM session_session_line WHERE id = %s", [self.good_line.id])
+        good_write_date = self.env.cr.fetchone()[0]
+
+        result = self._repair(dry_run=False)
+        self.assertEqual(result['stale'], 1)
+        self.assertEqual(result['fixed'], 1)
+        self.assertEqual(result['skipped'], [])
+        self.assertEqual(self._read_line(self.stale_line), (10.0, 20.0, 20.0))
+
+        # Only the stale line was rewritten, and the session balance followed it
+        self.env.cr.execute("SELECT write_date FROM session_session_line WHERE id = %s", [self.good_line.id])
+        self.assertEqual(self.env.cr.fetchone()[0], good_write_date)
+        self.assertEqual(self._read_amount_due(), 40)
+        self.assertEqual(self._repair(dry_run=True)['stale'], 0)
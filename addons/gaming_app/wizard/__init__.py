@@ -1,3 +1,4 @@
 # -*- coding: utf-8 -*-
 
 from . import payment_workflow_wizard
+from . import pricing_simulation_wizard
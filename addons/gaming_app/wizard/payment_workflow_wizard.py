@@ -14,16 +14,26 @@ class PaymentWorkflowWizard(models.TransientModel):
     session_id = fields.Many2one(comodel_name='session.session')
     cafe_id = fields.Many2one(comodel_name='cafe.order')
     is_partially = fields.Boolean()
+    shift_id = fields.Many2one(comodel_name='cashier.shift')
+    run_in_background = fields.Boolean(
+        default=lambda self: self.env['ir.config_parameter'].sudo().get_param('gaming_app.async_payments'))
 
     def action_confirm(self):
+        if self.run_in_background:
+            self.env['payment.job'].enqueue(self)
+        else:
+            self._process_payment()
+
+    def _process_payment(self):
+        # Invoice and pay in the branch of the session or order
+        record = self.session_id or self.cafe_id
+        self = self.with_company(record.company_id)
         if self.payment_way == 'fully_paid':
             move = self.create_invoice()
             self.create_payment(move)
 
         elif self.payment_way == 'partially_paid':
-            move = self.env['account.move'].search([('session_id', '=', self.session_id.id), ('move_type', '=', 'out_invoice'), ('session_id', '!=', False)]) or self.env['account.move'].search([('cafe_id', '=', self.cafe_id.id), ('move_type', '=', 'out_invoice'), ('cafe_id', '!=', False)])
-            print(move)
-            print('#' * 200)
+            move = (self.session_id or self.cafe_id).move_ids.filtered(lambda m: m.move_type == 'out_invoice')
             if move:
                 self.create_payment(move)
             else:
@@ -33,6 +43,12 @@ class PaymentWorkflowWizard(models.TransientModel):
         elif self.payment_way == 'later_paid':
             self.create_invoice()
 
+    def _get_shift(self):
+        """Shift the invoice and payments are booked in: the one the payment was taken in when run from a job,
+        else the user's open shift in the branch of the session or order."""
+        record = self.session_id or self.cafe_id
+        return self.shift_id or self.env['cashier.shift'].with_company(record.company_id)._get_open_shift()
+
     def create_invoice(self):
         move = self.env['account.move'].create(self._prepare_invoice_values())
         move.action_post()
@@ -40,14 +56,16 @@ class PaymentWorkflowWizard(models.TransientModel):
 
     def _prepare_invoice_values(self):
         type = self.session_id or self.cafe_id
+        shift = self._get_shift()
         vals = {
             'partner_id': type.partner_id.id,
             'ref':type.ref,
             'invoice_date_due': type.create_date,
             'invoice_date': type.create_date,
             'currency_id': type.currency_id.id,
-            'invoice_user_id': type.create_uid.id,
+            'invoice_user_id': shift.user_id.id if shift else type.create_uid.id,
             'move_type': 'out_invoice',
+            'shift_id': shift.id,
             'session_id': self.session_id.id,
             'cafe_id': self.cafe_id.id,
             'invoice_line_ids': self._prepare_lines()
@@ -80,30 +98,26 @@ class PaymentWorkflowWizard(models.TransientModel):
     def create_payment(self, move):
         payment_register = self.env['account.payment.register'].with_context(active_model='account.move',active_ids=[move.id]).create(
             self._prepare_payment_vals(move))
-        payment_register._create_payments()
+        payments = payment_register._create_payments()
+        payments.shift_id = self._get_shift()
 
     def _prepare_payment_vals(self, move):
+        journal = (self._get_shift().journal_id
+                   or self.env['account.journal'].search([('type', '=', 'cash'),
+                                                          ('company_id', '=', self.env.company.id)], limit=1))
         vals = {
             'amount': move.amount_total if self.payment_way == 'fully_paid' else self.paid_amount,
             'payment_date': fields.Date.context_today(self),
-            'journal_id': self.env['account.journal'].search([('type', '=', 'cash')], limit=1).id,
+            'journal_id': journal.id,
             'payment_method_line_id': self.env['account.payment.method.line'].search(
-                [('payment_method_id.payment_type', '=', 'inbound'), ('journal_id.type', '=', 'cash')
+                [('payment_method_id.payment_type', '=', 'inbound'), ('journal_id', '=', journal.id)
                  ], limit=1).id,
         }
         return vals
 
     @api.onchange('payment_way')
     def _onchange_paid_amount(self):
-        session_invoice = self.env['account.move'].search([('session_id', '=', self.session_id.id), ('move_type', '=', 'entry'), ('session_id', '!=', False)])
-        cafe_invoice = self.env['account.move'].search([('cafe_id', '=', self.cafe_id.id), ('move_type', '=', 'entry'), ('cafe_id', '!=', False)])
         if self.payment_way == 'partially_paid':
-            if self.session_id:
-                print('self.session_id.total', self.session_id.total)
-                print("sum(session_invoice.mapped('amount_total'))", sum(session_invoice.mapped('amount_total')))
-                self.paid_amount = round(self.session_id.total - sum(session_invoice.mapped('amount_total')), 2)
-            if self.cafe_id:
-                print('#' * 200)
-                print('self.cafe_id.total', self.cafe_id.total)
-                print('sum(cafe_invoice.mapped("amount_total"))', sum(cafe_invoice.mapped('amount_total')))
-                self.paid_amount = round(self.cafe_id.total - sum(cafe_invoice.mapped('amount_total')), 2)
+            record = self.session_id or self.cafe_id
+            if record:
+                self.paid_amount = round(record.amount_due, 2)
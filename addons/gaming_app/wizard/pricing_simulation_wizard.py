@@ -0,0 +1,97 @@
+from dateutil.relativedelta import relativedelta
+
+from odoo import fields, models, api
+
+
+class PricingSimulationWizard(models.TransientModel):
+    _name = "pricing.simulation.wizard"
+    _description = "Pricing Simulation Wizard"
+
+    date_from = fields.Date(required=True, default=lambda self: fields.Date.context_today(self) - relativedelta(months=3))
+    date_to = fields.Date(required=True, default=fields.Date.context_today)
+    rate_line_ids = fields.One2many(comodel_name='pricing.simulation.rate', inverse_name='wizard_id')
+    result_line_ids = fields.One2many(comodel_name='pricing.simulation.result', inverse_name='wizard_id')
+    currency_id = fields.Many2one(comodel_name='res.currency', default=lambda self: self.env.company.currency_id)
+    current_revenue = fields.Monetary(currency_field='currency_id', readonly=True)
+    simulated_revenue = fields.Monetary(currency_field='currency_id', readonly=True)
+    delta = fields.Monetary(currency_field='currency_id', readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if 'rate_line_ids' in fields_list:
+            lines = []
+            for kind, model in (('room', 'room.type'), ('console', 'console.type'), ('table', 'table.type')):
+                for resource_type in self.env[model].search([]):
+                    lines.append((0, 0, {
+                        'resource_kind': kind,
+                        'type_id': resource_type.id,
+                        'type_name': resource_type.name,
+                        'current_rate': resource_type.price_per_hour,
+                        'new_rate': resource_type.price_per_hour,
+                    }))
+            res['rate_line_ids'] = lines
+        return res
+
+    def action_simulate(self):
+        rates = {}
+        for line in self.rate_line_ids.filtered(lambda l: l.new_rate != l.current_rate):
+            rates.setdefault(line.resource_kind, {})[line.type_id] = line.new_rate
+        result = self.env['pricing.simulation'].simulate(self.date_from, self.date_to, [{'rates': rates}])[0]
+        self.write({
+            'current_revenue': result['current_revenue'],
+            'simulated_revenue': result['simulated_revenue'],
+            'delta': result['delta'],
+            'result_line_ids': [(5, 0, 0)] + [(0, 0, {
+                'date': line['date'],
+                'resource_kind': line['resource_kind'],
+                'type_name': line['type_name'],
+                'hours': line['hours'],
+                'current_revenue': line['current_revenue'],
+                'simulated_revenue': line['simulated_revenue'],
+                'delta': line['delta'],
+            }) for line in result['lines'] if line['delta']],
+        })
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class PricingSimulationRate(models.TransientModel):
+    _name = "pricing.simulation.rate"
+    _description = "Pricing Simulation Candidate Rate"
+
+    wizard_id = fields.Many2one(comodel_name='pricing.simulation.wizard', ondelete='cascade')
+    resource_kind = fields.Selection([
+        ('room', 'Room'),
+        ('console', 'Console'),
+        ('table', 'Table'),
+    ], readonly=True)
+    type_id = fields.Integer(readonly=True)
+    type_name = fields.Char(string='Type', readonly=True)
+    current_rate = fields.Float(string='Current Price/H', readonly=True)
+    new_rate = fields.Float(string='New Price/H')
+
+
+class PricingSimulationResult(models.TransientModel):
+    _name = "pricing.simulation.result"
+    _description = "Pricing Simulation Result"
+    _order = 'date, resource_kind, type_name'
+
+    wizard_id = fields.Many2one(comodel_name='pricing.simulation.wizard', ondelete='cascade')
+    date = fields.Date(readonly=True)
+    resource_kind = fields.Selection([
+        ('room', 'Room'),
+        ('console', 'Console'),
+        ('table', 'Table'),
+    ], readonly=True)
+    type_name = fields.Char(string='Type', readonly=True)
+    hours = fields.Float(readonly=True)
+    currency_id = fields.Many2one(related='wizard_id.currency_id')
+    current_revenue = fields.Monetary(currency_field='currency_id', readonly=True)
+    simulated_revenue = fields.Monetary(currency_field='currency_id', readonly=True)
+    delta = fields.Monetary(currency_field='currency_id', readonly=True)